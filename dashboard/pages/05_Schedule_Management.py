@@ -8,6 +8,10 @@ from datetime import datetime
 # Add the parent directory to the path to import from phase2
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+# Hour caps a new session starts with (the Scheduler's own defaults are 20 and 8)
+DASHBOARD_MAX_HOURS_PER_WEEK = 15
+DASHBOARD_MAX_HOURS_PER_DAY = 6
+
 # Set page config
 st.set_page_config(
     page_title="Schedule Management",
@@ -100,6 +104,28 @@ div[data-testid="stExpander"]:last-child {
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_job_runner():
+    """Background optimization jobs, shared across reruns; the worker keeps built models until it idles out."""
+    from phase2.jobs import JobRunner
+    return JobRunner(os.path.join(os.path.dirname(__file__), '..', '..', 'optimization_jobs'))
+
+def build_live_score(refs, games, params):
+    """Incremental score of the current optimized schedule, used to re-score manual edits."""
+    from phase2.evaluate import LiveScore, ScheduleEvaluator
+    from phase2.objective import WEIGHT_ATTRIBUTES
+    from phase2.schedule_index import ScheduleIndex
+
+    index = ScheduleIndex(refs, games)
+    pairs = [(r, index.game_id[game]) for r, ref in enumerate(refs)
+             for game in ref.get_optimized_games() if game in index.game_id]
+    evaluator = ScheduleEvaluator(index, max_hours_per_week=params.get('max_hours_per_week', DASHBOARD_MAX_HOURS_PER_WEEK),
+                                  max_hours_per_day=params.get('max_hours_per_day', DASHBOARD_MAX_HOURS_PER_DAY),
+                                  fixed_pairs=index.fixed_pairs()[0],
+                                  skill_combo_formulation=params.get('skill_combo_formulation', 'pairs'))
+    weights = {name: params.get(attribute, 1.0) for name, attribute in WEIGHT_ATTRIBUTES.items()}
+    return LiveScore(evaluator, pairs, weights)
+
 st.title("Schedule Management")
 st.markdown("View and manage game schedules and referee assignments")
 
@@ -108,7 +134,6 @@ if 'unsaved_schedule_changes' not in st.session_state:
     st.session_state['unsaved_schedule_changes'] = False
 
 # Check for basic requirements and constraint violations before loading the page
-constraint_violations = []
 game_count = len(st.session_state.get('games', []))
 ref_count = len(st.session_state.get('referees', []))
 
@@ -125,60 +150,29 @@ if ref_count == 0:
     st.info("Use the sidebar to navigate to Referee Management to add referees.")
     st.stop()
 
-# Now check for constraint violations
-if 'games' in st.session_state and st.session_state['games'] and 'referees' in st.session_state and st.session_state['referees']:
-    # Group games by day + time slot combination
-    time_slot_games = {}
-    for game in st.session_state['games']:
-        # Create a key that combines both day and time
-        day_time_key = f"{game.get_date()}_{game.get_time()}"
-        if day_time_key not in time_slot_games:
-            time_slot_games[day_time_key] = []
-        time_slot_games[day_time_key].append(game)
-
-    # Check each day+time slot for constraint violations
-    for day_time_slot, games in time_slot_games.items():
-        available_refs_at_time = 0
-        total_min_refs_needed = 0
-        
-        # Extract day and time from the key
-        day_part, time_part = day_time_slot.split('_', 1)
-        
-        # Count available referees at this specific day+time slot
-        time_columns = st.session_state.get('time_columns', [])
-        for ref in st.session_state['referees']:
-            if hasattr(ref, 'get_availability'):
-                availability = ref.get_availability()
-                # Find the exact day+time slot index in time_columns
-                for i, time_col in enumerate(time_columns):
-                    # Match both day and time in the column name (e.g., "Monday_6:30 PM")
-                    if day_part in time_col and time_part in time_col:
-                        if isinstance(availability, (list, tuple)) and i < len(availability):
-                            if availability[i]:
-                                available_refs_at_time += 1
-                        break
-        
-        # Sum up minimum refs needed for all games at this time slot
-        for game in games:
-            if hasattr(game, 'get_min_refs'):
-                total_min_refs_needed += game.get_min_refs()
-        
-        # Check constraint
-        if available_refs_at_time < total_min_refs_needed:
-            constraint_violations.append({
-                'time_slot': day_time_slot.replace('_', ' at '),  # Format as "Monday at 6:30 PM"
-                'available': available_refs_at_time,
-                'needed': total_min_refs_needed,
-                'games': len(games)
-            })
-
-# If there are constraint violations, show error and exit
-if constraint_violations:
-    st.error("**Cannot proceed with scheduling due to constraint violations!**")
-    st.markdown("### Problems Found:")
+# Now check that every game can reach its minimum refs: a max-flow over refs, nights,
+# slots and games with the hour caps, which proves feasibility or finds the games that can't be staffed
+from phase2.feasibility import staffing_check
+from phase2.schedule_index import ScheduleIndex
+
+# Same caps and manual assignments the optimizer will use
+check_params = st.session_state.get('schedule_params', {})
+check_index = ScheduleIndex(st.session_state['referees'], st.session_state['games'])
+staffing = staffing_check(check_index, check_index.fixed_pairs()[0],
+                          max_hours_per_week=check_params.get('max_hours_per_week', DASHBOARD_MAX_HOURS_PER_WEEK),
+                          max_hours_per_day=check_params.get('max_hours_per_day', DASHBOARD_MAX_HOURS_PER_DAY))
+
+# If there are constraint violations, show error and exit unless a best-effort schedule is wanted
+best_effort = False
+if not staffing.feasible:
+    st.error("**Not every game can be fully staffed!**")
+    st.markdown(f"### Problems Found: {staffing.shortage} referee slots cannot be filled")
+    st.markdown("These games cannot all reach their minimum refs together, whatever the rest of the schedule looks like:")
     
-    for violation in constraint_violations:
-        st.markdown(f"**{violation['time_slot']}**: Only {violation['available']} refs available, but {violation['needed']} minimum refs needed for {violation['games']} games")
+    for violation in staffing.slot_shortages():
+        games_list = ', '.join(str(number) for number in violation['games'])
+        st.markdown(f"**{violation['day']} at {violation['time']}**: Games {games_list} need {violation['needed']} refs; "
+                    f"{violation['available']} refs could take them, {violation['missing']} short")
     
     st.markdown("---")
     st.markdown("### Solutions:")
@@ -186,13 +180,21 @@ if constraint_violations:
     st.markdown("2. **Add more referees** with availability at those times")
     st.markdown("3. **Move games** to different time slots with more referee availability")
     st.markdown("4. **Reduce minimum referee requirements** for some games")
+    st.markdown("5. **Raise the hour limits** if referees available at those times are already at their cap")
     
     st.info("Use the sidebar to navigate to Game Management or Referee Management to fix these issues.")
-    
-    st.stop()  # Stop execution here if there are violations
 
-# If we get here, no constraint violations - show simplified summary
-st.success("**All constraints satisfied!** Ready for scheduling.")
+    # Elastic mode: the optimizer leaves the fewest seats empty and hours over the caps, then uses the weights
+    best_effort = st.checkbox("Schedule anyway (best effort)", key='schedule_best_effort',
+                              help=f"Leave the fewest seats unfilled ({staffing.shortage} referee slots, counting "
+                                   f"hours over the caps) and optimize the rest of the schedule as usual.")
+    if not best_effort:
+        st.stop()  # Stop execution here if there are violations
+    st.warning(f"**Best-effort scheduling:** {staffing.shortage} referee slots will stay unfilled or be covered "
+               f"by hours over the caps.")
+else:
+    # If we get here, no constraint violations - show simplified summary
+    st.success("**All constraints satisfied!** Ready for scheduling.")
 
 st.markdown("---")
 st.subheader("Scheduling Workflow")
@@ -414,8 +416,8 @@ with workflow_tab2:
     # Initialize parameters in session state if not exists
     if 'schedule_params' not in st.session_state:
         st.session_state['schedule_params'] = {
-            'max_hours_per_week': 15,
-            'max_hours_per_day': 6,
+            'max_hours_per_week': DASHBOARD_MAX_HOURS_PER_WEEK,
+            'max_hours_per_day': DASHBOARD_MAX_HOURS_PER_DAY,
             'weight_hour_balancing': 2.5,
             'weight_skill_combo': 2.5,
             'weight_low_skill_penalty': 2.5,
@@ -534,6 +536,89 @@ with workflow_tab2:
             st.session_state['schedule_params']['weight_effort_bonus'] = percentage_to_weight(weight_effort_bonus_pct)
             st.session_state['unsaved_schedule_changes'] = True
 
+    st.markdown("---")
+    with st.expander("Explore Weight Trade-offs"):
+        st.markdown("Solve the week for many weight mixes at once and keep the schedules that no other mix beats on every objective.")
+
+        sweep_col1, sweep_col2, sweep_col3 = st.columns(3)
+        with sweep_col1:
+            sweep_count = st.number_input("Weight Mixes", min_value=2, max_value=200, value=16,
+                                          help="Random weight mixes to try (0-400% each)")
+        with sweep_col2:
+            sweep_time = st.number_input("Seconds per Mix", min_value=5, max_value=240, value=30)
+        with sweep_col3:
+            sweep_workers = st.number_input("Parallel Solves", min_value=1, max_value=os.cpu_count() or 1,
+                                            value=os.cpu_count() or 1)
+
+        from phase2.jobs import FINAL_STATES, WEIGHT_SWEEP
+
+        sweep_runner = get_job_runner()
+        # Runs in the background worker like an optimization, so the page stays responsive
+        sweep_job_id = st.session_state.get('weight_sweep_job_id') or sweep_runner.active_job(WEIGHT_SWEEP)
+        sweep_status = sweep_runner.status(sweep_job_id) if sweep_job_id else None
+        sweep_active = sweep_status is not None and sweep_status['state'] not in FINAL_STATES
+
+        if st.button("Run Weight Sweep", width='stretch', disabled=sweep_active):
+            from phase2.weight_sweep import sample_weights
+            params = st.session_state['schedule_params']
+            sweep_params = {'max_hours_per_week': params['max_hours_per_week'],
+                            'max_hours_per_day': params['max_hours_per_day'],
+                            'weight_sets': sample_weights(int(sweep_count)),
+                            'time_limit': int(sweep_time), 'workers': int(sweep_workers)}
+            st.session_state['weight_sweep_job_id'] = sweep_runner.submit(
+                st.session_state['referees'], st.session_state['games'], sweep_params, kind=WEIGHT_SWEEP)
+            st.rerun()
+
+        @st.fragment(run_every=2)
+        def show_sweep_progress(job_id):
+            """Poll the background sweep; only this block reruns while it solves."""
+            status = sweep_runner.status(job_id)
+            if status is None or status['state'] in FINAL_STATES:
+                st.rerun()
+            if status['state'] == 'queued':
+                st.info("Waiting for the optimization worker...")
+            else:
+                elapsed = time.time() - status['started']
+                st.progress(min(elapsed / status['time_limit'], 1.0),
+                            text=f"Solving weight mixes for {int(elapsed)}s (up to about {status['time_limit']}s)")
+            st.code(sweep_runner.log(job_id, lines=10) or "Starting...", language=None)
+            if st.button("Cancel Weight Sweep", key=f"cancel_sweep_{job_id}", width='stretch'):
+                sweep_runner.cancel(job_id)
+                st.rerun()
+
+        if sweep_active:
+            show_sweep_progress(sweep_job_id)
+        elif sweep_status is not None:
+            # Load a finished sweep once; its result stays on disk
+            if sweep_status['state'] == 'done' and st.session_state.get('weight_sweep_applied_job') != sweep_job_id:
+                st.session_state['weight_sweep_front'] = sweep_runner.result(sweep_job_id)['front']
+                st.session_state['weight_sweep_applied_job'] = sweep_job_id
+            elif sweep_status['state'] == 'failed':
+                st.error(f"❌ Weight sweep failed: {sweep_status.get('error') or 'Unknown error'}")
+
+        front = st.session_state.get('weight_sweep_front')
+        if front:
+            from phase2.objective import WEIGHT_ATTRIBUTES
+            labels = {'effort': 'Effort', 'balancing': 'Hour Balancing', 'low_skill': 'Low Skill',
+                      'shift_block': 'Shift Blocks', 'skill_combo': 'Skill Combo'}
+            rows = []
+            for i, result in enumerate(front):
+                row = {'Option': i + 1}
+                for name, label in labels.items():
+                    row[f"{label} Weight"] = f"{weight_to_percentage(result['weights'][name]):.0f}%"
+                for name, label in labels.items():
+                    row[label] = round(result['components'][name], 3)
+                rows.append(row)
+            st.markdown(f"**{len(front)} non-dominated schedules** (effort and skill combo: higher is better; the rest: lower is better)")
+            st.dataframe(pd.DataFrame(rows), width='stretch', hide_index=True)
+
+            chosen = st.selectbox("Option", [row['Option'] for row in rows])
+            if st.button("Use These Weights", width='stretch'):
+                for name, attribute in WEIGHT_ATTRIBUTES.items():
+                    st.session_state['schedule_params'][attribute] = front[chosen - 1]['weights'][name]
+                st.session_state['unsaved_schedule_changes'] = True
+                st.rerun()
+
 # Show save warning and button if there are unsaved changes
 if st.session_state.get('unsaved_schedule_changes', False):
     st.warning("⚠️ You have unsaved schedule configuration changes!")
@@ -609,155 +694,124 @@ with workflow_tab3:
     st.markdown("---")
     st.markdown("#### 🚀 Run Optimization")
     st.markdown("Ready to optimize? This will use all your constraints and parameters to create the best possible schedule.")
-    
-    # Initialize optimization state
-    if 'optimization_running' not in st.session_state:
-        st.session_state['optimization_running'] = False
-    if 'optimization_start_time' not in st.session_state:
-        st.session_state['optimization_start_time'] = None
-    
-    # Max wait time: 4 minutes = 240 seconds
-    MAX_WAIT_TIME = 240
-    
-    if st.button("Optimize Schedule", type="primary", width='stretch'):
+
+    from phase2.jobs import FINAL_STATES
+
+    runner = get_job_runner()
+
+    # The job id is kept in the URL too, so a refresh re-attaches to the same run
+    job_id = st.session_state.get('optimization_job_id') or st.query_params.get('job') or runner.active_job()
+    job_status = runner.status(job_id) if job_id else None
+    job_active = job_status is not None and job_status['state'] not in FINAL_STATES
+
+    if st.button("Optimize Schedule", type="primary", width='stretch', disabled=job_active):
         if 'referees' in st.session_state and 'games' in st.session_state:
-            # Clean up any existing progress file
-            try:
-                import os
-                if os.path.exists('optimization_progress.json'):
-                    os.remove('optimization_progress.json')
-            except:
-                pass
-            
-            # Start optimization process
-            st.session_state['optimization_running'] = True
-            st.session_state['optimization_start_time'] = time.time()
-            st.session_state['optimization_started'] = False
+            job_id = runner.submit(st.session_state['referees'], st.session_state['games'],
+                                   {**st.session_state['schedule_params'], 'elastic': best_effort})
+            st.session_state['optimization_job_id'] = job_id
+            st.query_params['job'] = job_id
             st.rerun()
         else:
             st.error("Please ensure both referees and games are loaded before optimizing.")
-    
-    # Show optimization status if active
-    if st.session_state.get('optimization_running', False):
-        
-        # Calculate time information
-        start_time = st.session_state['optimization_start_time']
-        elapsed_time = time.time() - start_time
-        completion_time = start_time + MAX_WAIT_TIME
-        
-        # Convert completion time to readable format
-        from datetime import datetime
-        completion_datetime = datetime.fromtimestamp(completion_time)
-        completion_str = completion_datetime.strftime("%I:%M:%S %p")
-        
-        # Display optimization information
+
+    @st.fragment(run_every=2)
+    def show_job_progress(job_id):
+        """Poll the background job; only this block reruns while the solver works."""
+        status = runner.status(job_id)
+        if status is None or status['state'] in FINAL_STATES:
+            st.rerun()
+
         st.markdown("### Optimization in Progress")
-        
-        # Create centered container for spinner
-        col1, col2, col3 = st.columns([1, 2, 1])
+        if status['state'] == 'queued':
+            st.info("Waiting for the optimization worker...")
+        else:
+            elapsed = time.time() - status['started']
+            time_limit = status.get('time_limit') or 240
+            st.progress(min(elapsed / time_limit, 1.0),
+                        text=f"Running for {int(elapsed)}s (solver time limit {time_limit}s)")
+        st.caption(f"Job {job_id}. You can leave or refresh this page; the run continues in the background.")
+
+        # Incumbent/bound events from the solver: stop once the gap is small enough
+        events = runner.progress(job_id)
+        latest = events[-1] if events else {}
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Best Objective", f"{latest['incumbent']:.4f}" if latest.get('incumbent') is not None else "—")
         with col2:
-            # Custom CSS for bigger spinner
-            st.markdown("""
-            <style>
-            .big-spinner {
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                padding: 30px;
-            }
-            .big-spinner .stSpinner > div {
-                width: 80px !important;
-                height: 80px !important;
-                border-width: 4px !important;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-            
-            # Big spinner with custom message
-            with st.spinner(f"Optimizing schedule... Max runtime: 4 minutes"):
-                # Show completion time info
-                st.markdown(f"""
-                <div style="text-align: center; margin-top: 20px; padding: 15px; background-color: #1f1f1f; border-radius: 8px; border: 1px solid #444;">
-                    <h4 style="color: #ffffff; margin: 0;">⏰ Estimated Completion</h4>
-                    <p style="color: #00ff00; font-size: 1.2em; margin: 10px 0;">{completion_str}</p>
-                    <p style="color: #cccccc; font-size: 0.9em; margin: 0;">Max runtime: 4 minutes 30 seconds</p>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Check if we should run optimization
-        if not st.session_state.get('optimization_started', False):
-            st.session_state['optimization_started'] = True
-            st.rerun()  # Restart to show progress immediately
-        
-        # If optimization has started but not run yet, run it now
-        if st.session_state.get('optimization_started', False) and not st.session_state.get('optimization_executed', False):
-            st.session_state['optimization_executed'] = True
-            
-            st.info("Running optimization algorithm...")
-            
-            try:
-                # Import scheduler
-                import sys
-                import os
-                sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-                from phase2.scheduler import Scheduler
-                
-                # Create scheduler instance
-                scheduler = Scheduler(st.session_state['referees'], st.session_state['games'])
-                
-                # Set parameters if available
-                if 'schedule_params' in st.session_state:
-                    scheduler.set_parameters(st.session_state['schedule_params'])
-                
-                # Run optimization with progress indication
-                with st.spinner("Running optimization algorithm..."):
-                    result = scheduler.optimize()
-                
-                # Clean up progress file
-                try:
-                    import os
-                    if os.path.exists('optimization_progress.json'):
-                        os.remove('optimization_progress.json')
-                except:
-                    pass
-                
-                # Reset optimization state
-                st.session_state['optimization_running'] = False
-                st.session_state['optimization_started'] = False
-                st.session_state['optimization_executed'] = False
-                st.session_state['optimization_start_time'] = None
-                
-                if isinstance(result, dict) and result.get('success'):
-                    # Update session state with optimized results
-                    st.session_state['referees'] = result['refs']  # Updated referee objects with assignments
-                    st.session_state['optimization_complete'] = True
-                    st.session_state['optimization_assignments'] = result['assignments']
-                    
-                    st.success("✅ Optimization completed successfully!")
-                    st.info("Navigate to the 'Results & Export' tab to view the schedule and export to Excel.")
-                    st.rerun()  # Refresh to show new results
-                else:
-                    error_msg = result.get('error', 'Unknown error') if isinstance(result, dict) else 'Optimization failed'
-                    st.error(f"❌ Optimization failed: {error_msg}")
-                    st.info("Check the console/terminal for detailed debug output.")
-            except Exception as e:
-                # Clean up progress file on error
-                try:
-                    import os
-                    if os.path.exists('optimization_progress.json'):
-                        os.remove('optimization_progress.json')
-                except:
-                    pass
-                
-                # Reset optimization state on error
-                st.session_state['optimization_running'] = False
-                st.session_state['optimization_started'] = False
-                st.session_state['optimization_executed'] = False
-                st.session_state['optimization_start_time'] = None
-                st.error(f"❌ Error during optimization: {str(e)}")
+            st.metric("Best Bound", f"{latest['bound']:.4f}" if latest.get('bound') is not None else "—")
+        with col3:
+            st.metric("Gap", f"{latest['gap']:.2%}" if latest.get('gap') is not None else "—")
+        with col4:
+            st.metric("Schedules Found", latest.get('solutions', 0))
+        gap_points = [(event['runtime'], min(100 * event['gap'], 100)) for event in events if event['gap'] is not None]
+        if gap_points:
+            gap_df = pd.DataFrame(gap_points, columns=['Seconds', 'Gap (%)']).set_index('Seconds')
+            st.line_chart(gap_df, x_label='Seconds', y_label='Gap (%, capped at 100)')
+
+        # Anytime results: every improving schedule is published whole while the solver keeps going
+        incumbents = runner.incumbents(job_id)
+        if incumbents:
+            best = incumbents[-1]
+            st.markdown("#### Current Best Schedule")
+            st.caption(f"Found after {best['runtime']:.1f}s ({len(incumbents)} improving schedules so far). "
+                       "Accept it to stop the solver now, or let it keep improving.")
+            component_labels = {'effort': 'Effort', 'balancing': 'Hour Balancing', 'low_skill': 'Low Skill',
+                                'shift_block': 'Shift Block', 'skill_combo': 'Skill Combo'}
+            breakdown_df = pd.DataFrame([
+                {'Seconds': round(incumbent['runtime'], 1), 'Objective': round(incumbent['objective'], 4),
+                 **{label: round(incumbent['components'][name], 3) for name, label in component_labels.items()}}
+                for incumbent in reversed(incumbents)
+            ])
+            st.dataframe(breakdown_df, width='stretch', hide_index=True)
+
+            crews = {}
+            for row in best['assignments']:
+                crew = crews.setdefault(row['game_number'], {'Game #': row['game_number'], 'Day': row['day'],
+                                                             'Time': row['time'], 'Referees': []})
+                crew['Referees'].append(row['ref_name'])
+            crew_df = pd.DataFrame([{**crew, 'Referees': ', '.join(crew['Referees'])} for crew in crews.values()])
+            with st.expander(f"Assignments ({len(best['assignments'])})"):
+                st.dataframe(crew_df, width='stretch', hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Accept Current Best", key=f"stop_{job_id}", width='stretch',
+                         disabled=latest.get('incumbent') is None,
+                         help="Stop the solver now and use the best schedule found so far"):
+                runner.stop(job_id)
+        with col2:
+            if st.button("Cancel Optimization", key=f"cancel_{job_id}", width='stretch'):
+                runner.cancel(job_id)
+                st.rerun()
+        with st.expander("Solver log", expanded=True):
+            st.code(runner.log(job_id, lines=25) or "Starting...", language=None)
+
+    if job_active:
+        show_job_progress(job_id)
+    elif job_status is not None:
+        # Load a finished run once per session; the result stays on disk for later refreshes
+        if job_status['state'] == 'done' and job_status.get('success'):
+            if st.session_state.get('optimization_applied_job') != job_id:
+                result = runner.result(job_id)
+                st.session_state['referees'] = result['refs']  # Updated referee objects with assignments
+                st.session_state['games'] = result['games']
+                st.session_state['optimization_complete'] = True
+                st.session_state['optimization_assignments'] = result['assignments']
+                st.session_state['optimization_violations'] = result.get('violations')
+                st.session_state['optimization_applied_job'] = job_id
+                st.session_state.pop('live_score', None)  # Rebuilt from the new schedule on the Results tab
+            st.success("✅ Optimization completed successfully!")
+            violations = st.session_state.get('optimization_violations')
+            if violations:
+                st.warning(f"Best-effort schedule: {violations['missing_refs']} refs missing and "
+                           f"{violations['extra_hours']} hours over the caps.")
+            st.info("Navigate to the 'Results & Export' tab to view the schedule and export to Excel.")
+        elif job_status['state'] == 'cancelled':
+            st.warning("Optimization cancelled.")
         else:
-            # Show spinner while optimization runs
-            pass  # Spinner will be shown from the with st.spinner block
+            st.error(f"❌ Optimization failed: {job_status.get('error') or 'Unknown error'}")
+            with st.expander("Solver log"):
+                st.code(runner.log(job_id, lines=60), language=None)
 
 with workflow_tab4:
     st.markdown("### Results & Export")
@@ -782,6 +836,88 @@ with workflow_tab4:
         display_game_coverage(st.session_state['games'])
         
         st.markdown("---")
+
+        # Manual adjustments: each edit is re-scored incrementally against the optimizer's objective
+        st.markdown("### Adjust Assignments")
+        st.markdown("Add or remove a referee on a game. Each edit shows at once what it costs in the objective "
+                    "and in hard constraints, without re-running the optimizer.")
+        if st.session_state.get('live_score') is None:
+            st.session_state['live_score'] = build_live_score(st.session_state['referees'], st.session_state['games'],
+                                                              st.session_state.get('schedule_params', {}))
+            st.session_state['live_score_edits'] = []
+        live = st.session_state['live_score']
+        edits = st.session_state['live_score_edits']
+        live_index = live.evaluator.index
+        component_labels = {'effort': 'Effort', 'balancing': 'Hour Balancing', 'low_skill': 'Low Skill',
+                            'shift_block': 'Shift Block', 'skill_combo': 'Skill Combo'}
+        violation_labels = {'short': 'refs short of min', 'over_max': 'refs over max',
+                            'over_day': 'hours over daily cap', 'over_week': 'hours over weekly cap',
+                            'double_booked': 'double bookings', 'unavailable': 'unavailable assignments',
+                            'manual_missing': 'manual assignments dropped'}
+
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            k = st.selectbox("Game", range(live_index.num_games), key='adjust_game',
+                             format_func=lambda k: (f"Game {live_index.game_list[k].get_number()} - "
+                                                    f"{live_index.game_list[k].get_date()} "
+                                                    f"{live_index.game_list[k].get_time()}"))
+            crew = sorted(live_index.refs[r].get_name() for r in live.crews[k])
+            st.caption(f"Current crew: {', '.join(crew) if crew else 'none'}")
+        with col2:
+            r = st.selectbox("Referee", range(live_index.num_refs), key='adjust_ref',
+                             format_func=lambda r: live_index.refs[r].get_name())
+        with col3:
+            on_game = r in live.crews[k]
+            st.markdown("&nbsp;")
+            if st.button("Remove from game" if on_game else "Add to game", key='adjust_apply', width='stretch'):
+                game, ref = live_index.game_list[k], live_index.refs[r]
+                if on_game:
+                    delta = live.remove(r, k)
+                    game.remove_ref(ref)
+                    ref.set_optimized_games([g for g in ref.get_optimized_games() if g is not game])
+                    action = f"Removed {ref.get_name()} from game {game.get_number()}"
+                else:
+                    delta = live.add(r, k)
+                    game.add_ref(ref)
+                    ref.add_optimized_game(game)
+                    action = f"Added {ref.get_name()} to game {game.get_number()}"
+                edits.append({'edit': action, 'delta': delta})
+                st.rerun()
+
+        score = live.snapshot()
+        last = edits[-1]['delta'] if edits else None
+        columns = st.columns(len(component_labels) + 1)
+        with columns[0]:
+            st.metric("Objective", f"{score['objective']:.4f}",
+                      delta=f"{last['objective']:+.4f}" if last else None)
+        for column, (name, label) in zip(columns[1:], component_labels.items()):
+            with column:
+                # Balancing, low skill and shift blocks are penalties: an increase is bad
+                st.metric(label, f"{score['components'][name]:.3f}",
+                          delta=f"{last['components'][name]:+.3f}" if last else None,
+                          delta_color='normal' if name in ('effort', 'skill_combo') else 'inverse')
+        broken = [f"{count} {violation_labels[kind]}" for kind, count in score['violations'].items() if count]
+        if broken:
+            st.warning("Hard constraints broken: " + ", ".join(broken))
+        else:
+            st.success("The adjusted schedule meets every hard constraint.")
+
+        if edits:
+            def describe(violations):
+                return ', '.join(f"{change:+d} {violation_labels[kind]}" for kind, change in violations.items()
+                                 if change) or '-'
+
+            edits_df = pd.DataFrame([
+                {'Edit': entry['edit'], 'Δ Objective': round(entry['delta']['objective'], 4),
+                 **{f"Δ {label}": round(entry['delta']['components'][name], 3)
+                    for name, label in component_labels.items()},
+                 'Δ Violations': describe(entry['delta']['violations'])}
+                for entry in reversed(edits)
+            ])
+            st.markdown("#### Edits (latest first)")
+            st.dataframe(edits_df, width='stretch', hide_index=True)
+
+        st.markdown("---")
         
         # Export functionality
         st.markdown("### Export Schedule")
@@ -817,6 +953,7 @@ with workflow_tab4:
                 st.session_state['optimization_complete'] = False
                 if 'optimization_assignments' in st.session_state:
                     del st.session_state['optimization_assignments']
+                st.session_state.pop('live_score', None)
                 st.info("Navigate back to 'Step 3: Review' to re-run the optimization.")
                 st.rerun()
         
@@ -0,0 +1,537 @@
+"""
+Benchmark the optimizer on generated standard instances.
+
+Usage (from the repository root):
+    python -m phase2.benchmark
+    python -m phase2.benchmark --instances week --backends highs cbc --time-limit 120
+    python -m phase2.benchmark --backends local_search --time-limit 1
+    python -m phase2.benchmark --builder matrix
+    python -m phase2.benchmark --warm-start
+    python -m phase2.benchmark --decompose --workers 4
+    python -m phase2.benchmark --symmetry --instances four_court
+    python -m phase2.benchmark --season 12 --instances week
+    python -m phase2.benchmark --repair
+    python -m phase2.benchmark --lns --instances week --time-limit 240 --workers 4
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from phase2.Game import Game
+from phase2.Ref import Ref
+from phase2.schedule_index import DIFFICULTY_MAP
+from phase2.scheduler import Scheduler
+from phase2.season import SeasonLedger, SeasonScheduler
+from phase2.solvers import SOLVER_PREFERENCE, available_backends
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Shapes of the weeks we schedule in practice
+STANDARD_INSTANCES = {
+    'small': dict(num_refs=12, num_days=2, num_times=3, games_per_slot=(2, 2), seed=1),
+    'week': dict(num_refs=40, num_days=4, num_times=4, games_per_slot=(4, 5), seed=2),
+    'four_court': dict(num_refs=40, num_days=4, num_times=4, games_per_slot=(4, 4),
+                       min_refs=2, max_refs=2, seed=3),
+}
+
+DEFAULT_PARAMS = {
+    'max_hours_per_week': 15,
+    'max_hours_per_day': 6,
+    'weight_hour_balancing': 2.5,
+    'weight_skill_combo': 2.5,
+    'weight_low_skill_penalty': 2.5,
+    'weight_shift_block_penalty': 2.5,
+    'weight_effort_bonus': 2.5
+}
+
+
+def make_instance(num_refs=40, num_days=4, num_times=4, games_per_slot=(4, 5), availability=0.5,
+                  min_refs=1, max_refs=2, manual_assignments=2, seed=0):
+    """
+    Generate a reproducible week of refs and games.
+
+    Args:
+        num_refs: Number of referees
+        num_days: Number of game nights (starting Monday)
+        num_times: Time slots per night, one hour apart from 18:00
+        games_per_slot: (min, max) number of concurrent games per slot
+        availability: Probability a ref is available for a slot
+        min_refs, max_refs: Staffing bounds for every game
+        manual_assignments: Number of refs given one manual assignment
+        seed: Random seed
+
+    Returns:
+        tuple: (refs, games)
+    """
+    rng = random.Random(seed)
+    days = DAYS[:num_days]
+    times = [f"{18 + h}:00" for h in range(num_times)]
+    divisions = list(DIFFICULTY_MAP)
+
+    games = []
+    number = 1
+    for day in days:
+        for time_slot in times:
+            for court in range(rng.randint(*games_per_slot)):
+                games.append(Game(day, time_slot, number, rng.choice(divisions),
+                                  f"Court {court + 1}", min_refs, max_refs))
+                number += 1
+
+    refs = []
+    for r in range(num_refs):
+        slots = [1 if rng.random() < availability else 0 for _ in range(num_days * num_times)]
+        ref = Ref(f"Ref {r + 1}", slots, f"ref{r + 1}@example.com", "",
+                  experience=rng.randint(1, 5), effort=rng.randint(1, 5))
+        ref.set_max_hours(rng.choice([4, 6, 8, 10]))
+        refs.append(ref)
+
+    # Pin a few refs to the first game they can work
+    for ref in refs[:manual_assignments]:
+        for game in games:
+            slot = days.index(game.get_date()) * num_times + times.index(game.get_time())
+            if ref.get_availability()[slot]:
+                ref.add_assigned_game(game.get_number())
+                break
+
+    return refs, games
+
+
+def make_season(num_weeks, seed=0, **instance):
+    """
+    Generate a season of weeks with the same refs (by name, experience,
+    effort and max hours) and fresh availability and games every week.
+
+    Returns:
+        list: (refs, games) per week
+    """
+    base_refs, _ = make_instance(seed=seed, **instance)
+    weeks = []
+    for week in range(num_weeks):
+        refs, games = make_instance(seed=seed * 1000 + week + 1, **instance)
+        for ref, base in zip(refs, base_refs):
+            ref.set_experience(base.get_experience())
+            ref.set_effort(base.get_effort())
+            ref.set_max_hours(base.get_max_hours())
+        weeks.append((refs, games))
+    return weeks
+
+
+def run_scheduler(instance, params, quiet=True):
+    """Build and solve one instance; returns (result dict, wall time)."""
+    refs, games = make_instance(**STANDARD_INSTANCES[instance])
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters(params)
+    start = time.time()
+    if quiet:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = scheduler.optimize()
+    else:
+        result = scheduler.optimize()
+    return result, time.time() - start
+
+
+def benchmark_backends(instances=None, backends=None, time_limit=60, mip_gap=0.05, params=None, quiet=True,
+                       builder='pyomo'):
+    """
+    Solve each standard instance with each available backend.
+
+    builder='matrix' bypasses Pyomo and solves with the matrix solvers (HiGHS),
+    so only one run per instance is made.
+
+    Returns:
+        list: One row dict per (instance, backend) run
+    """
+    instances = instances or list(STANDARD_INSTANCES)
+    # Local search needs no solver, so it is always available (and only run when asked for)
+    installed = available_backends() + ['local_search']
+    backends = [b for b in (backends or SOLVER_PREFERENCE) if b in installed]
+    if builder == 'matrix':
+        backends = ['highs']
+
+    rows = []
+    for instance in instances:
+        for backend in backends:
+            run_params = {**DEFAULT_PARAMS, **(params or {}),
+                          'solver': backend, 'solver_fallback': False, 'builder': builder,
+                          'time_limit': time_limit, 'mip_gap': mip_gap}
+            result, wall = run_scheduler(instance, run_params, quiet)
+            stats = result.get('stats', {}) if isinstance(result, dict) else {}
+            rows.append({
+                'instance': instance,
+                'backend': stats.get('backend', backend),
+                'status': stats.get('termination', 'error' if not result.get('success') else 'unknown'),
+                'objective': stats.get('objective'),
+                'gap': stats.get('gap'),
+                'build_time': stats.get('build_time'),
+                'solve_time': stats.get('runtime'),
+                'wall_time': wall,
+                'variables': stats.get('num_variables'),
+                'constraints': stats.get('num_constraints')
+            })
+    return rows
+
+
+def benchmark_warm_start(instances=None, time_limit=60, mip_gap=0.05, params=None, quiet=True, builder='matrix'):
+    """
+    Solve each standard instance cold and warm-started from the greedy schedule.
+
+    Time to first incumbent is only tracked by the matrix (highspy) path.
+
+    Returns:
+        list: One row dict per (instance, cold/warm) run
+    """
+    rows = []
+    for instance in (instances or list(STANDARD_INSTANCES)):
+        for warm in (False, True):
+            run_params = {**DEFAULT_PARAMS, **(params or {}), 'builder': builder, 'warm_start': warm,
+                          'time_limit': time_limit, 'mip_gap': mip_gap}
+            result, wall = run_scheduler(instance, run_params, quiet)
+            stats = result.get('stats', {})
+            rows.append({
+                'instance': instance,
+                'start': 'warm' if warm else 'cold',
+                'status': stats.get('termination', 'error'),
+                'first_incumbent': stats.get('first_incumbent_time'),
+                'objective': stats.get('objective'),
+                'gap': stats.get('gap'),
+                'solve_time': stats.get('runtime')
+            })
+    return rows
+
+
+def benchmark_symmetry(instances=None, time_limit=60, mip_gap=0.05, params=None, quiet=True, builder='matrix'):
+    """
+    Solve each standard instance with and without symmetry breaking.
+
+    Returns:
+        list: One row dict per (instance, off/on) run
+    """
+    rows = []
+    for instance in (instances or list(STANDARD_INSTANCES)):
+        for symmetry in (False, True):
+            run_params = {**DEFAULT_PARAMS, **(params or {}), 'builder': builder, 'symmetry_breaking': symmetry,
+                          'time_limit': time_limit, 'mip_gap': mip_gap}
+            result, wall = run_scheduler(instance, run_params, quiet)
+            stats = result.get('stats', {})
+            rows.append({
+                'instance': instance,
+                'symmetry': 'on' if symmetry else 'off',
+                'status': stats.get('termination', 'error'),
+                'objective': stats.get('objective'),
+                'bound': stats.get('bound'),
+                'gap': stats.get('gap'),
+                'solve_time': stats.get('runtime'),
+                'constraints': stats.get('num_constraints')
+            })
+    return rows
+
+
+def _fmt(value, spec):
+    """Format a table cell, or '-' when the run produced no number."""
+    return format(value, spec) if isinstance(value, (int, float)) else '-'
+
+
+def print_symmetry_table(rows):
+    print(f"{'instance':<12}{'symmetry':<10}{'status':<12}{'objective':>11}{'bound':>10}{'gap':>9}"
+          f"{'solve s':>9}{'cons':>8}")
+    for row in rows:
+        print(f"{row['instance']:<12}{row['symmetry']:<10}{row['status']:<12}"
+              f"{_fmt(row['objective'], '.4f'):>11}{_fmt(row['bound'], '.4f'):>10}{_fmt(row['gap'], '.2%'):>9}"
+              f"{_fmt(row['solve_time'], '.2f'):>9}{_fmt(row['constraints'], 'd'):>8}")
+
+
+def benchmark_decomposition(instances=None, time_limit=60, mip_gap=0.05, params=None, quiet=True, workers=None):
+    """
+    Solve each standard instance as one weekly model and decomposed by day.
+
+    The decomposed objective is compared to the monolithic objective and to
+    the monolithic solver's bound (the gap to the true optimum is at most that).
+
+    Returns:
+        list: One row dict per instance
+    """
+    rows = []
+    for instance in (instances or list(STANDARD_INSTANCES)):
+        base = {**DEFAULT_PARAMS, **(params or {}), 'builder': 'matrix', 'time_limit': time_limit, 'mip_gap': mip_gap}
+        mono, mono_wall = run_scheduler(instance, base, quiet)
+        split, split_wall = run_scheduler(instance, {**base, 'decomposition': 'day', 'workers': workers}, quiet)
+        mono_stats, split_stats = mono.get('stats', {}), split.get('stats', {})
+        mono_obj, bound, split_obj = mono_stats.get('objective'), mono_stats.get('bound'), split_stats.get('objective')
+
+        def relative(reference):
+            if reference is None or split_obj is None:
+                return None
+            return (reference - split_obj) / max(abs(reference), 1e-9)
+
+        rows.append({
+            'instance': instance,
+            'mono_objective': mono_obj,
+            'mono_time': mono_wall,
+            'split_objective': split_obj,
+            'split_time': split_wall,
+            'rounds': len(split_stats.get('iterations', [])),
+            'gap_to_mono': relative(mono_obj),
+            'gap_to_bound': relative(bound)
+        })
+    return rows
+
+
+def benchmark_season(num_weeks, instances=None, time_limit=60, mip_gap=0.05, params=None, quiet=True):
+    """
+    Schedule a season of each standard instance on the rolling horizon and as independent weeks.
+
+    Both runs are scored on the season: the spread of total hours and of
+    Thursday hours over the refs who are not at their cap (the balancing
+    set C), and the most games any two refs shared.
+
+    Returns:
+        list: One row dict per (instance, mode) run
+    """
+    rows = []
+    for instance in (instances or list(STANDARD_INSTANCES)):
+        shape = dict(STANDARD_INSTANCES[instance])
+        seed = shape.pop('seed')
+        base = {**DEFAULT_PARAMS, **(params or {}), 'time_limit': time_limit, 'mip_gap': mip_gap}
+        for mode in ('weekly', 'season'):
+            weeks = make_season(num_weeks, seed=seed, **shape)
+            ledger = SeasonLedger()
+            start = time.time()
+            with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+                if mode == 'season':
+                    result = SeasonScheduler(weeks, base, ledger).optimize()
+                    solved = sum(1 for week in result['weeks'] if week.get('success'))
+                else:
+                    solved = 0
+                    for refs, games in weeks:
+                        scheduler = Scheduler(refs, games)
+                        scheduler.set_parameters({**base, 'builder': 'matrix'})
+                        week = scheduler.optimize()
+                        if week.get('success'):
+                            solved += 1
+                            ledger.record_week(week['assignments'])
+            wall = time.time() - start
+            refs = weeks[0][0]
+            cap = sum(ref.get_max_hours() for ref in refs) / len(refs) - 3
+            balanced = [ref for ref in refs if ref.get_max_hours() > cap]
+            hours, thursday, together = ledger.totals(balanced)
+            rows.append({
+                'instance': instance,
+                'mode': mode,
+                'weeks': solved,
+                'hours_spread': float(hours.max() - hours.min()),
+                'hours_std': float(hours.std()),
+                'thursday_spread': float(thursday.max() - thursday.min()),
+                'most_shared': int(ledger.together.max()),
+                'wall_time': wall
+            })
+    return rows
+
+
+def benchmark_repair(instances=None, time_limit=60, mip_gap=0.05, params=None, quiet=True):
+    """
+    Drop the busiest ref of each solved standard instance for the whole week,
+    then repair the schedule and, for comparison, re-optimize it from scratch.
+
+    Returns:
+        list: One row dict per instance with the time taken and the
+        assignments changed by each
+    """
+    rows = []
+    for instance in (instances or list(STANDARD_INSTANCES)):
+        run_params = {**DEFAULT_PARAMS, **(params or {}), 'time_limit': time_limit, 'mip_gap': mip_gap}
+        refs, games = make_instance(**STANDARD_INSTANCES[instance])
+        scheduler = Scheduler(refs, games)
+        scheduler.set_parameters(run_params)
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            result = scheduler.optimize()
+        if not result.get('success'):
+            continue
+        before = {(a['ref_name'], a['game_number']) for a in result['assignments']}
+        hours = {}
+        for name, _ in before:
+            hours[name] = hours.get(name, 0) + 1
+        dropped = max(hours, key=hours.get)
+
+        start = time.time()
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            repaired = scheduler.repair(result['assignments'], unavailable={dropped: None})
+        repair_time = time.time() - start
+
+        # Re-optimizing means taking the ref out of the week
+        refs, games = make_instance(**STANDARD_INSTANCES[instance])
+        refs = [ref for ref in refs if ref.get_name() != dropped]
+        rerun = Scheduler(refs, games)
+        rerun.set_parameters(run_params)
+        start = time.time()
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            reoptimized = rerun.optimize()
+        rerun_time = time.time() - start
+
+        def changed(run):
+            if not run.get('success'):
+                return None
+            return len(before ^ {(a['ref_name'], a['game_number']) for a in run['assignments']})
+
+        rows.append({
+            'instance': instance,
+            'dropped_hours': hours[dropped],
+            'repair_changes': changed(repaired),
+            'repair_time': repair_time,
+            'repair_scope': repaired.get('stats', {}).get('scope'),
+            'rerun_changes': changed(reoptimized),
+            'rerun_time': rerun_time
+        })
+    return rows
+
+
+def print_repair_table(rows):
+    print(f"{'instance':<12}{'lost':>6}{'repair chg':>12}{'repair s':>10}{'scope':>8}{'rerun chg':>11}{'rerun s':>9}")
+    for row in rows:
+        print(f"{row['instance']:<12}{row['dropped_hours']:>6}{_fmt(row['repair_changes'], 'd'):>12}"
+              f"{_fmt(row['repair_time'], '.2f'):>10}{row['repair_scope'] or '-':>8}"
+              f"{_fmt(row['rerun_changes'], 'd'):>11}{_fmt(row['rerun_time'], '.2f'):>9}")
+
+
+def benchmark_lns(instances=None, time_limit=60, mip_gap=0.05, params=None, quiet=True, workers=None,
+                  checkpoints=(0.1, 0.25, 0.5, 1.0)):
+    """
+    Solve each standard instance with the plain MILP and with LNS under the same time limit.
+
+    Returns:
+        list: One row dict per (instance, method) with the best objective
+        reached by each checkpoint (fraction of the time limit)
+    """
+    rows = []
+    for instance in (instances or list(STANDARD_INSTANCES)):
+        for method in ('milp', 'lns'):
+            run_params = {**DEFAULT_PARAMS, **(params or {}), 'builder': 'matrix', 'lns': method == 'lns',
+                          'workers': workers, 'time_limit': time_limit, 'mip_gap': mip_gap}
+            result, wall = run_scheduler(instance, run_params, quiet)
+            stats = result.get('stats', {})
+            trace = stats.get('incumbents') or []
+            reached = {}
+            for fraction in checkpoints:
+                values = [objective for seconds, objective in trace if seconds <= fraction * time_limit]
+                reached[fraction] = max(values) if values else None
+            rows.append({
+                'instance': instance,
+                'method': method,
+                'objective': stats.get('objective'),
+                'bound': stats.get('bound'),
+                'reached': reached,
+                'wall_time': wall
+            })
+    return rows
+
+
+def print_lns_table(rows, time_limit):
+    fractions = list(rows[0]['reached']) if rows else []
+    header = ''.join(f"{f'@{fraction * time_limit:.0f}s':>10}" for fraction in fractions)
+    print(f"{'instance':<12}{'method':<7}{header}{'final':>10}{'bound':>10}{'wall s':>9}")
+    for row in rows:
+        reached = ''.join(f"{_fmt(row['reached'][fraction], '.4f'):>10}" for fraction in fractions)
+        print(f"{row['instance']:<12}{row['method']:<7}{reached}{_fmt(row['objective'], '.4f'):>10}"
+              f"{_fmt(row['bound'], '.4f'):>10}{row['wall_time']:>9.1f}")
+
+
+def print_season_table(rows):
+    print(f"{'instance':<12}{'mode':<8}{'weeks':>6}{'hours range':>13}{'hours std':>11}"
+          f"{'thu range':>11}{'most shared':>13}{'wall s':>9}")
+    for row in rows:
+        print(f"{row['instance']:<12}{row['mode']:<8}{row['weeks']:>6}{row['hours_spread']:>13.0f}"
+              f"{row['hours_std']:>11.2f}{row['thursday_spread']:>11.0f}{row['most_shared']:>13}"
+              f"{row['wall_time']:>9.1f}")
+
+
+def print_decomposition_table(rows):
+    print(f"{'instance':<12}{'mono obj':>10}{'mono s':>8}{'day obj':>10}{'day s':>8}{'rounds':>8}"
+          f"{'vs mono':>9}{'vs bound':>10}")
+    for row in rows:
+        print(f"{row['instance']:<12}{_fmt(row['mono_objective'], '.4f'):>10}{_fmt(row['mono_time'], '.2f'):>8}"
+              f"{_fmt(row['split_objective'], '.4f'):>10}{_fmt(row['split_time'], '.2f'):>8}{row['rounds']:>8}"
+              f"{_fmt(row['gap_to_mono'], '.2%'):>9}{_fmt(row['gap_to_bound'], '.2%'):>10}")
+
+
+def print_warm_start_table(rows):
+    print(f"{'instance':<12}{'start':<7}{'status':<12}{'1st inc s':>10}{'objective':>11}{'gap':>9}{'solve s':>9}")
+    for row in rows:
+        print(f"{row['instance']:<12}{row['start']:<7}{row['status']:<12}"
+              f"{_fmt(row['first_incumbent'], '.2f'):>10}{_fmt(row['objective'], '.4f'):>11}"
+              f"{_fmt(row['gap'], '.2%'):>9}{_fmt(row['solve_time'], '.2f'):>9}")
+
+
+def print_table(rows):
+    print(f"{'instance':<12}{'backend':<14}{'status':<12}{'objective':>11}{'gap':>9}"
+          f"{'build s':>9}{'solve s':>9}{'vars':>8}{'cons':>8}")
+    for row in rows:
+        print(f"{row['instance']:<12}{row['backend']:<14}{row['status']:<12}"
+              f"{_fmt(row['objective'], '.4f'):>11}{_fmt(row['gap'], '.2%'):>9}"
+              f"{_fmt(row['build_time'], '.2f'):>9}{_fmt(row['solve_time'], '.2f'):>9}"
+              f"{_fmt(row['variables'], 'd'):>8}{_fmt(row['constraints'], 'd'):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare solver backends on standard instances.")
+    parser.add_argument('--instances', nargs='+', choices=list(STANDARD_INSTANCES), default=None)
+    parser.add_argument('--backends', nargs='+', choices=SOLVER_PREFERENCE + ['local_search'], default=None)
+    parser.add_argument('--time-limit', type=float, default=60)
+    parser.add_argument('--mip-gap', type=float, default=0.05)
+    parser.add_argument('--builder', choices=['pyomo', 'matrix', 'auto'], default='pyomo',
+                        help="Model builder (matrix = sparse arrays solved without Pyomo)")
+    parser.add_argument('--warm-start', action='store_true',
+                        help="Compare cold and warm-started solves instead of backends")
+    parser.add_argument('--decompose', action='store_true',
+                        help="Compare the weekly model with the parallel day decomposition")
+    parser.add_argument('--symmetry', action='store_true',
+                        help="Compare solves with and without symmetry breaking")
+    parser.add_argument('--season', type=int, default=None, metavar='WEEKS',
+                        help="Compare a rolling-horizon season of WEEKS weeks with independent weekly solves")
+    parser.add_argument('--repair', action='store_true',
+                        help="Compare repairing a dropout with re-optimizing the week")
+    parser.add_argument('--lns', action='store_true',
+                        help="Compare objective over time of the plain MILP and large-neighborhood search")
+    parser.add_argument('--workers', type=int, default=None, help="Processes for --decompose and --lns")
+    parser.add_argument('--verbose', action='store_true', help="Show optimizer and solver logs")
+    args = parser.parse_args()
+
+    if args.decompose:
+        print_decomposition_table(benchmark_decomposition(args.instances, args.time_limit, args.mip_gap,
+                                                          quiet=not args.verbose, workers=args.workers))
+        return
+
+    if args.lns:
+        print_lns_table(benchmark_lns(args.instances, args.time_limit, args.mip_gap, quiet=not args.verbose,
+                                      workers=args.workers), args.time_limit)
+        return
+
+    if args.repair:
+        print_repair_table(benchmark_repair(args.instances, args.time_limit, args.mip_gap, quiet=not args.verbose))
+        return
+
+    if args.season:
+        print_season_table(benchmark_season(args.season, args.instances, args.time_limit, args.mip_gap,
+                                            quiet=not args.verbose))
+        return
+
+    if args.symmetry:
+        builder = 'matrix' if args.builder == 'pyomo' else args.builder
+        print_symmetry_table(benchmark_symmetry(args.instances, args.time_limit, args.mip_gap,
+                                                quiet=not args.verbose, builder=builder))
+        return
+
+    if args.warm_start:
+        builder = 'matrix' if args.builder == 'pyomo' else args.builder
+        print_warm_start_table(benchmark_warm_start(args.instances, args.time_limit, args.mip_gap,
+                                                    quiet=not args.verbose, builder=builder))
+        return
+
+    print(f"Available backends: {', '.join(available_backends()) or 'none'}")
+    rows = benchmark_backends(args.instances, args.backends, args.time_limit, args.mip_gap,
+                              quiet=not args.verbose, builder=args.builder)
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
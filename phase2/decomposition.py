@@ -0,0 +1,305 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from phase2.Ref import Ref
+from phase2.matrix_builder import MatrixModel
+from phase2.schedule_index import ScheduleIndex
+from phase2.warm_start import construct_schedule, solution_values
+
+
+def _solve_day(task):
+    """
+    Solve one night as its own MILP (runs in a worker process).
+
+    The night's refs carry their hour budget as max hours, and balancing
+    measures each ref's hours against their target for the night.
+
+    Returns:
+        dict: 'day', 'positions' (ref, position in the night's game list) pairs,
+        'termination', 'objective', 'runtime' and 'warm_start' (whether the
+        night's greedy schedule was its MIP start)
+    """
+    refs, games = task['refs'], task['games']
+    # The week's time slots, so shift blocks break at the same gaps as in the weekly model
+    index = ScheduleIndex(refs, games, task['times'])
+    position = {id(game): i for i, game in enumerate(games)}
+
+    fixed_pairs = index.fixed_pairs()[0]
+
+    targets = task['targets']
+    model = MatrixModel(index, task['max_hours_per_day'], task['max_hours_per_day'], fixed_pairs,
+                        task['families'], task['skill_combo_formulation'], task['normalizers'], targets)
+
+    start_vector = None
+    heuristic = None
+    if task['warm_start']:
+        heuristic = construct_schedule(index, task['max_hours_per_day'], task['max_hours_per_day'], fixed_pairs)
+    if heuristic is not None and heuristic['complete']:
+        values = solution_values(index, heuristic['pairs'], task['normalizers'], task['skill_combo_formulation'])
+        hours = np.bincount([r for r, _ in heuristic['pairs']], minlength=index.num_refs)
+        values['d'] = {r: abs(hours[r] - targets[r]) for r in values['d']}
+        start_vector = model.start_vector(values)
+
+    result, solution = model.solve(task['weights'], task['solver'], task['time_limit'], task['mip_gap'],
+                                   threads=1, tee=False, start=start_vector)
+    positions = []
+    if solution is not None:
+        positions = [(r, position[id(index.game_list[k])]) for r, k in model.selected_pairs(solution)]
+    return {'day': task['day'], 'positions': positions, 'termination': result.termination,
+            'objective': result.objective, 'runtime': result.runtime, 'warm_start': start_vector is not None}
+
+
+class DayDecomposition:
+    def __init__(self, index, max_hours_per_week, max_hours_per_day, weights, normalizers, fixed_pairs=(),
+                 families=None, skill_combo_formulation='pairs', solver='auto', mip_gap=0.05, workers=None,
+                 warm_start=True):
+        """
+        Solve a week as one MILP per night, coordinated through hour budgets.
+
+        Only the weekly cap (rule3) and the balancing term couple nights. Each
+        ref's weekly cap is split into per-night hour budgets and their share of
+        the mean hours into per-night targets. Every night is solved in parallel
+        with balancing measured against its targets (the sum of the nightly
+        deviations bounds the weekly one), and between rounds:
+          - unused budget moves to nights where the ref hit their budget, and
+            nights that could not be staffed get budget from nights with slack;
+          - targets move to where each ref actually worked, with the ref's
+            weekly surplus or deficit spread over the nights with room.
+        The merged week is scored with the full weekly objective every round
+        and the best round is kept.
+
+        Args:
+            index: ScheduleIndex for the week
+            max_hours_per_week, max_hours_per_day: Hour caps
+            weights: Component -> weight dict
+            normalizers: normalization_constants(index) for the whole week
+            fixed_pairs: Week (r, k) manual assignments
+            families: Objective families built for the week
+            skill_combo_formulation: 'pairs' (default) or 'spread'
+            solver: Matrix solver for the nights ('auto', 'highspy', 'scipy')
+            mip_gap: Relative gap for each night
+            workers: Process pool size (None = one per CPU)
+            warm_start: Start each night from its greedy schedule when that
+                        staffs every game
+        """
+        self.index = index
+        self.max_hours_per_week = max_hours_per_week
+        self.max_hours_per_day = max_hours_per_day
+        self.weights = weights
+        self.normalizers = normalizers
+        self.fixed_pairs = list(fixed_pairs)
+        self.families = list(families if families is not None
+                             else ['balancing', 'shift_block', 'skill_combo', 'low_skill'])
+        self.skill_combo_formulation = skill_combo_formulation
+        self.solver = solver
+        self.mip_gap = mip_gap
+        self.workers = workers
+        self.warm_start = warm_start
+
+        num_refs, num_days = index.num_refs, index.num_days
+        self.caps = np.minimum(max_hours_per_week, index.ref_max_hours).astype(int)
+
+        # Games per night, and the most each ref could work each night
+        self.day_games = [[k for k in range(index.num_games) if index.game_slot[k][0] == d] for d in range(num_days)]
+        self.day_capacity = np.zeros((num_refs, num_days), dtype=int)
+        for (r, d), ks in index.pairs_by_ref_day.items():
+            hours = len({index.game_slot[k][1] for k in ks})
+            self.day_capacity[r, d] = min(hours, max_hours_per_day)
+        self.fixed_by_day = np.zeros((num_refs, num_days), dtype=int)
+        for r, k in self.fixed_pairs:
+            self.fixed_by_day[r, index.game_slot[k][0]] += 1
+
+        # The full weekly model, only used to score merged schedules
+        self.week_model = MatrixModel(index, max_hours_per_week, max_hours_per_day, self.fixed_pairs,
+                                      self.families, skill_combo_formulation, normalizers)
+
+    def initial_budgets(self):
+        """Split each weekly cap over the nights in proportion to what the ref can work."""
+        budgets = self.day_capacity.copy()
+        for r in range(self.index.num_refs):
+            total = self.day_capacity[r].sum()
+            if total <= self.caps[r]:
+                continue  # the weekly cap never binds for this ref
+            share = self.caps[r] * self.day_capacity[r] / total
+            budgets[r] = np.floor(share).astype(int)
+            # Hand out the remainder by largest fractional share
+            for d in np.argsort(-(share - budgets[r]))[:self.caps[r] - budgets[r].sum()]:
+                budgets[r, d] += 1
+        return np.maximum(budgets, self.fixed_by_day)
+
+    def rebalance(self, budgets, used, failed_days):
+        """
+        Move budget from nights where a ref had slack to nights where it was short.
+
+        Returns:
+            ndarray: New budgets (never above a ref's weekly cap)
+        """
+        budgets = budgets.copy()
+        for r in range(self.index.num_refs):
+            if self.day_capacity[r].sum() <= self.caps[r]:
+                continue
+            # Nights wanting more: budget was binding, or the night could not be staffed
+            wanting = [d for d in range(self.index.num_days)
+                       if budgets[r, d] < self.day_capacity[r, d]
+                       and (used[r, d] >= budgets[r, d] or d in failed_days)]
+            # Prefer feeding unstaffed nights first
+            wanting.sort(key=lambda d: d not in failed_days)
+            spare = [d for d in range(self.index.num_days)
+                     if used[r, d] < budgets[r, d] and budgets[r, d] > self.fixed_by_day[r, d]
+                     and d not in failed_days]
+            for d in wanting:
+                if not spare:
+                    break
+                donor = max(spare, key=lambda s: budgets[r, s] - used[r, s])
+                budgets[r, donor] -= 1
+                budgets[r, d] += 1
+                if budgets[r, donor] <= max(used[r, donor], self.fixed_by_day[r, donor]):
+                    spare.remove(donor)
+        return budgets
+
+    def initial_targets(self, budgets, mean_hours):
+        """Place each ref's share of the mean hours on as few nights as their budgets allow."""
+        targets = np.zeros(budgets.shape)
+        for r in range(self.index.num_refs):
+            want = int(round(min(mean_hours, self.caps[r])))
+            for d in np.argsort(-budgets[r], kind='stable'):
+                take = min(want, budgets[r, d])
+                targets[r, d] = take
+                want -= take
+        return targets
+
+    def update_targets(self, budgets, used):
+        """
+        Re-target each night from the hours actually worked.
+
+        Targets are whole hours, moved one at a time so each ref's hours stay
+        on few nights (every night worked is at least one shift start): a ref
+        above the week's mean gives hours back from their shortest night, and a
+        ref below it gains them on nights they already work before new ones.
+        """
+        hours = used.sum(axis=1)
+        mean_hours = hours.mean() if len(hours) else 0.0
+        targets = used.copy()
+        for r in range(self.index.num_refs):
+            error = int(round(min(mean_hours, self.caps[r]) - hours[r]))
+            for _ in range(abs(error)):
+                if error > 0:
+                    room = [d for d in range(self.index.num_days) if targets[r, d] < budgets[r, d]]
+                    if not room:
+                        break
+                    d = max(room, key=lambda d: (targets[r, d] > 0, budgets[r, d] - targets[r, d]))
+                    targets[r, d] += 1
+                else:
+                    spare = [d for d in range(self.index.num_days) if targets[r, d] > self.fixed_by_day[r, d]]
+                    if not spare:
+                        break
+                    d = min(spare, key=lambda d: targets[r, d])
+                    targets[r, d] -= 1
+        return targets.astype(float)
+
+    def _tasks(self, budgets, targets, time_limit):
+        index = self.index
+        tasks = []
+        for d in range(index.num_days):
+            games = [index.game_list[k] for k in self.day_games[d]]
+            day_numbers = {game.get_number() for game in games}
+            refs = []
+            for r, ref in enumerate(index.refs):
+                night = Ref(ref.get_name(), index.availability[r, d].tolist(),
+                            ref.get_email(), ref.get_phone_number(), ref.get_experience(), ref.get_effort())
+                night.set_max_hours(int(budgets[r, d]))
+                night.set_assigned_games([n for n in ref.get_assigned_games() if n in day_numbers])
+                refs.append(night)
+            tasks.append({
+                'day': d, 'refs': refs, 'games': games, 'times': index.sorted_times, 'targets': targets[:, d],
+                'weights': self.weights, 'normalizers': self.normalizers, 'families': self.families,
+                'max_hours_per_day': self.max_hours_per_day,
+                'skill_combo_formulation': self.skill_combo_formulation,
+                'solver': self.solver, 'time_limit': time_limit, 'mip_gap': self.mip_gap,
+                'warm_start': self.warm_start
+            })
+        return tasks
+
+    def evaluate(self, pairs):
+        """Score a week of (r, k) pairs with the full weekly model."""
+        vector = self.week_model.start_vector(solution_values(self.index, pairs, self.normalizers,
+                                                              self.skill_combo_formulation))
+        activity = self.week_model.matrix() @ vector
+        violation = max(0.0, float(np.max(self.week_model.row_lower - activity, initial=0.0)),
+                        float(np.max(activity - self.week_model.row_upper, initial=0.0)))
+        objective = float(self.week_model.objective(self.weights) @ vector)
+        return objective, self.week_model.component_values(vector), violation <= 1e-6
+
+    def solve(self, time_limit=240, max_iterations=4, verbose=True):
+        """
+        Run the budget/target rounds.
+
+        Args:
+            time_limit: Total seconds; each round gets an equal share per night
+            max_iterations: Rounds of budget and target re-balancing
+            verbose: Print progress per round
+
+        Returns:
+            dict: 'success', 'pairs' (week (r, k)), 'objective', 'components',
+            'iterations' (per-round log), 'runtime' and 'warm_start' (whether
+            any night had a MIP start)
+        """
+        start = time.time()
+        index = self.index
+        budgets = self.initial_budgets()
+        # Every game staffed to MIN_REF is the usual weekly total
+        targets = self.initial_targets(budgets, index.game_min_refs.sum() / max(index.num_refs, 1))
+        round_limit = time_limit / max_iterations
+        best = None
+        history = []
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for iteration in range(max_iterations):
+                round_start = time.time()
+                results = list(pool.map(_solve_day, self._tasks(budgets, targets, round_limit)))
+
+                pairs = []
+                used = np.zeros_like(budgets)
+                failed_days = set()
+                for day_result in results:
+                    d = day_result['day']
+                    if day_result['objective'] is None:
+                        failed_days.add(d)
+                        continue
+                    for r, position in day_result['positions']:
+                        pairs.append((r, self.day_games[d][position]))
+                        used[r, d] += 1
+
+                entry = {'iteration': iteration + 1, 'failed_days': sorted(index.sorted_days[d] for d in failed_days),
+                         'night_times': [day_result['runtime'] for day_result in results],
+                         'warm_starts': sum(day_result['warm_start'] for day_result in results),
+                         'wall_time': time.time() - round_start}
+                if not failed_days:
+                    objective, components, feasible = self.evaluate(sorted(pairs))
+                    entry.update(objective=objective, feasible=feasible)
+                    if feasible and (best is None or objective > best['objective']):
+                        best = {'pairs': sorted(pairs), 'objective': objective, 'components': components}
+                history.append(entry)
+                if verbose:
+                    status = (f"objective {entry['objective']:.4f}" if 'objective' in entry
+                              else f"unstaffed nights: {', '.join(entry['failed_days'])}")
+                    print(f"Round {iteration + 1}: {status} ({entry['wall_time']:.2f}s)")
+
+                new_budgets = self.rebalance(budgets, used, failed_days)
+                new_targets = targets if failed_days else self.update_targets(new_budgets, used)
+                converged = (not failed_days and np.array_equal(new_budgets, budgets)
+                             and np.allclose(new_targets, targets, atol=1e-6))
+                budgets, targets = new_budgets, new_targets
+                if converged:
+                    break
+
+        runtime = time.time() - start
+        warm_start = any(entry['warm_starts'] for entry in history)
+        if best is None:
+            return {'success': False, 'error': 'Could not staff every night within the hour budgets',
+                    'iterations': history, 'runtime': runtime, 'warm_start': warm_start}
+        return {'success': True, 'pairs': best['pairs'], 'objective': best['objective'],
+                'components': best['components'], 'iterations': history, 'runtime': runtime,
+                'warm_start': warm_start}
@@ -0,0 +1,353 @@
+import numpy as np
+
+from phase2.objective import COMPONENTS, COMPONENT_SIGNS, normalization_constants
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+
+
+def assignment_matrix(index, pairs):
+    """
+    Ref x game 0/1 matrix of a schedule.
+
+    Args:
+        index: ScheduleIndex for the week
+        pairs: (r, k) assignments
+
+    Returns:
+        np.ndarray: (num_refs, num_games) int8 matrix
+    """
+    assignment = np.zeros((index.num_refs, index.num_games), dtype=np.int8)
+    pairs = np.array(list(pairs), dtype=int).reshape(-1, 2)
+    assignment[pairs[:, 0], pairs[:, 1]] = 1
+    return assignment
+
+
+class ScheduleEvaluator:
+    def __init__(self, index, normalizers=None, max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                 max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY, fixed_pairs=(),
+                 skill_combo_formulation='pairs', prior_hours=None):
+        """
+        Score any schedule of a week without building a model.
+
+        Computes the five objective components with the same formulas and
+        normalization constants as the Pyomo and matrix models, and the
+        hard constraints each schedule breaks, from a ref x game assignment
+        matrix (see assignment_matrix). Everything per week is precomputed
+        here, so each evaluation is a handful of array operations (under a
+        millisecond for a 40-ref, 70-game week) and one evaluator can score
+        any number of schedules, e.g. heuristic candidates or manual edits.
+
+        Args:
+            index: ScheduleIndex for the week
+            normalizers: normalization_constants(index) (computed if omitted)
+            max_hours_per_week, max_hours_per_day: Hour caps
+            fixed_pairs: (r, k) manual assignments a schedule must keep
+            skill_combo_formulation: 'pairs' (default) or 'spread'
+            prior_hours: Optional hours each ref already worked this season;
+                         balancing then measures season totals, as in a
+                         season week's MatrixModel
+        """
+        self.index = index
+        self.prior_hours = None if prior_hours is None else np.asarray(prior_hours, dtype=float)
+        self.norm = normalizers if normalizers is not None else normalization_constants(index)
+        self.max_hours_per_day = max_hours_per_day
+        self.skill_combo_formulation = skill_combo_formulation
+        self.fixed_pairs = sorted(set(fixed_pairs))
+        norm = self.norm
+
+        num_games = index.num_games
+        self.caps = np.minimum(max_hours_per_week, index.ref_max_hours)
+        self.game_day = np.array([d for d, _, _ in index.game_slot], dtype=int)
+        self.game_time = np.array([h for _, h, _ in index.game_slot], dtype=int)
+        # a_{r,d,h} of each game's slot, whatever pairs presolve has dropped since
+        self.available = index.availability[:, self.game_day, self.game_time].astype(bool)
+        # One column per (d, h): works = assignment @ game_slot_matrix
+        self.game_slot_matrix = np.zeros((num_games, index.num_days * index.num_times), dtype=np.int32)
+        self.game_slot_matrix[np.arange(num_games), self.game_day * index.num_times + self.game_time] = 1
+
+        self.in_C = np.zeros(index.num_refs, dtype=bool)
+        self.in_C[norm['C_set']] = True
+        num_C = len(norm['C_set'])
+        L = norm['NUM_GAMES']
+        self.effort_scale = 1.0 / (num_C * norm['EFFORT_NORMALIZER']) if num_C else 0.0
+        self.balancing_scale = 1.0 / (num_C * norm['BALANCING_NORMALIZER']) if num_C else 0.0
+        self.skill_scale = 1.0 / (L * norm['SKILL_NORMALIZER']) if L and norm['SKILL_NORMALIZER'] else 0.0
+        self.start_scale = 1.0 / norm['TB_NORMALIZER']
+        self.combo_scale = 1.0 / norm['COMBO_NORMALIZER'] if L and norm['COMBO_NORMALIZER'] else 0.0
+
+        # GEx_k / MEAN_DIFFICULTY - REx_i / MEAN_SKILL for every (ref, game)
+        self.deficit = (index.game_difficulty[None, :] / norm['MEAN_DIFFICULTY']
+                        - index.ref_experience[:, None] / norm['MEAN_SKILL'])
+        # Games the skill combo term covers: more than one candidate ref and seat
+        self.combo_game = np.array([len(index.pairs_by_game[k]) > 1 and index.game_max_refs[k] > 1
+                                    for k in range(num_games)], dtype=bool)
+        experience = index.ref_experience
+        self.experience_gap = np.abs(experience[:, None] - experience[None, :])
+
+    def hours(self, assignment):
+        """Games per ref."""
+        return assignment.sum(axis=1)
+
+    def works(self, assignment):
+        """(ref, day, time) games worked."""
+        index = self.index
+        return (assignment.astype(np.int32) @ self.game_slot_matrix).reshape(index.num_refs, index.num_days,
+                                                                            index.num_times)
+
+    def components(self, assignment):
+        """
+        Pre-weight value of each objective component.
+
+        Args:
+            assignment: (num_refs, num_games) 0/1 matrix
+
+        Returns:
+            dict: Component name -> value, as model.component_values reports it
+        """
+        index = self.index
+        assignment = np.asarray(assignment)
+        hours = self.hours(assignment)
+        totals = hours if self.prior_hours is None else hours + self.prior_hours
+        h_bar = totals.sum() / index.num_refs if index.num_refs else 0.0
+
+        works = self.works(assignment) > 0
+        starts = works[:, :, :1].sum() + (works[:, :, 1:] & ~works[:, :, :-1]).sum()
+
+        crew = assignment.sum(axis=0)
+        u = np.maximum((assignment * self.deficit).sum(axis=0), 0.0)
+
+        combo = self.combo_game & (crew > 1)
+        if self.skill_combo_formulation == 'pairs':
+            # sum_{i<j} |REx_i - REx_j| x_ik x_jk = x_k' A x_k / 2
+            chosen = assignment[:, combo].astype(float)
+            combo_value = float((chosen * (self.experience_gap @ chosen)).sum() / 2)
+        else:
+            experience = index.ref_experience[:, None]
+            taken = assignment[:, combo] > 0
+            combo_value = float((np.where(taken, experience, -np.inf).max(axis=0)
+                                 - np.where(taken, experience, np.inf).min(axis=0)).sum())
+
+        return {
+            'effort': float((index.ref_effort * hours)[self.in_C].sum()) * self.effort_scale,
+            'balancing': float(np.abs(totals[self.in_C] - h_bar).sum()) * self.balancing_scale,
+            'low_skill': float(u.sum()) * self.skill_scale,
+            'shift_block': float(starts) * self.start_scale,
+            'skill_combo': combo_value * self.combo_scale
+        }
+
+    def violations(self, assignment):
+        """
+        Hard constraints a schedule breaks.
+
+        Args:
+            assignment: (num_refs, num_games) 0/1 matrix
+
+        Returns:
+            dict: 'short' {k: refs missing below MIN_REF}, 'over_max' {k: refs
+            above MAX_REF}, 'over_day' {(r, d): hours over max_hours_per_day},
+            'over_week' {r: hours over the weekly cap}, 'double_booked'
+            {(r, d, h): games in that hour, when more than one}, 'unavailable'
+            ((r, k) assignments outside the ref's availability) and
+            'manual_missing' (manual (r, k) assignments not in the schedule);
+            'short', 'over_day' and 'over_week' use model.violations' format
+        """
+        index = self.index
+        assignment = np.asarray(assignment)
+        crew = assignment.sum(axis=0)
+        works = self.works(assignment)
+        over_day = works.sum(axis=2) - self.max_hours_per_day
+        over_week = self.hours(assignment) - self.caps
+
+        short = np.maximum(index.game_min_refs - crew, 0)
+        return {
+            'short': {int(k): int(short[k]) for k in np.nonzero(short)[0]},
+            'over_max': {int(k): int(crew[k] - index.game_max_refs[k])
+                         for k in np.nonzero(crew > index.game_max_refs)[0]},
+            'over_day': {(int(r), int(d)): int(over_day[r, d]) for r, d in zip(*np.nonzero(over_day > 0))},
+            'over_week': {int(r): int(over_week[r]) for r in np.nonzero(over_week > 0)[0]},
+            'double_booked': {(int(r), int(d), int(h)): int(works[r, d, h])
+                              for r, d, h in zip(*np.nonzero(works > 1))},
+            'unavailable': [(int(r), int(k)) for r, k in zip(*np.nonzero((assignment > 0) & ~self.available))],
+            'manual_missing': [(r, k) for r, k in self.fixed_pairs if not assignment[r, k]]
+        }
+
+    def evaluate(self, assignment, weights=None):
+        """
+        Components, weighted objective and violations of one schedule.
+
+        Args:
+            assignment: (num_refs, num_games) 0/1 matrix, or a list of (r, k) pairs
+            weights: Optional component -> weight dict
+
+        Returns:
+            dict: 'components', 'objective' (the model's objective without
+            slack penalties; None without weights), 'hours' (per ref),
+            'violations' and 'feasible' (no hard constraint broken)
+        """
+        if not isinstance(assignment, np.ndarray):
+            assignment = assignment_matrix(self.index, assignment)
+        components = self.components(assignment)
+        violations = self.violations(assignment)
+        objective = None
+        if weights is not None:
+            objective = sum(COMPONENT_SIGNS[name] * weights.get(name, 0.0) * components[name] for name in COMPONENTS)
+        return {
+            'components': components,
+            'objective': objective,
+            'hours': self.hours(assignment),
+            'violations': violations,
+            'feasible': not any(violations.values())
+        }
+
+
+# Violation kinds LiveScore counts, in reporting order: refs short of MIN_REF, refs over
+# MAX_REF, hours over the nightly and weekly caps, extra games in one hour, assignments
+# outside availability and manual assignments dropped
+VIOLATION_KINDS = ['short', 'over_max', 'over_day', 'over_week', 'double_booked', 'unavailable', 'manual_missing']
+
+
+class LiveScore:
+    def __init__(self, evaluator, pairs=(), weights=None):
+        """
+        Incremental score of a schedule being edited by hand.
+
+        Keeps the raw sums behind every component and violation count, so
+        adding or removing one (ref, game) assignment only re-reads that
+        ref's hours, its night and hour, and that game's crew. Balancing is
+        kept as a histogram of hours over the C refs, so even the moving mean
+        costs one pass over the distinct hour values, not over the refs.
+        Totals always equal ScheduleEvaluator.evaluate of the same schedule.
+
+        Args:
+            evaluator: ScheduleEvaluator for the week (without prior_hours)
+            pairs: (r, k) assignments of the starting schedule
+            weights: Component -> weight dict (default: all 1.0)
+        """
+        if evaluator.prior_hours is not None:
+            raise ValueError("LiveScore balances weekly hours; the evaluator must not carry season hours")
+        self.evaluator = evaluator
+        self.weights = weights or {name: 1.0 for name in COMPONENTS}
+        index = evaluator.index
+        self.crews = [set() for _ in range(index.num_games)]
+        self.hours = np.zeros(index.num_refs, dtype=int)
+        self.works = np.zeros((index.num_refs, index.num_days, index.num_times), dtype=int)
+        self.hour_counts = {0: int(evaluator.in_C.sum())}  # hours -> refs in C with that many
+        self.fixed = set(evaluator.fixed_pairs)
+        self.sums = {'effort': 0.0, 'low_skill': 0.0, 'shift_block': 0, 'skill_combo': 0.0}
+        self.counts = {kind: 0 for kind in VIOLATION_KINDS}
+        # Empty schedule: every game is short its MIN_REF and every manual assignment is missing
+        self.counts['short'] = int(index.game_min_refs.sum())
+        self.counts['manual_missing'] = len(self.fixed)
+        for r, k in pairs:
+            self.add(r, k)
+
+    def _local(self, r, k):
+        """Raw sums and violation counts that depend on ref r's night of game k and on game k."""
+        evaluator = self.evaluator
+        index = evaluator.index
+        d, h = evaluator.game_day[k], evaluator.game_time[k]
+        crew = self.crews[k]
+        row = self.works[r, d] > 0
+        starts = int(row[0]) + int(np.count_nonzero(row[1:] & ~row[:-1]))
+        u = max(0.0, float(sum(evaluator.deficit[i, k] for i in crew)))
+        combo = 0.0
+        if evaluator.combo_game[k] and len(crew) > 1:
+            experience = [index.ref_experience[i] for i in crew]
+            if evaluator.skill_combo_formulation == 'pairs':
+                combo = float(sum(abs(a - b) for n, a in enumerate(experience) for b in experience[n + 1:]))
+            else:
+                combo = float(max(experience) - min(experience))
+        assigned = r in crew
+        effort = float(index.ref_effort[r] * self.hours[r]) if evaluator.in_C[r] else 0.0
+        counts = {
+            'short': max(int(index.game_min_refs[k]) - len(crew), 0),
+            'over_max': max(len(crew) - int(index.game_max_refs[k]), 0),
+            'over_day': max(int(self.works[r, d].sum()) - evaluator.max_hours_per_day, 0),
+            'over_week': max(int(self.hours[r] - evaluator.caps[r]), 0),
+            'double_booked': max(int(self.works[r, d, h]) - 1, 0),
+            'unavailable': int(assigned and not evaluator.available[r, k]),
+            'manual_missing': int((r, k) in self.fixed and not assigned)
+        }
+        return {'effort': effort, 'low_skill': u, 'shift_block': starts, 'skill_combo': combo}, counts
+
+    def _balancing(self):
+        index = self.evaluator.index
+        h_bar = self.hours.sum() / index.num_refs if index.num_refs else 0.0
+        return float(sum(count * abs(hours - h_bar) for hours, count in self.hour_counts.items()))
+
+    def _edit(self, r, k, change):
+        evaluator = self.evaluator
+        d, h = evaluator.game_day[k], evaluator.game_time[k]
+        before = self.snapshot()
+        sums, counts = self._local(r, k)
+        if evaluator.in_C[r]:
+            self.hour_counts[self.hours[r]] -= 1
+            self.hour_counts[self.hours[r] + change] = self.hour_counts.get(self.hours[r] + change, 0) + 1
+        self.hours[r] += change
+        self.works[r, d, h] += change
+        if change > 0:
+            self.crews[k].add(r)
+        else:
+            self.crews[k].remove(r)
+        new_sums, new_counts = self._local(r, k)
+        for name in sums:
+            self.sums[name] += new_sums[name] - sums[name]
+        for kind in counts:
+            self.counts[kind] += new_counts[kind] - counts[kind]
+        after = self.snapshot()
+        return {
+            'objective': after['objective'] - before['objective'],
+            'components': {name: after['components'][name] - before['components'][name] for name in COMPONENTS},
+            'violations': {kind: after['violations'][kind] - before['violations'][kind] for kind in VIOLATION_KINDS}
+        }
+
+    @staticmethod
+    def _unchanged():
+        return {'objective': 0.0, 'components': {name: 0.0 for name in COMPONENTS},
+                'violations': {kind: 0 for kind in VIOLATION_KINDS}}
+
+    def add(self, r, k):
+        """
+        Assign ref r to game k.
+
+        Returns:
+            dict: The edit's change in 'objective', in each pre-weight
+            component ('components') and in each violation count ('violations');
+            all zero if r already works game k
+        """
+        if r in self.crews[k]:
+            return self._unchanged()
+        return self._edit(r, k, 1)
+
+    def remove(self, r, k):
+        """Take ref r off game k (see add for the returned changes)."""
+        if r not in self.crews[k]:
+            return self._unchanged()
+        return self._edit(r, k, -1)
+
+    def pairs(self):
+        """(r, k) assignments of the current schedule, sorted."""
+        return sorted((r, k) for k, crew in enumerate(self.crews) for r in crew)
+
+    def snapshot(self):
+        """
+        Current score.
+
+        Returns:
+            dict: 'components', 'objective', 'violations' (count per kind, see
+            VIOLATION_KINDS) and 'feasible'
+        """
+        evaluator = self.evaluator
+        components = {
+            'effort': self.sums['effort'] * evaluator.effort_scale,
+            'balancing': self._balancing() * evaluator.balancing_scale,
+            'low_skill': self.sums['low_skill'] * evaluator.skill_scale,
+            'shift_block': self.sums['shift_block'] * evaluator.start_scale,
+            'skill_combo': self.sums['skill_combo'] * evaluator.combo_scale
+        }
+        objective = sum(COMPONENT_SIGNS[name] * self.weights.get(name, 0.0) * components[name] for name in COMPONENTS)
+        return {
+            'components': components,
+            'objective': objective,
+            'violations': dict(self.counts),
+            'feasible': not any(self.counts.values())
+        }
@@ -0,0 +1,183 @@
+import time
+
+import numpy as np
+
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+
+
+class FeasibilityReport:
+    def __init__(self, index, demand, flow, unmet, blocked_games, runtime):
+        """
+        Outcome of the staffing max-flow check.
+
+        Args:
+            index: ScheduleIndex the check ran on
+            demand: Seats that must be filled (MIN_REF minus manual assignments, summed)
+            flow: Most of those seats any schedule can fill
+            unmet: Game k -> seats left empty by the maximum flow that was found
+            blocked_games: Games on the sink side of the minimal minimum cut: together
+                           they need more refs than can reach them, whatever the rest
+                           of the schedule looks like
+            runtime: Seconds
+        """
+        self.index = index
+        self.demand = demand
+        self.flow = flow
+        self.unmet = unmet
+        self.blocked_games = blocked_games
+        self.runtime = runtime
+
+    @property
+    def feasible(self):
+        return self.flow >= self.demand
+
+    @property
+    def shortage(self):
+        """Refs missing in total; exact (no schedule does better)."""
+        return self.demand - self.flow
+
+    def slot_shortages(self):
+        """
+        The blocked games grouped by slot.
+
+        Returns:
+            list: One dict per slot ('day', 'time', 'games' (numbers), 'needed',
+            'available' (refs who could still take one of these games) and
+            'missing'), in day/time order
+        """
+        index = self.index
+        by_slot = {}
+        for k in self.blocked_games:
+            d, h, _ = index.game_slot[k]
+            by_slot.setdefault((d, h), []).append(k)
+        rows = []
+        for (d, h), games in sorted(by_slot.items()):
+            refs = {r for k in games for r in index.pairs_by_game[k]}
+            rows.append({
+                'day': index.sorted_days[d],
+                'time': index.sorted_times[h],
+                'games': [index.game_list[k].get_number() for k in games],
+                'needed': int(sum(index.game_min_refs[k] for k in games)),
+                'available': len(refs),
+                'missing': int(sum(self.unmet.get(k, 0) for k in games))
+            })
+        return rows
+
+    def message(self):
+        if self.feasible:
+            return f"Every game can be staffed to MIN_REF ({self.demand} seats, checked in {self.runtime * 1000:.1f} ms)"
+        slots = ', '.join(f"{row['day']} {row['time']}" for row in self.slot_shortages())
+        return (f"Cannot staff every game: {self.shortage} refs short across {len(self.blocked_games)} games "
+                f"({slots})")
+
+    def to_dict(self):
+        return {
+            'feasible': self.feasible,
+            'demand': self.demand,
+            'max_flow': self.flow,
+            'shortage': self.shortage,
+            'slots': self.slot_shortages(),
+            'runtime': self.runtime
+        }
+
+
+def staffing_check(index, fixed_pairs=(), max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                   max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY):
+    """
+    Prove every game can reach MIN_REF, or find the games that cannot.
+
+    Staffing is a flow problem: source -> ref (weekly cap) -> ref-night
+    (nightly cap) -> ref-slot (one game an hour) -> game (one seat per
+    available ref) -> sink (MIN_REF). Manual assignments are taken off the
+    capacities and demands first; they are assumed to respect the caps
+    themselves (phase2.presolve reports the ones that do not). An integral flow that fills every seat is
+    a schedule satisfying all hard constraints (rule1-3, rule5), so the MILP
+    is feasible exactly when the maximum flow equals the demand.
+
+    When it is not, the games that can still reach the sink in the residual
+    graph form the smallest set of games whose requirements cannot be met
+    together; the shortage (demand - max flow) is exact.
+
+    Args:
+        index: ScheduleIndex for the week
+        fixed_pairs: (r, k) manual assignments
+        max_hours_per_week, max_hours_per_day: Hour caps
+
+    Returns:
+        FeasibilityReport
+    """
+    from scipy import sparse
+    from scipy.sparse.csgraph import breadth_first_order, maximum_flow
+
+    start = time.time()
+    fixed = set(fixed_pairs)
+    num_refs, num_days, num_times, num_games = index.num_refs, index.num_days, index.num_times, index.num_games
+
+    fixed_week = np.zeros(num_refs, dtype=int)
+    fixed_day = np.zeros((num_refs, num_days), dtype=int)
+    fixed_slot = set()
+    fixed_seats = np.zeros(num_games, dtype=int)
+    for r, k in fixed:
+        d, h, _ = index.game_slot[k]
+        fixed_week[r] += 1
+        fixed_day[r, d] += 1
+        fixed_slot.add((r, d, h))
+        fixed_seats[k] += 1
+
+    # Node numbering: source, sink, refs, ref-nights, ref-slots, games
+    source, sink = 0, 1
+    ref_node = 2
+    day_node = ref_node + num_refs
+    slot_node = day_node + num_refs * num_days
+    game_node = slot_node + num_refs * num_days * num_times
+    num_nodes = game_node + num_games
+
+    week_caps = np.minimum(max_hours_per_week, index.ref_max_hours).astype(int) - fixed_week
+    day_caps = max_hours_per_day - fixed_day
+    demand = np.maximum(index.game_min_refs - fixed_seats, 0)
+
+    tails, heads, caps = [], [], []
+
+    def edge(tail, head, capacity):
+        tails.append(tail)
+        heads.append(head)
+        caps.append(capacity)
+
+    for r in range(num_refs):
+        edge(source, ref_node + r, max(int(week_caps[r]), 0))
+    for (r, d, h), ks in index.pairs_by_ref_slot.items():
+        if (r, d, h) in fixed_slot:
+            continue
+        rd = r * num_days + d
+        for k in ks:
+            if (r, k) not in fixed:
+                edge(slot_node + rd * num_times + h, game_node + k, 1)
+    for r, d in index.pairs_by_ref_day:
+        rd = r * num_days + d
+        edge(ref_node + r, day_node + rd, max(int(day_caps[r, d]), 0))
+    for r, d, h in index.pairs_by_ref_slot:
+        if (r, d, h) not in fixed_slot:
+            rd = r * num_days + d
+            edge(day_node + rd, slot_node + rd * num_times + h, 1)
+    for k in range(num_games):
+        edge(game_node + k, sink, int(demand[k]))
+
+    capacity = sparse.csr_matrix((np.asarray(caps, dtype=np.int32), (tails, heads)), shape=(num_nodes, num_nodes))
+    result = maximum_flow(capacity, source, sink)
+    flow = result.flow
+
+    game_flow = np.asarray(flow[game_node:game_node + num_games, sink].todense()).ravel()
+    unmet = {k: int(demand[k] - game_flow[k]) for k in range(num_games) if game_flow[k] < demand[k]}
+
+    blocked = []
+    if unmet:
+        # Nodes that can still push flow into the sink: u -> v has residual capacity cap - flow > 0
+        residual = (capacity - flow).tocsr()
+        residual.data[residual.data < 0] = 0
+        residual.eliminate_zeros()
+        reaches_sink = breadth_first_order(residual.T.tocsr(), sink, directed=True, return_predecessors=False)
+        blocked = sorted(int(node) - game_node for node in reaches_sink
+                         if game_node <= node < num_nodes and demand[node - game_node] > 0)
+
+    return FeasibilityReport(index, int(demand.sum()), int(result.flow_value), unmet, blocked,
+                             time.time() - start)
@@ -0,0 +1,442 @@
+import contextlib
+import json
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import time
+import uuid
+
+from phase2.progress import ProgressLog, read_progress
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+
+# Job states; the last three are final
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+# Job kinds: a Scheduler.optimize() run or a WeightSweep.pareto() run
+OPTIMIZE, WEIGHT_SWEEP = 'optimize', 'weight_sweep'
+
+# The worker exits after this many idle seconds. Its ModelCache lives only in
+# that process, so the next job after an idle exit (or a cancel) rebuilds its model.
+WORKER_IDLE_TIMEOUT = 15 * 60
+
+# worker.lock is only held for a few milliseconds; an older one was left by a killed process
+LOCK_STALE_SECONDS = 30
+
+
+def _write_json(path, data):
+    """Write through a temporary file so readers never see half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def _worker_lock(jobs_dir):
+    """
+    Hold worker.lock while the worker is checked, started or retired.
+
+    Without it two pages could both find no live worker and each start one,
+    or a worker could exit just after a job was queued for it. The lock is
+    the file itself, created with O_EXCL as in _claim, so it works the same
+    on every platform; a lock whose holder died is taken over.
+    """
+    path = os.path.join(jobs_dir, 'worker.lock')
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if _lock_stale(path):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+            else:
+                time.sleep(0.05)
+            continue
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        break
+    try:
+        yield
+    finally:
+        os.remove(path)
+
+
+def _lock_stale(path):
+    """Whether worker.lock was left behind by a process that no longer holds it."""
+    try:
+        with open(path) as f:
+            holder = f.read()
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        return False
+    # The holder writes its pid right after creating the file, so an empty lock is only stale once old
+    if holder.strip().isdigit() and not _process_alive(int(holder)):
+        return True
+    return age > LOCK_STALE_SECONDS
+
+
+def _worker_pid(jobs_dir):
+    try:
+        with open(os.path.join(jobs_dir, 'worker.pid')) as f:
+            pid = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return pid if _process_alive(pid) else None
+
+
+def _process_alive(pid):
+    if not pid:
+        return False
+    if os.name == 'nt':
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        # A worker this process started stays a zombie until it is reaped
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except ChildProcessError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+class JobRunner:
+    def __init__(self, jobs_dir='optimization_jobs'):
+        """
+        Run Scheduler.optimize() (or a weight sweep) in a background worker process.
+
+        Jobs are identified by an id and persisted under `jobs_dir/<id>/`:
+        status.json (state, timestamps, error), log.txt (everything the
+        scheduler and the solver print, written as they run),
+        progress.jsonl (incumbent/bound events, see phase2.progress),
+        incumbents.jsonl (each improving schedule with its breakdown),
+        input.pkl and, once done, result.pkl. A page can therefore poll a job, show its
+        progress and pick it up again after a rerun, a browser refresh or a
+        server restart, and no request thread ever waits on the solver.
+
+        One worker (`python -m phase2.jobs <jobs_dir>`) runs the queued jobs
+        in submission order (the solver already uses every thread) and keeps
+        its ModelCache between jobs. It is started on demand and exits after
+        WORKER_IDLE_TIMEOUT idle seconds. The cache lives in the worker only:
+        a run after an idle exit, or after cancelling the running job (which
+        terminates the worker), builds its model again. Starting the worker
+        and claiming a job are atomic, so several pages or server processes
+        can share one jobs_dir.
+
+        Args:
+            jobs_dir: Directory holding the job folders
+        """
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _ensure_worker(self):
+        with _worker_lock(self.jobs_dir):
+            if _worker_pid(self.jobs_dir) is not None:
+                return
+            package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+            with open(os.path.join(self.jobs_dir, 'worker.log'), 'a') as log:
+                # Own session: the run survives the web server being stopped
+                process = subprocess.Popen([sys.executable, '-u', '-m', 'phase2.jobs', self.jobs_dir],
+                                           stdout=log, stderr=subprocess.STDOUT, env=env, start_new_session=True)
+            with open(os.path.join(self.jobs_dir, 'worker.pid'), 'w') as f:
+                f.write(str(process.pid))
+
+    def submit(self, refs, games, params=None, kind=OPTIMIZE):
+        """
+        Queue an optimization or a weight sweep.
+
+        Args:
+            refs: List of Ref objects (copied; the caller's objects are not touched)
+            games: List of Game objects
+            params: Scheduler.set_parameters dict; for WEIGHT_SWEEP the hour caps,
+                'skill_combo_formulation', 'weight_sets', 'time_limit' (per
+                weight set), 'mip_gap' and 'workers'
+            kind: OPTIMIZE or WEIGHT_SWEEP
+
+        Returns:
+            str: Job id
+        """
+        params = params or {}
+        time_limit = params.get('time_limit', 240)
+        if kind == WEIGHT_SWEEP:
+            # The mixes are solved `workers` at a time
+            rounds = -(-len(params['weight_sets']) // (params.get('workers') or os.cpu_count() or 1))
+            time_limit *= rounds
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, 'input.pkl'), 'wb') as f:
+            pickle.dump((refs, games, params), f)
+        _write_json(os.path.join(job_dir, 'status.json'), {
+            'job_id': job_id,
+            'kind': kind,
+            'state': QUEUED,
+            'submitted': time.time(),
+            'time_limit': time_limit
+        })
+        self._ensure_worker()
+        return job_id
+
+    def status(self, job_id):
+        """
+        Current state of a job.
+
+        Returns:
+            dict: 'job_id', 'kind', 'state', 'submitted', 'time_limit' and, as they
+            happen, 'started', 'pid', 'finished', 'success', 'error'; None for
+            an unknown id. A running job whose worker has died is reported
+            failed; a queued job with no worker gets one started.
+        """
+        status_path = os.path.join(self._job_dir(job_id), 'status.json')
+        status = _read_json(status_path)
+        if status is None:
+            return None
+        if status['state'] == RUNNING and not _process_alive(status.get('pid')):
+            status = _read_json(status_path)   # the worker may have just finished it
+            if status['state'] == RUNNING:
+                status.update(state=FAILED, success=False, error='The optimization worker stopped unexpectedly',
+                              finished=time.time())
+                _write_json(status_path, status)
+        elif status['state'] == QUEUED:
+            self._ensure_worker()
+        return status
+
+    def log(self, job_id, lines=None):
+        """The job's printed output so far (the last `lines` lines if given)."""
+        try:
+            with open(os.path.join(self._job_dir(job_id), 'log.txt'), errors='replace') as f:
+                text = f.read()
+        except OSError:
+            return ''
+        if lines is None:
+            return text
+        return '\n'.join(text.splitlines()[-lines:])
+
+    def progress(self, job_id):
+        """The job's solver progress events so far (see ProgressLog)."""
+        return read_progress(os.path.join(self._job_dir(job_id), 'progress.jsonl'))
+
+    def incumbents(self, job_id):
+        """
+        Every improving schedule the job's solver has published so far, oldest first.
+
+        Returns:
+            list: Dicts with 'runtime', 'objective', 'components' and 'assignments'
+        """
+        return read_progress(os.path.join(self._job_dir(job_id), 'incumbents.jsonl'))
+
+    def stop(self, job_id):
+        """
+        Ask a running job to stop early and keep the best schedule found so far.
+
+        Honoured by the highspy solve (the matrix builder, which the worker's
+        model cache selects); other backends run to their time limit. Use
+        cancel() to discard the run instead.
+        """
+        ProgressLog(stop_path=os.path.join(self._job_dir(job_id), 'stop')).request_stop()
+
+    def result(self, job_id):
+        """
+        Result of a finished job, else None.
+
+        Returns:
+            dict: The Scheduler.optimize() result (plus 'games'), or for a weight
+            sweep 'success', 'error', 'results' and 'front' (see WeightSweep.run)
+        """
+        try:
+            with open(os.path.join(self._job_dir(job_id), 'result.pkl'), 'rb') as f:
+                return pickle.load(f)
+        except OSError:
+            return None
+
+    def cancel(self, job_id):
+        """
+        Stop a queued or running job.
+
+        Returns:
+            bool: True if the job was still queued or running
+        """
+        status_path = os.path.join(self._job_dir(job_id), 'status.json')
+        status = _read_json(status_path)
+        if status is None or status['state'] in FINAL_STATES:
+            return False
+        status.update(state=CANCELLED, success=False, error='Cancelled', finished=time.time())
+        _write_json(status_path, status)
+        pid = status.get('pid')
+        if _process_alive(pid):
+            os.kill(pid, signal.SIGTERM)
+        return True
+
+    def jobs(self):
+        """Status of every job on disk, newest first."""
+        statuses = []
+        for job_id in os.listdir(self.jobs_dir):
+            status = self.status(job_id) if os.path.isdir(self._job_dir(job_id)) else None
+            if status is not None:
+                statuses.append(status)
+        return sorted(statuses, key=lambda status: status['submitted'], reverse=True)
+
+    def active_job(self, kind=OPTIMIZE):
+        """Id of the newest queued or running job of the given kind, or None."""
+        for status in self.jobs():
+            if status['state'] not in FINAL_STATES and status.get('kind', OPTIMIZE) == kind:
+                return status['job_id']
+        return None
+
+
+def _next_job(jobs_dir):
+    """Oldest queued job id no worker has claimed yet, or None."""
+    queued = []
+    for job_id in os.listdir(jobs_dir):
+        if os.path.exists(os.path.join(jobs_dir, job_id, 'claimed')):
+            continue
+        status = _read_json(os.path.join(jobs_dir, job_id, 'status.json'))
+        if status is not None and status['state'] == QUEUED:
+            queued.append((status['submitted'], job_id))
+    return min(queued)[1] if queued else None
+
+
+def _claim(job_dir):
+    """
+    Take a job for this worker.
+
+    Creating the claim file with O_EXCL succeeds for exactly one process, so
+    a job is never run twice, even if two workers see it queued at once.
+
+    Returns:
+        bool: True if this process now owns the job
+    """
+    try:
+        fd = os.open(os.path.join(job_dir, 'claimed'), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    return True
+
+
+def _optimize(refs, games, params, job_dir, model_cache):
+    from phase2.scheduler import Scheduler
+
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters(params)
+    scheduler.set_model_cache(model_cache)
+    scheduler.set_progress(ProgressLog(os.path.join(job_dir, 'progress.jsonl'),
+                                       stop_path=os.path.join(job_dir, 'stop'),
+                                       incumbents_path=os.path.join(job_dir, 'incumbents.jsonl')))
+    result = scheduler.optimize()
+    # The schedule lives on both sides: refs hold their games, games their refs
+    result['games'] = games
+    return result
+
+
+def _weight_sweep(refs, games, params):
+    from phase2.weight_sweep import WeightSweep, pareto_front
+
+    sweep = WeightSweep(refs, games, params.get('max_hours_per_week', DEFAULT_MAX_HOURS_PER_WEEK),
+                        params.get('max_hours_per_day', DEFAULT_MAX_HOURS_PER_DAY),
+                        params.get('skill_combo_formulation', 'pairs'))
+    print(f"Solving {len(params['weight_sets'])} weight mixes (model built in {sweep.build_time:.2f}s)")
+    results = sweep.run(params['weight_sets'], params.get('time_limit', 30), params.get('mip_gap', 0.05),
+                        params.get('workers'))
+    front = pareto_front(results)
+    print(f"{len(front)} non-dominated schedules")
+    return {'success': True, 'error': None, 'results': results, 'front': front}
+
+
+def _run_job(job_dir, model_cache):
+    """Run one job, sending everything printed (the solver's own log too) to its log file."""
+    status_path = os.path.join(job_dir, 'status.json')
+    with open(os.path.join(job_dir, 'input.pkl'), 'rb') as f:
+        refs, games, params = pickle.load(f)
+    status = _read_json(status_path)
+    if status['state'] != QUEUED:
+        return   # cancelled before it started
+    status.update(state=RUNNING, started=time.time(), pid=os.getpid())
+    _write_json(status_path, status)
+
+    sys.stdout.flush()
+    saved_stdout = os.dup(1)
+    with open(os.path.join(job_dir, 'log.txt'), 'w') as log:
+        os.dup2(log.fileno(), 1)
+        try:
+            if status.get('kind', OPTIMIZE) == WEIGHT_SWEEP:
+                result = _weight_sweep(refs, games, params)
+            else:
+                result = _optimize(refs, games, params, job_dir, model_cache)
+            with open(os.path.join(job_dir, 'result.pkl'), 'wb') as f:
+                pickle.dump(result, f)
+            status.update(state=DONE, success=bool(result.get('success')), error=result.get('error'))
+        except Exception as e:
+            print(f"❌ Error during optimization: {e}")
+            status.update(state=FAILED, success=False, error=str(e))
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved_stdout, 1)
+            os.close(saved_stdout)
+    if _read_json(status_path)['state'] == CANCELLED:
+        return   # cancelled while it was being picked up
+    status['finished'] = time.time()
+    _write_json(status_path, status)
+
+
+def worker_main(jobs_dir):
+    """
+    Run queued jobs one after another until idle for WORKER_IDLE_TIMEOUT.
+
+    The worker keeps one ModelCache for its lifetime, so a re-run with new
+    weights reuses the model built by the previous job; the cache is gone
+    once the worker exits.
+    """
+    from phase2.model_cache import ModelCache
+
+    model_cache = ModelCache()
+    idle_since = time.time()
+    while True:
+        job_id = _next_job(jobs_dir)
+        if job_id is None:
+            if time.time() - idle_since < WORKER_IDLE_TIMEOUT:
+                time.sleep(0.5)
+                continue
+            # Retire under the lock, so a job queued meanwhile either is seen here or starts a new worker
+            with _worker_lock(jobs_dir):
+                if _next_job(jobs_dir) is None:
+                    if _worker_pid(jobs_dir) == os.getpid():
+                        os.remove(os.path.join(jobs_dir, 'worker.pid'))
+                    return
+            continue
+        job_dir = os.path.join(jobs_dir, job_id)
+        if _claim(job_dir):
+            _run_job(job_dir, model_cache)
+            idle_since = time.time()
+
+
+if __name__ == '__main__':
+    worker_main(sys.argv[1])
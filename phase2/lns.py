@@ -0,0 +1,148 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Neighborhood kinds, each freeing the x columns of one part of the week
+NEIGHBORHOODS = ['night', 'refs', 'difficulty']
+
+# Model shared by the calls a worker process handles (set by _init_worker)
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _solve_neighborhood(job):
+    """Re-solve the free columns of one neighborhood (runs in a worker process)."""
+    cost, lower, upper, start, time_limit, mip_gap = job
+    result, solution = _worker_model.solve(None, 'auto', time_limit, mip_gap, threads=1, tee=False,
+                                           start=start, cost=cost, bounds=(lower, upper))
+    return result.termination, solution
+
+
+class LargeNeighborhoodSearch:
+    def __init__(self, model, weights, workers=None, seed=0):
+        """
+        Improve a full schedule by re-solving one part of the week at a time.
+
+        Every iteration frees the x columns of a neighborhood, fixes all
+        other assignments at their current values (the auxiliary columns
+        stay free and follow them) and re-solves that sub-MILP from the
+        current schedule, which is always a feasible start, so the schedule
+        never gets worse. Neighborhoods are:
+          - 'night': every pair of one night;
+          - 'refs': every pair of a cluster of refs with overlapping
+            availability (a random ref and the refs sharing most of its games);
+          - 'difficulty': every pair on the games of one difficulty tier.
+        A round solves one neighborhood per worker process in parallel, all
+        from the same schedule, and keeps the best. Kinds that improve the
+        schedule are picked more often.
+
+        Args:
+            model: Built MatrixModel
+            weights: Component -> weight dict
+            workers: Process pool size (None = one per CPU)
+            seed: Random seed for the neighborhood choice
+        """
+        self.model = model
+        self.weights = weights
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+        self.cost = model.objective(weights)
+
+        index = model.index
+        self.x_start, self.x_end = model.blocks['x']
+        self.pair_day = np.array([index.game_slot[k][0] for k in model.pair_k], dtype=int)
+        self.pair_difficulty = index.game_difficulty[model.pair_k] if len(model.pair_k) else np.zeros(0)
+        self.tiers = np.unique(self.pair_difficulty)
+
+        # Games each ref can work, for the availability clusters
+        games = np.zeros((index.num_refs, index.num_games), dtype=bool)
+        games[model.pair_r, model.pair_k] = True
+        overlap = games.astype(float) @ games.T.astype(float)
+        self.similar_refs = np.argsort(-overlap, axis=1, kind='stable')
+        self.cluster_size = max(2, int(np.ceil(index.num_refs / max(index.num_days, 1))))
+        self.successes = {kind: 0 for kind in NEIGHBORHOODS}
+
+    def neighborhood(self, kind):
+        """Boolean mask over the x columns freed by one random neighborhood of a kind."""
+        model = self.model
+        if kind == 'night':
+            return self.pair_day == self.rng.integers(max(model.index.num_days, 1))
+        if kind == 'difficulty':
+            return self.pair_difficulty == self.rng.choice(self.tiers)
+        seed_ref = self.rng.integers(model.index.num_refs)
+        cluster = self.similar_refs[seed_ref, :self.cluster_size]
+        return np.isin(model.pair_r, np.append(cluster, seed_ref))
+
+    def _job(self, solution, free, time_limit, mip_gap):
+        lower = self.model.col_lower.copy()
+        upper = self.model.col_upper.copy()
+        x = np.round(solution[self.x_start:self.x_end])
+        fixed = self.x_start + np.nonzero(~free)[0]
+        # Manual assignments keep their lower bound of 1 even inside a neighborhood
+        lower[fixed] = np.maximum(x[~free], lower[fixed])
+        upper[fixed] = x[~free]
+        return self.cost, lower, upper, solution, time_limit, mip_gap
+
+    def run(self, first, time_budget=60, sub_time_limit=5, mip_gap=1e-4, max_rounds=None, on_improvement=None,
+            should_stop=None):
+        """
+        Improve `first` until the time budget runs out.
+
+        Args:
+            first: Feasible solution vector to start from
+            time_budget: Wall-clock seconds for the search
+            sub_time_limit: Seconds per neighborhood solve
+            mip_gap: Relative gap per neighborhood solve
+            max_rounds: Optional cap on rounds
+            on_improvement: Optional function called with (seconds, solution vector)
+                            for every improvement
+            should_stop: Optional function; the search ends after the round in
+                         which it returns True
+
+        Returns:
+            dict: 'solution', 'objective', 'rounds', 'improvements' (per kind)
+            and 'trace' ((seconds, objective) after the start and every
+            improvement)
+        """
+        start = time.time()
+        solution = np.asarray(first, dtype=float)
+        objective = float(self.cost @ solution)
+        trace = [(0.0, objective)]
+        rounds = 0
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.model,)) as executor:
+            while (time.time() - start < time_budget and (max_rounds is None or rounds < max_rounds)
+                   and not (should_stop is not None and should_stop())):
+                rounds += 1
+                remaining = time_budget - (time.time() - start)
+                weights = np.array([1.0 + self.successes[kind] for kind in NEIGHBORHOODS])
+                kinds = self.rng.choice(NEIGHBORHOODS, size=workers, p=weights / weights.sum())
+                jobs = [self._job(solution, self.neighborhood(kind), min(sub_time_limit, remaining), mip_gap)
+                        for kind in kinds]
+                best = None
+                for kind, (termination, candidate) in zip(kinds, executor.map(_solve_neighborhood, jobs)):
+                    if candidate is None:
+                        continue
+                    value = float(self.cost @ candidate)
+                    if value > objective + 1e-9 and (best is None or value > best[1]):
+                        best = (kind, value, candidate)
+                if best is not None:
+                    kind, objective, solution = best
+                    self.successes[kind] += 1
+                    trace.append((time.time() - start, objective))
+                    if on_improvement is not None:
+                        on_improvement(trace[-1][0], solution)
+        return {
+            'solution': solution,
+            'objective': objective,
+            'rounds': rounds,
+            'improvements': dict(self.successes),
+            'trace': trace
+        }
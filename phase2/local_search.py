@@ -0,0 +1,345 @@
+import math
+import time
+
+import numpy as np
+
+from phase2.evaluate import ScheduleEvaluator, assignment_matrix
+from phase2.objective import COMPONENTS, COMPONENT_SIGNS, ELASTIC_PENALTY
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+
+# Move kinds, tried in proportion to these weights
+MOVES = {'reassign': 0.45, 'swap': 0.35, 'extend': 0.2}
+
+EMPTY = -1
+
+# Default starting temperature as a fraction of the mean objective change of a random move;
+# hotter starts wander off the greedy schedule and rarely come back within a few seconds
+START_TEMPERATURE = 0.2
+
+
+class LocalSearch:
+    def __init__(self, index, weights, normalizers, max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                 max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY, fixed_pairs=(),
+                 skill_combo_formulation='pairs', seed=0):
+        """
+        Simulated annealing over referee seats, without a MILP solver.
+
+        The schedule is an integer array with one row per game and one
+        column per seat up to the game's MAX_REF, holding a ref index or -1
+        for an empty seat. Moves are:
+          - 'reassign': put another available ref (or nobody, above
+            MIN_REF) in a seat;
+          - 'swap': two refs on different games trade seats;
+          - 'extend': a ref takes a seat in the hour before or after one
+            they work, lengthening their shift block.
+        Every move keeps the hard constraints (availability, one game per
+        hour, the nightly and weekly caps, MAX_REF, manual assignments) and
+        never empties a seat below MIN_REF. Whole schedules are scored by
+        phase2.evaluate.ScheduleEvaluator, i.e. the MILP's five components
+        and normalization; a move is scored from the refs, nights and games
+        it touches only (the balancing mean is the one sum recomputed when
+        the week's total hours change). Seats still empty below MIN_REF
+        cost ELASTIC_PENALTY.
+
+        Args:
+            index: ScheduleIndex for the week
+            weights: Component -> weight dict
+            normalizers: normalization_constants(index)
+            max_hours_per_week, max_hours_per_day: Hour caps
+            fixed_pairs: (r, k) manual assignments, never moved
+            skill_combo_formulation: 'pairs' (default) or 'spread'
+            seed: Random seed
+        """
+        self.index = index
+        self.weights = weights
+        self.norm = normalizers
+        self.max_hours_per_day = max_hours_per_day
+        self.skill_combo_formulation = skill_combo_formulation
+        self.rng = np.random.default_rng(seed)
+
+        # Full schedules are scored by the evaluator; moves reuse its coefficients for their deltas
+        self.evaluator = ScheduleEvaluator(index, normalizers, max_hours_per_week, max_hours_per_day, fixed_pairs,
+                                           skill_combo_formulation)
+        evaluator = self.evaluator
+        num_games = index.num_games
+        self.caps = evaluator.caps.astype(int)
+        self.game_day = evaluator.game_day
+        self.game_time = evaluator.game_time
+        self.min_refs = index.game_min_refs.astype(int)
+        self.max_refs = index.game_max_refs.astype(int)
+        self.available = np.zeros((index.num_refs, num_games), dtype=bool)
+        for r, k in index.pairs:
+            self.available[r, k] = True
+        self.games_by_slot = {}
+        for k, (d, h, _) in enumerate(index.game_slot):
+            self.games_by_slot.setdefault((d, h), []).append(k)
+
+        self.in_C = evaluator.in_C
+        self.effort_scale = evaluator.effort_scale
+        self.balancing_scale = evaluator.balancing_scale
+        self.skill_scale = evaluator.skill_scale
+        self.start_scale = evaluator.start_scale
+        self.combo_scale = evaluator.combo_scale
+        self.combo_game = evaluator.combo_game
+        self.deficit = evaluator.deficit
+        self.experience = index.ref_experience
+        self.effort = index.ref_effort
+        self.signed_weights = {name: COMPONENT_SIGNS[name] * weights.get(name, 0.0) for name in COMPONENTS}
+
+        self.seats = np.full((num_games, max(int(self.max_refs.max(initial=1)), 1)), EMPTY, dtype=int)
+        self.fixed = np.zeros(self.seats.shape, dtype=bool)
+        self.fixed_pairs = list(fixed_pairs)
+
+    # State
+
+    def load(self, pairs):
+        """Set the schedule to the given (r, k) pairs (manual assignments are always added)."""
+        index = self.index
+        self.seats.fill(EMPTY)
+        self.fixed.fill(False)
+        count = np.zeros(index.num_games, dtype=int)
+        fixed = set(self.fixed_pairs)
+        for r, k in sorted(fixed) + sorted(set(pairs) - fixed):
+            if count[k] < self.max_refs[k]:
+                self.seats[k, count[k]] = r
+                self.fixed[k, count[k]] = (r, k) in fixed
+                count[k] += 1
+
+        self.count = count
+        assignment = assignment_matrix(index, self.pairs())
+        self.works = self.evaluator.works(assignment)
+        self.day_hours = self.works.sum(axis=2)
+        self.hours = self.day_hours.sum(axis=1)
+        self.values = self.evaluator.components(assignment)
+        self.values['missing'] = int(np.maximum(self.min_refs - count, 0).sum())
+        self.objective = self.score(self.values)
+
+    def pairs(self):
+        """(r, k) pairs of the current schedule, sorted."""
+        k, s = np.nonzero(self.seats != EMPTY)
+        return sorted(zip(self.seats[k, s].tolist(), k.tolist()))
+
+    # Scoring
+
+    def _starts(self, r, d):
+        row = self.works[r, d]
+        return int(row[0] > 0) + int(np.count_nonzero((row[1:] > 0) & (row[:-1] == 0)))
+
+    def _game_terms(self, k):
+        """(skill deficit u_k, skill combo value) of game k."""
+        crew = self.seats[k][self.seats[k] != EMPTY]
+        u = max(0.0, float(self.deficit[crew, k].sum())) if len(crew) else 0.0
+        combo = 0.0
+        if self.combo_game[k] and len(crew) > 1:
+            experience = self.experience[crew]
+            if self.skill_combo_formulation == 'pairs':
+                combo = float(np.abs(experience[:, None] - experience[None, :]).sum() / 2)
+            else:
+                combo = float(experience.max() - experience.min())
+        return u, combo
+
+    def _balancing_sum(self):
+        h_bar = self.hours.sum() / len(self.hours) if len(self.hours) else 0.0
+        return float(np.abs(self.hours[self.in_C] - h_bar).sum())
+
+    def score(self, values):
+        return (sum(self.signed_weights[name] * values[name] for name in COMPONENTS)
+                - ELASTIC_PENALTY * values['missing'])
+
+    # Moves: lists of (game, seat, new ref)
+
+    def _random_seat(self, occupied=True):
+        k = int(self.rng.integers(self.index.num_games))
+        s = int(self.rng.integers(self.max_refs[k]))
+        if self.fixed[k, s] or (occupied and self.seats[k, s] == EMPTY):
+            return None
+        return k, s
+
+    def _propose(self, kind):
+        index = self.index
+        if kind == 'reassign':
+            seat = self._random_seat(occupied=False)
+            if seat is None:
+                return None
+            k, s = seat
+            candidates = index.pairs_by_game[k]
+            if self.seats[k, s] != EMPTY and self.count[k] > self.min_refs[k] and self.rng.random() < 0.2:
+                return [(k, s, EMPTY)]
+            if not candidates:
+                return None
+            return [(k, s, candidates[self.rng.integers(len(candidates))])]
+        if kind == 'swap':
+            first, second = self._random_seat(), self._random_seat()
+            if first is None or second is None or first[0] == second[0]:
+                return None
+            (k1, s1), (k2, s2) = first, second
+            return [(k1, s1, self.seats[k2, s2]), (k2, s2, self.seats[k1, s1])]
+        # extend: the ref in a seat also takes a game in the neighbouring hour
+        seat = self._random_seat()
+        if seat is None:
+            return None
+        k, s = seat
+        r = self.seats[k, s]
+        h = self.game_time[k] + (1 if self.rng.random() < 0.5 else -1)
+        games = [k2 for k2 in self.games_by_slot.get((self.game_day[k], h), []) if self.available[r, k2]]
+        if not games:
+            return None
+        k2 = games[self.rng.integers(len(games))]
+        open_seats = [s2 for s2 in range(self.max_refs[k2]) if not self.fixed[k2, s2]]
+        if not open_seats:
+            return None
+        return [(k2, open_seats[self.rng.integers(len(open_seats))], r)]
+
+    def _feasible(self, move):
+        """Whether a move keeps every hard constraint (checked on the refs and games it touches)."""
+        hours, day, slot, crews = {}, {}, {}, {}
+        for k, s, r in move:
+            old = self.seats[k, s]
+            if old == r or (r != EMPTY and not self.available[r, k]):
+                return False
+            crews.setdefault(k, self.seats[k].copy())[s] = r
+            d, h = self.game_day[k], self.game_time[k]
+            for ref, change in ((old, -1), (r, 1)):
+                if ref != EMPTY:
+                    hours[ref] = hours.get(ref, 0) + change
+                    day[(ref, d)] = day.get((ref, d), 0) + change
+                    slot[(ref, d, h)] = slot.get((ref, d, h), 0) + change
+        for k, crew in crews.items():
+            crew = crew[crew != EMPTY].tolist()
+            if len(set(crew)) < len(crew) or (len(crew) < self.count[k] and len(crew) < self.min_refs[k]):
+                return False
+        return (all(self.hours[ref] + change <= self.caps[ref] for ref, change in hours.items())
+                and all(self.day_hours[ref, d] + change <= self.max_hours_per_day
+                        for (ref, d), change in day.items())
+                and all(self.works[ref, d, h] + change <= 1 for (ref, d, h), change in slot.items()))
+
+    def _apply(self, move):
+        for k, s, r in move:
+            old = self.seats[k, s]
+            d, h = self.game_day[k], self.game_time[k]
+            if old != EMPTY:
+                self.hours[old] -= 1
+                self.day_hours[old, d] -= 1
+                self.works[old, d, h] -= 1
+                self.count[k] -= 1
+            if r != EMPTY:
+                self.hours[r] += 1
+                self.day_hours[r, d] += 1
+                self.works[r, d, h] += 1
+                self.count[k] += 1
+            self.seats[k, s] = r
+
+    def _local_values(self, refs, nights, games, total_changes):
+        """Component sums over the touched refs, nights and games (and the balancing sum if needed)."""
+        refs = np.fromiter(refs, dtype=int)
+        effort = float((self.effort[refs] * self.hours[refs])[self.in_C[refs]].sum())
+        starts = sum(self._starts(r, d) for r, d in nights)
+        terms = [self._game_terms(k) for k in games]
+        if total_changes:
+            balancing = self._balancing_sum()
+        else:
+            h_bar = self.hours.sum() / len(self.hours)
+            balancing = float(np.abs(self.hours[refs] - h_bar)[self.in_C[refs]].sum())
+        missing = int(sum(max(self.min_refs[k] - self.count[k], 0) for k in games))
+        return effort, balancing, sum(u for u, _ in terms), starts, sum(c for _, c in terms), missing
+
+    def _delta(self, move):
+        """Apply a move and return its objective change and new component values."""
+        refs = {r for _, _, r in move if r != EMPTY} | {self.seats[k, s] for k, s, _ in move
+                                                         if self.seats[k, s] != EMPTY}
+        nights = {(r, self.game_day[k]) for k, _, _ in move for r in refs}
+        games = {k for k, _, _ in move}
+        total_changes = sum(int(r != EMPTY) - int(self.seats[k, s] != EMPTY) for k, s, r in move) != 0
+        before = self._local_values(refs, nights, games, total_changes)
+        self._apply_and_remember(move)
+        after = self._local_values(refs, nights, games, total_changes)
+        diff = [a - b for a, b in zip(after, before)]
+        values = dict(self.values)
+        values['effort'] += diff[0] * self.effort_scale
+        values['balancing'] += diff[1] * self.balancing_scale
+        values['low_skill'] += diff[2] * self.skill_scale
+        values['shift_block'] += diff[3] * self.start_scale
+        values['skill_combo'] += diff[4] * self.combo_scale
+        values['missing'] += diff[5]
+        return self.score(values) - self.objective, values
+
+    def _apply_and_remember(self, move):
+        self._undo = [(k, s, self.seats[k, s]) for k, s, _ in reversed(move)]
+        self._apply(move)
+
+    def _revert(self):
+        self._apply(self._undo)
+
+    # Search
+
+    def run(self, start_pairs, time_limit=10, temperature=None, cooling_floor=1e-3, max_iterations=None):
+        """
+        Anneal from a starting schedule until the time limit.
+
+        Args:
+            start_pairs: (r, k) pairs to start from (e.g. the greedy warm start)
+            time_limit: Seconds
+            temperature: Starting temperature (default: START_TEMPERATURE times
+                         the mean objective change of a sample of feasible moves)
+            cooling_floor: Final temperature as a fraction of the starting one
+            max_iterations: Optional cap on moves tried
+
+        Returns:
+            dict: 'pairs', 'objective', 'components' (pre-weight values of
+            the best schedule), 'short' ({k: refs still missing below MIN_REF}),
+            'iterations', 'accepted' and 'runtime'
+        """
+        began = time.time()
+        self.load(start_pairs)
+        kinds = list(MOVES)
+        probabilities = np.array([MOVES[kind] for kind in kinds]) / sum(MOVES.values())
+
+        if temperature is None:
+            sample = []
+            for _ in range(200):
+                move = self._propose(kinds[self.rng.choice(len(kinds), p=probabilities)])
+                if move is not None and self._feasible(move):
+                    delta, _ = self._delta(move)
+                    self._revert()
+                    sample.append(abs(delta))
+            positive = [value for value in sample if value > 1e-12 and value < ELASTIC_PENALTY / 2]
+            temperature = START_TEMPERATURE * float(np.mean(positive)) if positive else 1.0
+        start_temperature = temperature
+
+        best_pairs, best_objective, best_values = self.pairs(), self.objective, dict(self.values)
+        iterations = accepted = 0
+        while max_iterations is None or iterations < max_iterations:
+            if iterations % 200 == 0:
+                elapsed = time.time() - began
+                if elapsed >= time_limit:
+                    break
+                temperature = start_temperature * cooling_floor ** (elapsed / time_limit)
+                # Draw the next 200 move kinds and acceptance thresholds at once
+                batch = self.rng.choice(len(kinds), size=200, p=probabilities)
+                thresholds = self.rng.random(200)
+            move = self._propose(kinds[batch[iterations % 200]])
+            threshold = thresholds[iterations % 200]
+            iterations += 1
+            if move is None or not self._feasible(move):
+                continue
+            delta, values = self._delta(move)
+            if delta >= 0 or threshold < math.exp(delta / temperature):
+                accepted += 1
+                self.objective += delta
+                self.values = values
+                if self.objective > best_objective + 1e-12:
+                    best_pairs, best_objective, best_values = self.pairs(), self.objective, dict(values)
+            else:
+                self._revert()
+
+        # Re-score the best schedule from scratch (the running sums drift by rounding only)
+        self.load(best_pairs)
+        return {
+            'pairs': best_pairs,
+            'objective': self.objective,
+            'components': {name: self.values[name] for name in COMPONENTS},
+            'short': {k: int(missing) for k, missing in enumerate(self.min_refs - self.count) if missing > 0},
+            'iterations': iterations,
+            'accepted': accepted,
+            'runtime': time.time() - began
+        }
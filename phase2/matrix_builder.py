@@ -0,0 +1,851 @@
+import threading
+import time
+
+import numpy as np
+
+from phase2.objective import COMPONENTS, COMPONENT_SIGNS, ELASTIC_PENALTY, normalization_constants
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+from phase2.solvers import SolveResult, _finite
+from phase2.symmetry import symmetry_rows
+
+# Solvers that accept the matrix directly, in preference order
+MATRIX_SOLVERS = ['highspy', 'scipy']
+
+# Feasible (ref, game) pairs above which Scheduler uses the matrix builder by default
+MATRIX_BUILDER_MIN_PAIRS = 1000
+
+
+def _number(value):
+    """Format a coefficient for MPS output without losing precision."""
+    return repr(float(value))
+
+
+def matrix_solvers_available():
+    """Names of the installed matrix solvers, in preference order."""
+    available = []
+    for name, module in (('highspy', 'highspy'), ('scipy', 'scipy.optimize')):
+        try:
+            __import__(module)
+            available.append(name)
+        except ImportError:
+            pass
+    return available
+
+
+class MatrixModel:
+    def __init__(self, index, max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                 max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY, fixed_pairs=(),
+                 families=None, skill_combo_formulation='pairs', normalizers=None, hour_targets=None,
+                 symmetry_classes=(), elastic=False, prior_hours=None, assignment_penalty=None,
+                 repeat_pairs=None, max_slack=None):
+        """
+        Assemble the scheduling MILP directly as sparse arrays, without Pyomo.
+
+        The model is the same one Scheduler.optimize builds with Pyomo: columns
+        are x over index.pairs followed by the auxiliary families, and rows are
+        the hard constraints and linearizations in the same order. Each objective
+        component is kept as its own (pre-weight) cost vector so the objective for
+        any set of weights is a cheap linear combination.
+
+        Args:
+            index: ScheduleIndex for the week
+            max_hours_per_week, max_hours_per_day: Hour caps
+            fixed_pairs: (r, k) pairs fixed to 1 (manual assignments)
+            families: Auxiliary families to build, any of 'balancing', 'shift_block',
+                      'skill_combo', 'low_skill' (default: all)
+            skill_combo_formulation: 'pairs' (default) or 'spread'
+            normalizers: Result of normalization_constants(index), computed if omitted
+            hour_targets: Optional fixed hours per ref that balancing measures
+                          deviation from, instead of the mean h_bar (used when
+                          one night is solved on its own, see phase2.decomposition)
+            symmetry_classes: Interchangeable game classes to order
+                              (see phase2.symmetry.interchangeable_games)
+            elastic: Give MIN_REF and the hour caps penalized slack columns
+                     ('short', 'over_day', 'over_week') so the model is always
+                     feasible; see violations()
+            max_slack: With elastic, the most slack the schedule may use in total.
+                       The slack then costs nothing, so the objective is only the
+                       usual components. Given the least slack possible (the
+                       max-flow shortage, see phase2.feasibility), this is the
+                       second phase of a lexicographic solve, and mip_gap applies
+                       to the usual objective rather than to the penalty.
+            prior_hours: Optional hours each ref already worked this season;
+                         balancing then measures season totals against their
+                         mean (see phase2.season)
+            assignment_penalty: Optional cost of each pair in index.pairs,
+                                subtracted from every objective
+            repeat_pairs: Optional {(i, j): cost} for refs i < j who have
+                          worked together before; every game they share
+                          again costs that much ('together' columns)
+        """
+        build_start = time.time()
+        self.index = index
+        self.max_hours_per_week = max_hours_per_week
+        self.max_hours_per_day = max_hours_per_day
+        self.families = set(families if families is not None
+                            else ['balancing', 'shift_block', 'skill_combo', 'low_skill'])
+        self.skill_combo_formulation = skill_combo_formulation
+        self.normalizers = normalizers or normalization_constants(index)
+        self.hour_targets = None if hour_targets is None else np.asarray(hour_targets, dtype=float)
+        self.symmetry_classes = [list(games) for games in symmetry_classes]
+        self.elastic = elastic
+        self.max_slack = max_slack
+        self.prior_hours = None if prior_hours is None else np.asarray(prior_hours, dtype=float)
+        self.assignment_penalty = None if assignment_penalty is None else np.asarray(assignment_penalty, dtype=float)
+        self.repeat_pairs = dict(repeat_pairs or {})
+
+        # Column data
+        self.num_cols = 0
+        self.blocks = {}  # family name -> (first column, end column)
+        self.column_keys = {}  # family name -> Pyomo-style index key of each column
+        self._col_lower = []
+        self._col_upper = []
+        self._col_integer = []
+
+        # Row data as COO triplets
+        self.num_rows = 0
+        self.row_blocks = {}  # constraint name -> (first row, end row)
+        self._entries = []
+        self._row_lower = []
+        self._row_upper = []
+
+        self._build(fixed_pairs)
+
+        self.col_lower = np.concatenate(self._col_lower)
+        self.col_upper = np.concatenate(self._col_upper)
+        self.integrality = np.concatenate(self._col_integer).astype(np.uint8)
+        self.row_lower = np.concatenate(self._row_lower) if self._row_lower else np.zeros(0)
+        self.row_upper = np.concatenate(self._row_upper) if self._row_upper else np.zeros(0)
+        self._matrix = None
+        self.build_time = time.time() - build_start
+
+        # Persistent solver state (see solve(persistent=True))
+        self._highs = None
+        self._lock = threading.Lock()
+        self.last_solution = None
+
+    def __getstate__(self):
+        # Solver handles and locks stay in this process; a copy sent to a worker rebuilds its own
+        state = self.__dict__.copy()
+        state['_highs'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # Builder helpers
+
+    def _add_columns(self, name, size, lower, upper, integer, keys=None):
+        start = self.num_cols
+        self.blocks[name] = (start, start + size)
+        self.column_keys[name] = list(keys) if keys is not None else list(range(size))
+        self._col_lower.append(np.full(size, lower, dtype=float))
+        self._col_upper.append(np.full(size, upper, dtype=float))
+        self._col_integer.append(np.full(size, integer, dtype=bool))
+        self.num_cols += size
+        return start
+
+    def _add_rows(self, name, size, rows, cols, vals, lower, upper):
+        """Append `size` rows; `rows` are numbered from 0 within the block."""
+        start = self.num_rows
+        self.row_blocks[name] = (start, start + size)
+        if size:
+            self._entries.append((np.asarray(rows) + start, np.asarray(cols), np.asarray(vals, dtype=float)))
+        self._row_lower.append(np.broadcast_to(np.asarray(lower, dtype=float), size).copy())
+        self._row_upper.append(np.broadcast_to(np.asarray(upper, dtype=float), size).copy())
+        self.num_rows += size
+
+    def _add_slack(self, name, rows, sign, keys):
+        """
+        Add one nonnegative integer column per row of the `rows` block, with coefficient `sign`.
+
+        The column costs ELASTIC_PENALTY in the objective (see violation_cost),
+        unless max_slack caps the total instead.
+        """
+        first, end = self.row_blocks[rows]
+        size = end - first
+        col = self._add_columns(name, size, 0, np.inf, True, keys)
+        self._entries.append((np.arange(first, end), np.arange(col, col + size), np.full(size, float(sign))))
+        return col
+
+    def _add_pair_sums(self, name, keys, keep, lower, upper):
+        """
+        One row per distinct key with `keep` true: sum of the x pairs sharing that key.
+
+        Args:
+            keys: Group key per pair (e.g. ref, or ref-day)
+            keep: Boolean per distinct key (in sorted key order)
+            lower, upper: Bounds per kept row (scalars or arrays over kept keys)
+        """
+        unique_keys, group = np.unique(keys, return_inverse=True)
+        row_of_key = np.cumsum(keep) - 1
+        mask = keep[group]
+        self._add_rows(name, int(keep.sum()), row_of_key[group[mask]], np.nonzero(mask)[0],
+                       np.ones(int(mask.sum())), lower, upper)
+        return unique_keys
+
+    def _build(self, fixed_pairs):
+        index = self.index
+        norm = self.normalizers
+        inf = np.inf
+
+        num_refs = index.num_refs
+        num_days = index.num_days
+        num_times = index.num_times
+        num_games = index.num_games
+        num_pairs = len(index.pairs)
+
+        pairs = np.array(index.pairs, dtype=int).reshape(-1, 2)
+        pair_r = pairs[:, 0]
+        pair_k = pairs[:, 1]
+        game_slot = np.array(index.game_slot, dtype=int).reshape(-1, 3)
+        pair_d = game_slot[pair_k, 0]
+        pair_h = game_slot[pair_k, 1]
+        self.pair_r = pair_r
+        self.pair_k = pair_k
+
+        # x_{r,k}: one binary per feasible pair, manual assignments fixed at 1
+        x0 = self._add_columns('x', num_pairs, 0, 1, True, index.pairs)
+        pair_col = {pair: x0 + p for p, pair in enumerate(index.pairs)}
+        for pair in fixed_pairs:
+            self._col_lower[0][pair_col[pair]] = 1
+
+        # rule1: at most one game per ref per hour
+        slot_key = (pair_r * num_days + pair_d) * num_times + pair_h
+        slot_keys, slot_of_pair, slot_counts = np.unique(slot_key, return_inverse=True, return_counts=True)
+        self._add_pair_sums('rule1', slot_key, slot_counts > 1, -inf, 1)
+
+        # rule2: at most max_hours_per_day games per ref per night
+        day_key = pair_r * num_days + pair_d
+        day_keys, day_counts = np.unique(day_key, return_counts=True)
+        keep = day_counts > self.max_hours_per_day
+        self._add_pair_sums('rule2', day_key, keep, -inf, self.max_hours_per_day)
+        if self.elastic:
+            kept = day_keys[keep]
+            self._add_slack('over_day', 'rule2', -1, zip((kept // num_days).tolist(), (kept % num_days).tolist()))
+
+        # rule3: weekly cap min(max_hours_per_week, ref max hours)
+        ref_keys, ref_counts = np.unique(pair_r, return_counts=True)
+        caps = np.minimum(self.max_hours_per_week, index.ref_max_hours[ref_keys])
+        keep = ref_counts > caps
+        self._add_pair_sums('rule3', pair_r, keep, -inf, caps[keep])
+        if self.elastic:
+            self._add_slack('over_week', 'rule3', -1, ref_keys[keep].tolist())
+
+        # rule5: MIN_REF <= refs on game k <= MAX_REF; every game that needs refs gets
+        # a MIN_REF row, including games no ref is available for
+        need = np.nonzero(index.game_min_refs > 0)[0]
+        need_row = np.full(num_games, -1)
+        need_row[need] = np.arange(len(need))
+        mask = need_row[pair_k] >= 0
+        self._add_rows('rule5_min', len(need), need_row[pair_k[mask]], x0 + np.nonzero(mask)[0],
+                       np.ones(int(mask.sum())), index.game_min_refs[need], inf)
+        if self.elastic:
+            self._add_slack('short', 'rule5_min', 1, need.tolist())
+            if self.max_slack is not None:
+                slack = np.concatenate([np.arange(*self.blocks[name]) for name in ('over_day', 'over_week', 'short')])
+                self._add_rows('slack_limit', 1, np.zeros(len(slack), dtype=int), slack, np.ones(len(slack)),
+                               -inf, self.max_slack)
+        game_keys, game_counts = np.unique(pair_k, return_counts=True)
+        max_refs = index.game_max_refs[game_keys]
+        keep = game_counts > max_refs
+        self._add_pair_sums('rule5_max', pair_k, keep, -inf, max_refs[keep])
+
+        # Symmetry breaking: x[r, k2] <= sum_{r' < r} x[r', k1] along each interchangeable class
+        ordered = symmetry_rows(index, self.symmetry_classes)
+        if ordered:
+            rows, cols, vals = [], [], []
+            for row, (r, k2, lower_pairs) in enumerate(ordered):
+                rows.append(row)
+                cols.append(pair_col[(r, k2)])
+                vals.append(1.0)
+                for pair in lower_pairs:
+                    rows.append(row)
+                    cols.append(pair_col[pair])
+                    vals.append(-1.0)
+            self._add_rows('symmetry', len(ordered), rows, cols, vals, -inf, 0)
+
+        self.components = {name: np.zeros(0) for name in COMPONENTS}
+        costs = {name: [] for name in COMPONENTS}  # (columns, coefficients) per component
+
+        # Effort e(x) = (1/|C|) * sum_{i in C} E_i * h_i / EFFORT_NORMALIZER
+        C_set = norm['C_set']
+        in_C = np.zeros(num_refs, dtype=bool)
+        in_C[C_set] = True
+        if C_set:
+            effort = index.ref_effort[pair_r] / (len(C_set) * norm['EFFORT_NORMALIZER'])
+            costs['effort'].append((np.arange(x0, x0 + num_pairs), np.where(in_C[pair_r], effort, 0.0)))
+
+        if 'balancing' in self.families and C_set and self.hour_targets is not None:
+            # d_i >= |h_i - t_i| for i in C, against fixed targets
+            targets = self.hour_targets[C_set]
+            d0 = self._add_columns('d', len(C_set), 0, inf, False, C_set)
+            c_pos = np.full(num_refs, -1)
+            c_pos[C_set] = np.arange(len(C_set))
+            in_c_pairs = np.nonzero(in_C[pair_r])[0]
+            rows = np.concatenate([np.arange(len(C_set)), c_pos[pair_r[in_c_pairs]]])
+            cols = np.concatenate([d0 + np.arange(len(C_set)), x0 + in_c_pairs])
+            ones = np.ones(len(C_set))
+            # d_i - h_i >= -t_i
+            self._add_rows('d_lower_1', len(C_set), rows, cols,
+                           np.concatenate([ones, -np.ones(len(in_c_pairs))]), -targets, inf)
+            # d_i + h_i >= t_i
+            self._add_rows('d_lower_2', len(C_set), rows, cols,
+                           np.concatenate([ones, np.ones(len(in_c_pairs))]), targets, inf)
+            costs['balancing'].append((d0 + np.arange(len(C_set)),
+                                       np.full(len(C_set), 1.0 / (len(C_set) * norm['BALANCING_NORMALIZER']))))
+        elif 'balancing' in self.families and C_set:
+            # n * h_bar == sum x, then d_i >= |h_i - h_bar| for i in C; with prior hours p,
+            # h_i and h_bar are season totals: n * h_bar == sum p + sum x, d_i >= |p_i + h_i - h_bar|
+            prior = self.prior_hours if self.prior_hours is not None else np.zeros(num_refs)
+            h_bar = self._add_columns('h_bar', 1, 0, inf, False, [None])
+            self._add_rows('h_bar_definition', 1,
+                           np.zeros(num_pairs + 1, dtype=int),
+                           np.concatenate([[h_bar], np.arange(x0, x0 + num_pairs)]),
+                           np.concatenate([[num_refs], -np.ones(num_pairs)]), prior.sum(), prior.sum())
+
+            d0 = self._add_columns('d', len(C_set), 0, inf, False, C_set)
+            c_pos = np.full(num_refs, -1)
+            c_pos[C_set] = np.arange(len(C_set))
+            in_c_pairs = np.nonzero(in_C[pair_r])[0]
+            rows = np.concatenate([np.arange(len(C_set)), np.arange(len(C_set)), c_pos[pair_r[in_c_pairs]]])
+            cols = np.concatenate([d0 + np.arange(len(C_set)), np.full(len(C_set), h_bar), x0 + in_c_pairs])
+            ones = np.ones(len(C_set))
+            # d_i - h_i + h_bar >= p_i
+            self._add_rows('d_lower_1', len(C_set), rows, cols,
+                           np.concatenate([ones, ones, -np.ones(len(in_c_pairs))]), prior[C_set], inf)
+            # d_i + h_i - h_bar >= -p_i
+            self._add_rows('d_lower_2', len(C_set), rows, cols,
+                           np.concatenate([ones, -ones, np.ones(len(in_c_pairs))]), -prior[C_set], inf)
+            costs['balancing'].append((d0 + np.arange(len(C_set)),
+                                       np.full(len(C_set), 1.0 / (len(C_set) * norm['BALANCING_NORMALIZER']))))
+
+        if 'shift_block' in self.families:
+            # start_{r,d,h} over every (r, d, h) the ref can work, in sorted key order
+            num_slots = len(slot_keys)
+            slot_h = slot_keys % num_times
+            slot_rd = slot_keys // num_times
+            s0 = self._add_columns('start', num_slots, 0, 1, True,
+                                   zip((slot_rd // num_days).tolist(), (slot_rd % num_days).tolist(), slot_h.tolist()))
+            prev_pos = np.minimum(np.searchsorted(slot_keys, slot_keys - 1), max(num_slots - 1, 0))
+            prev_slot = np.full(num_slots, -1)
+            if num_slots:
+                prev_slot = np.where((slot_h > 0) & (slot_keys[prev_pos] == slot_keys - 1), prev_pos, -1)
+            next_slot = np.full(num_slots, -1)
+            has_prev = np.nonzero(prev_slot >= 0)[0]
+            next_slot[prev_slot[has_prev]] = has_prev
+            start_cols = s0 + np.arange(num_slots)
+            pair_cols = x0 + np.arange(num_pairs)
+
+            # start_constraint_1: start - x(r,d,h) + x(r,d,h-1) >= 0
+            feeds_next = np.nonzero(next_slot[slot_of_pair] >= 0)[0]
+            self._add_rows('start_constraint_1', num_slots,
+                           np.concatenate([np.arange(num_slots), slot_of_pair, next_slot[slot_of_pair[feeds_next]]]),
+                           np.concatenate([start_cols, pair_cols, pair_cols[feeds_next]]),
+                           np.concatenate([np.ones(num_slots), -np.ones(num_pairs), np.ones(len(feeds_next))]),
+                           0, inf)
+            # start_constraint_2: start - x(r,d,h) <= 0
+            self._add_rows('start_constraint_2', num_slots,
+                           np.concatenate([np.arange(num_slots), slot_of_pair]),
+                           np.concatenate([start_cols, pair_cols]),
+                           np.concatenate([np.ones(num_slots), -np.ones(num_pairs)]),
+                           -inf, 0)
+            # start_constraint_3: start + x(r,d,h-1) <= 1, only where the previous hour exists
+            row3 = np.full(num_slots, -1)
+            row3[has_prev] = np.arange(len(has_prev))
+            self._add_rows('start_constraint_3', len(has_prev),
+                           np.concatenate([row3[has_prev], row3[next_slot[slot_of_pair[feeds_next]]]]),
+                           np.concatenate([start_cols[has_prev], pair_cols[feeds_next]]),
+                           np.ones(len(has_prev) + len(feeds_next)),
+                           -inf, 1)
+            costs['shift_block'].append((start_cols, np.full(num_slots, 1.0 / norm['TB_NORMALIZER'])))
+
+        L = norm['NUM_GAMES']
+        combo_game = np.zeros(num_games, dtype=bool)
+        combo_game[game_keys] = (game_counts > 1) & (index.game_max_refs[game_keys] > 1)
+        if 'skill_combo' in self.families and L > 0 and norm['COMBO_NORMALIZER'] != 0:
+            experience = index.ref_experience
+            if self.skill_combo_formulation == 'pairs':
+                # y_{i,j,k} for every two refs who can both work game k
+                triples = []
+                for k in np.nonzero(combo_game)[0]:
+                    refs_k = np.asarray(index.pairs_by_game[k])
+                    i, j = np.triu_indices(len(refs_k), 1)
+                    triples.append(np.column_stack([refs_k[i], refs_k[j], np.full(len(i), k)]))
+                triples = np.concatenate(triples) if triples else np.zeros((0, 3), dtype=int)
+                num_y = len(triples)
+                y0 = self._add_columns('y', num_y, 0, 1, True, map(tuple, triples.tolist()))
+                y_cols = y0 + np.arange(num_y)
+                col_i = np.array([pair_col[(i, k)] for i, j, k in triples], dtype=int)
+                col_j = np.array([pair_col[(j, k)] for i, j, k in triples], dtype=int)
+                rows = np.arange(num_y)
+                self._add_rows('y_constraint_1', num_y, np.concatenate([rows, rows]),
+                               np.concatenate([y_cols, col_i]),
+                               np.concatenate([np.ones(num_y), -np.ones(num_y)]), -inf, 0)
+                self._add_rows('y_constraint_2', num_y, np.concatenate([rows, rows]),
+                               np.concatenate([y_cols, col_j]),
+                               np.concatenate([np.ones(num_y), -np.ones(num_y)]), -inf, 0)
+                self._add_rows('y_constraint_3', num_y, np.concatenate([rows, rows, rows]),
+                               np.concatenate([y_cols, col_i, col_j]),
+                               np.concatenate([np.ones(num_y), -np.ones(num_y), -np.ones(num_y)]), -1, inf)
+                spread = np.abs(experience[triples[:, 0]] - experience[triples[:, 1]]) if num_y else np.zeros(0)
+                costs['skill_combo'].append((y_cols, spread / norm['COMBO_NORMALIZER']))
+            else:
+                # hi/lo pick the most and least experienced ref on each multi-ref game
+                cp = np.nonzero(combo_game[pair_k])[0]
+                num_cp = len(cp)
+                cp_keys = list(zip(pair_r[cp].tolist(), pair_k[cp].tolist()))
+                hi0 = self._add_columns('hi', num_cp, 0, 1, False, cp_keys)
+                lo0 = self._add_columns('lo', num_cp, 0, 1, False, cp_keys)
+                hi_cols = hi0 + np.arange(num_cp)
+                lo_cols = lo0 + np.arange(num_cp)
+                rows = np.arange(num_cp)
+                ones = np.ones(num_cp)
+                self._add_rows('hi_constraint', num_cp, np.concatenate([rows, rows]),
+                               np.concatenate([hi_cols, x0 + cp]), np.concatenate([ones, -ones]), -inf, 0)
+                self._add_rows('lo_constraint', num_cp, np.concatenate([rows, rows]),
+                               np.concatenate([lo_cols, x0 + cp]), np.concatenate([ones, -ones]), -inf, 0)
+                ck = np.nonzero(combo_game)[0]
+                ck_row = np.full(num_games, -1)
+                ck_row[ck] = np.arange(len(ck))
+                game_row = ck_row[pair_k[cp]]
+                self._add_rows('spread_pick_one', len(ck), game_row, hi_cols, ones, -inf, 1)
+                self._add_rows('spread_balance', len(ck), np.concatenate([game_row, game_row]),
+                               np.concatenate([lo_cols, hi_cols]), np.concatenate([ones, -ones]), 0, 0)
+                combo = experience[pair_r[cp]] / norm['COMBO_NORMALIZER']
+                costs['skill_combo'].append((np.concatenate([hi_cols, lo_cols]), np.concatenate([combo, -combo])))
+
+        if 'low_skill' in self.families:
+            # u_k >= (GEx_k / MEAN_DIFFICULTY) * refs_k - sum_i (REx_i / MEAN_SKILL) x_{i,k}
+            u0 = self._add_columns('u', num_games, 0, inf, False, range(num_games))
+            deficit = (index.game_difficulty[pair_k] / norm['MEAN_DIFFICULTY']
+                       - index.ref_experience[pair_r] / norm['MEAN_SKILL'])
+            self._add_rows('skill_deficit_constraint', num_games,
+                           np.concatenate([np.arange(num_games), pair_k]),
+                           np.concatenate([u0 + np.arange(num_games), x0 + np.arange(num_pairs)]),
+                           np.concatenate([np.ones(num_games), -deficit]), 0, inf)
+            if L > 0 and norm['SKILL_NORMALIZER'] != 0:
+                costs['low_skill'].append((u0 + np.arange(num_games),
+                                           np.full(num_games, 1.0 / (L * norm['SKILL_NORMALIZER']))))
+
+        # Season history: together_{i,j,k} >= x_{i,k} + x_{j,k} - 1 for refs who shared games before
+        season_costs = []
+        if self.assignment_penalty is not None:
+            season_costs.append((np.arange(x0, x0 + num_pairs), self.assignment_penalty))
+        if self.repeat_pairs:
+            triples = [(i, j, k) for k in np.nonzero(combo_game)[0].tolist()
+                       for a, i in enumerate(index.pairs_by_game[k]) for j in index.pairs_by_game[k][a + 1:]
+                       if (i, j) in self.repeat_pairs]
+            num_t = len(triples)
+            t0 = self._add_columns('together', num_t, 0, 1, False, triples)
+            t_cols = t0 + np.arange(num_t)
+            rows = np.arange(num_t)
+            self._add_rows('together_constraint', num_t, np.concatenate([rows, rows, rows]),
+                           np.concatenate([t_cols, [pair_col[(i, k)] for i, j, k in triples],
+                                           [pair_col[(j, k)] for i, j, k in triples]]).astype(int),
+                           np.concatenate([np.ones(num_t), -np.ones(num_t), -np.ones(num_t)]), -1, inf)
+            season_costs.append((t_cols, np.array([self.repeat_pairs[(i, j)] for i, j, k in triples])))
+
+        for name in COMPONENTS:
+            vector = np.zeros(self.num_cols)
+            for cols, coefficients in costs[name]:
+                np.add.at(vector, cols, coefficients)
+            self.components[name] = vector
+
+        # Penalty per unit of slack, subtracted from every objective (capped slack is free)
+        self.violation_cost = np.zeros(self.num_cols)
+        for name in ('short', 'over_day', 'over_week'):
+            if name in self.blocks and self.max_slack is None:
+                start, end = self.blocks[name]
+                self.violation_cost[start:end] = ELASTIC_PENALTY
+
+        # Season history penalty, also subtracted from every objective (see season_penalty_value)
+        self.season_cost = np.zeros(self.num_cols)
+        for cols, coefficients in season_costs:
+            np.add.at(self.season_cost, cols, coefficients)
+
+    # Model access
+
+    def matrix(self):
+        """Constraint matrix as scipy.sparse CSR (built on first use)."""
+        if self._matrix is None:
+            from scipy import sparse
+            if self._entries:
+                rows, cols, vals = (np.concatenate(parts) for parts in zip(*self._entries))
+            else:
+                rows = cols = np.zeros(0, dtype=int)
+                vals = np.zeros(0)
+            self._matrix = sparse.csr_matrix((vals, (rows, cols)), shape=(self.num_rows, self.num_cols))
+        return self._matrix
+
+    def objective(self, weights):
+        """Maximization cost vector for a component -> weight dict."""
+        c = -self.violation_cost - self.season_cost
+        for name in COMPONENTS:
+            c += COMPONENT_SIGNS[name] * weights.get(name, 0.0) * self.components[name]
+        return c
+
+    def violations(self, solution):
+        """
+        Slack used by an elastic solution.
+
+        Returns:
+            dict: 'short' {k: refs missing}, 'over_day' {(r, d): hours over} and
+            'over_week' {r: hours over}, nonzero entries only
+        """
+        report = {'short': {}, 'over_day': {}, 'over_week': {}}
+        for name in report:
+            if name not in self.blocks:
+                continue
+            start, end = self.blocks[name]
+            for key, value in zip(self.column_keys[name], solution[start:end]):
+                if value > 0.5:
+                    report[name][key] = int(round(value))
+        return report
+
+    def season_penalty_value(self, solution):
+        """Objective lost to the season history terms (0 outside season mode)."""
+        return float(self.season_cost @ solution)
+
+    def component_values(self, solution):
+        """Pre-weight value of each objective component at a solution vector."""
+        return {name: float(self.components[name] @ solution) for name in COMPONENTS}
+
+    def selected_pairs(self, solution):
+        """(r, k) pairs with x = 1 in a solution vector."""
+        start, end = self.blocks['x']
+        chosen = np.nonzero(solution[start:end] > 0.5)[0]
+        return list(zip(self.pair_r[chosen].tolist(), self.pair_k[chosen].tolist()))
+
+    def no_good_cuts(self, solutions, min_distance):
+        """
+        Rows keeping the assignment at least `min_distance` changes away from each solution.
+
+        The Hamming distance between binary assignments is
+        sum over chosen x of (1 - x) + sum over the others of x, so each row is
+        -sum(chosen x) + sum(other x) >= min_distance - |chosen|.
+
+        Returns:
+            tuple: (sparse matrix, lower, upper) for solve(cuts=...)
+        """
+        from scipy import sparse
+
+        start, end = self.blocks['x']
+        rows = []
+        lower = []
+        for solution in solutions:
+            chosen = np.asarray(solution[start:end]) > 0.5
+            rows.append(np.where(chosen, -1.0, 1.0))
+            lower.append(min_distance - chosen.sum())
+        A = sparse.hstack([sparse.csr_matrix((len(rows), start)), sparse.csr_matrix(np.vstack(rows)),
+                           sparse.csr_matrix((len(rows), self.num_cols - end))]).tocsr()
+        return A, np.asarray(lower, dtype=float), np.full(len(rows), np.inf)
+
+    def assignment_distance(self, a, b):
+        """Number of (ref, game) assignments that differ between two solution vectors."""
+        start, end = self.blocks['x']
+        return int(np.sum((np.asarray(a[start:end]) > 0.5) != (np.asarray(b[start:end]) > 0.5)))
+
+    def column_names(self):
+        names = []
+        for name, keys in self.column_keys.items():
+            for key in keys:
+                if key is None:
+                    names.append(name)
+                elif isinstance(key, tuple):
+                    names.append('_'.join([name] + [str(i) for i in key]))
+                else:
+                    names.append(f"{name}_{key}")
+        return names
+
+    def start_vector(self, values):
+        """
+        Lay out variable values (see phase2.warm_start.solution_values) as a column vector.
+
+        Families missing from `values` are left at zero.
+        """
+        vector = np.zeros(self.num_cols)
+        for name, (start, end) in self.blocks.items():
+            family = values.get(name)
+            if family is None:
+                continue
+            if name == 'h_bar':
+                vector[start] = family
+            else:
+                vector[start:end] = [family.get(key, 0.0) for key in self.column_keys[name]]
+        return vector
+
+    def row_names(self):
+        names = []
+        for name, (start, end) in self.row_blocks.items():
+            names.extend(f"{name}_{i}" for i in range(end - start))
+        return names
+
+    # Solving
+
+    def solve(self, weights, solver='auto', time_limit=240, mip_gap=0.05, threads=None, tee=True, start=None,
+              persistent=False, progress=None, on_incumbent=None, cuts=None, cost=None, bounds=None):
+        """
+        Solve the model for the given weights.
+
+        Args:
+            weights: Component -> weight dict (see phase2.objective.COMPONENTS)
+            solver: 'highspy', 'scipy' or 'auto' (first installed of MATRIX_SOLVERS)
+            start: Optional full column vector passed as a MIP start (highspy only;
+                   scipy.optimize.milp has no way to accept one)
+            persistent: Keep the highspy instance loaded so the next solve only
+                        replaces the objective (used for cached models)
+            progress: Optional ProgressLog fed from the highspy callbacks, which
+                      also stop the solve when it asks to (scipy only reports
+                      the final state)
+            on_incumbent: Optional function called with (runtime, solution vector)
+                          for every improving solution (highspy only)
+            cuts: Optional (matrix, lower, upper) rows added for this solve only
+                  (see no_good_cuts); the solve then uses a fresh highspy instance
+            cost: Optional cost vector used instead of objective(weights)
+            bounds: Optional (lower, upper) column bounds used instead of the
+                    model's for this solve only (see phase2.lns); the solve
+                    then uses a fresh highspy instance
+
+        Returns:
+            tuple: (SolveResult, solution vector or None)
+        """
+        available = matrix_solvers_available()
+        if solver in (None, 'auto', 'highs'):
+            solver = available[0] if available else None
+        if solver not in available:
+            return SolveResult(solver or 'matrix', 'error', False,
+                               message="No matrix solver available (install highspy or scipy)"), None
+
+        c = self.objective(weights) if cost is None else np.asarray(cost, dtype=float)
+        if progress is not None:
+            progress.begin()
+        with self._lock:
+            if solver == 'highspy':
+                result, solution = self._solve_highspy(c, time_limit, mip_gap, threads, tee, start,
+                                                       persistent and cuts is None and bounds is None, progress,
+                                                       on_incumbent, cuts, bounds)
+            else:
+                result, solution = self._solve_scipy(c, time_limit, mip_gap, tee, cuts, bounds)
+            if solution is not None:
+                self.last_solution = solution
+        if progress is not None:
+            progress.emit(result.runtime, result.objective, result.bound)
+        return result, solution
+
+    def _new_highs(self):
+        """Create a highspy instance holding this model; costs are set per solve."""
+        import highspy
+
+        A = self.matrix().tocsc()
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.num_cols
+        lp.num_row_ = self.num_rows
+        lp.col_cost_ = np.zeros(self.num_cols)
+        lp.col_lower_ = self.col_lower
+        lp.col_upper_ = self.col_upper
+        lp.row_lower_ = self.row_lower
+        lp.row_upper_ = self.row_upper
+        lp.sense_ = highspy.ObjSense.kMaximize
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+        lp.integrality_ = [highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+                           for integer in self.integrality]
+
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+        h.passModel(lp)
+        return h
+
+    def _solve_highspy(self, c, time_limit, mip_gap, threads, tee, start_vector=None, persistent=False,
+                       progress=None, on_incumbent=None, cuts=None, bounds=None):
+        import highspy
+
+        start = time.time()
+        try:
+            # A persistent instance keeps the model loaded; only the costs change between solves
+            if persistent and self._highs is not None:
+                h = self._highs
+            else:
+                h = self._new_highs()
+                if persistent:
+                    self._highs = h
+            if cuts is not None:
+                A, lower, upper = cuts
+                A = A.tocsr()
+                h.addRows(A.shape[0], lower, upper, A.nnz, A.indptr, A.indices, A.data)
+            if bounds is not None:
+                h.changeColsBounds(self.num_cols, np.arange(self.num_cols, dtype=np.int32),
+                                   np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float))
+            h.changeColsCost(self.num_cols, np.arange(self.num_cols, dtype=np.int32), c)
+        except Exception as e:
+            return SolveResult('highspy', 'error', False, runtime=time.time() - start, message=str(e)), None
+
+        h.setOptionValue('output_flag', bool(tee))
+        h.setOptionValue('time_limit', float(time_limit) if time_limit is not None else highspy.kHighsInf)
+        if mip_gap is not None:
+            h.setOptionValue('mip_rel_gap', float(mip_gap))
+        if threads is not None:
+            h.setOptionValue('threads', int(threads))
+
+        # Record (time, objective) of every improving solution
+        incumbents = []
+
+        def improving_solution(e):
+            incumbents.append((e.data_out.running_time, e.data_out.objective_function_value))
+            if progress is not None:
+                progress.emit(e.data_out.running_time, e.data_out.objective_function_value,
+                              _finite(e.data_out.mip_dual_bound), improved=True)
+            if on_incumbent is not None:
+                on_incumbent(e.data_out.running_time, np.array(e.data_out.mip_solution))
+
+        def report(e):
+            # Called from the B&B loop (and each log line when tee is on)
+            progress.emit(e.data_out.running_time, _finite(e.data_out.mip_primal_bound),
+                          _finite(e.data_out.mip_dual_bound))
+            if progress.stop_requested():
+                e.data_in.user_interrupt = True
+
+        h.cbMipImprovingSolution.subscribe(improving_solution)
+        if progress is not None:
+            h.cbMipInterrupt.subscribe(report)
+            h.cbMipLogging.subscribe(report)
+
+        start = time.time()
+        try:
+            if start_vector is not None:
+                h.setSolution(self.num_cols, np.arange(self.num_cols, dtype=np.int32),
+                              np.asarray(start_vector, dtype=float))
+            h.run()
+        except Exception as e:
+            return SolveResult('highspy', 'error', False, runtime=time.time() - start, message=str(e)), None
+        finally:
+            h.cbMipImprovingSolution.clear()
+            h.cbMipInterrupt.clear()
+            h.cbMipLogging.clear()
+        runtime = time.time() - start
+
+        status = h.getModelStatus()
+        info = h.getInfo()
+        has_solution = info.primal_solution_status == 2  # kSolutionStatusFeasible
+        if status == highspy.HighsModelStatus.kOptimal:
+            termination = 'optimal'
+        elif status == highspy.HighsModelStatus.kTimeLimit:
+            termination = 'time_limit'
+        elif status in (highspy.HighsModelStatus.kInfeasible, highspy.HighsModelStatus.kUnboundedOrInfeasible):
+            termination = 'infeasible'
+        elif status in (highspy.HighsModelStatus.kModelError, highspy.HighsModelStatus.kSolveError):
+            termination = 'error'
+        else:
+            termination = 'feasible' if has_solution else 'unknown'
+
+        solution = np.array(h.getSolution().col_value) if has_solution else None
+        objective = float(c @ solution) if has_solution else None
+        bound = info.mip_dual_bound if abs(info.mip_dual_bound) != highspy.kHighsInf else None
+        return SolveResult('highspy', termination, has_solution, objective, bound, runtime,
+                           h.modelStatusToString(status), incumbents), solution
+
+    def _solve_scipy(self, c, time_limit, mip_gap, tee, cuts=None, bounds=None):
+        from scipy.optimize import milp, LinearConstraint, Bounds
+
+        options = {'disp': bool(tee)}
+        if time_limit is not None:
+            options['time_limit'] = float(time_limit)
+        if mip_gap is not None:
+            options['mip_rel_gap'] = float(mip_gap)
+
+        constraints = [LinearConstraint(self.matrix(), self.row_lower, self.row_upper)] if self.num_rows else []
+        if cuts is not None:
+            constraints.append(LinearConstraint(*cuts))
+        start = time.time()
+        try:
+            # milp minimizes, so negate the maximization objective
+            res = milp(-c, constraints=constraints, integrality=self.integrality,
+                       bounds=Bounds(*(bounds if bounds is not None else (self.col_lower, self.col_upper))),
+                       options=options)
+        except Exception as e:
+            return SolveResult('scipy', 'error', False, runtime=time.time() - start, message=str(e)), None
+        runtime = time.time() - start
+
+        has_solution = res.x is not None
+        termination = {0: 'optimal', 1: 'time_limit', 2: 'infeasible', 3: 'unknown'}.get(res.status, 'error')
+        if res.status == 4 and has_solution:
+            termination = 'feasible'
+        objective = float(c @ res.x) if has_solution else None
+        dual_bound = getattr(res, 'mip_dual_bound', None)
+        bound = -dual_bound if dual_bound is not None and np.isfinite(dual_bound) else None
+        return SolveResult('scipy', termination, has_solution, objective, bound, runtime, res.message), \
+            (np.asarray(res.x) if has_solution else None)
+
+    def write_mps(self, path, weights):
+        """
+        Write the model for the given weights to a free-format MPS file.
+
+        Any MPS-reading solver (HiGHS, CBC, GLPK, Gurobi, ...) can then solve it
+        offline; column names follow column_names().
+        """
+        A = self.matrix().tocsc()
+        c = self.objective(weights)
+        col_names = self.column_names()
+        row_names = self.row_names()
+
+        lines = ['NAME refscheduling', 'OBJSENSE', '    MAX', 'ROWS', ' N obj']
+        for name, lower, upper in zip(row_names, self.row_lower, self.row_upper):
+            if lower == upper:
+                kind = 'E'
+            elif np.isfinite(lower):
+                kind = 'G'
+            else:
+                kind = 'L'
+            lines.append(f" {kind} {name}")
+
+        lines.append('COLUMNS')
+        in_integer_block = False
+        for j in range(self.num_cols):
+            if self.integrality[j] and not in_integer_block:
+                lines.append("    MARKER 'MARKER' 'INTORG'")
+                in_integer_block = True
+            elif not self.integrality[j] and in_integer_block:
+                lines.append("    MARKER 'MARKER' 'INTEND'")
+                in_integer_block = False
+            if c[j] != 0:
+                lines.append(f"    {col_names[j]} obj {_number(c[j])}")
+            for p in range(A.indptr[j], A.indptr[j + 1]):
+                lines.append(f"    {col_names[j]} {row_names[A.indices[p]]} {_number(A.data[p])}")
+        if in_integer_block:
+            lines.append("    MARKER 'MARKER' 'INTEND'")
+
+        lines.append('RHS')
+        ranges = []
+        for name, lower, upper in zip(row_names, self.row_lower, self.row_upper):
+            if np.isfinite(lower) and np.isfinite(upper) and lower != upper:
+                rhs = lower
+                ranges.append(f"    rng {name} {_number(upper - lower)}")
+            else:
+                rhs = lower if np.isfinite(lower) else upper
+            if rhs != 0:
+                lines.append(f"    rhs {name} {_number(rhs)}")
+        if ranges:
+            lines.append('RANGES')
+            lines.extend(ranges)
+
+        lines.append('BOUNDS')
+        for name, lower, upper, integer in zip(col_names, self.col_lower, self.col_upper, self.integrality):
+            if not np.isfinite(lower):
+                lines.append(f" MI bnd {name}")
+            elif lower != 0:
+                lines.append(f" LO bnd {name} {_number(lower)}")
+            if np.isfinite(upper):
+                lines.append(f" UP bnd {name} {_number(upper)}")
+            elif integer:
+                # Readers take an integer column with no upper bound as binary (e.g. elastic slack)
+                lines.append(f" PL bnd {name}")
+        lines.append('ENDATA')
+
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def input_hash(refs, games, max_hours_per_week, max_hours_per_day, skill_combo_formulation='pairs',
+               families=(), symmetry_breaking=False, elastic=False, presolve=True):
+    """
+    Hash everything that shapes the model except the objective weights.
+
+    Two runs with the same hash build identical constraint matrices, so a
+    cached model can be re-solved with new weights instead of rebuilt.
+
+    Args:
+        refs: List of Ref objects
+        games: List of Game objects
+        max_hours_per_week, max_hours_per_day: Hour caps
+        skill_combo_formulation: 'pairs' (default) or 'spread'
+        families: Auxiliary families built (nonzero-weight objective terms)
+        symmetry_breaking: Whether interchangeable games are ordered
+        elastic: Whether MIN_REF and the hour caps have slack columns
+        presolve: Whether the presolve pass removed pairs (it changes the columns)
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    for ref in refs:
+        digest.update(repr((ref.get_name(), list(ref.get_availability() or []), ref.get_experience(),
+                            ref.get_effort(), ref.get_max_hours(), ref.get_assigned_games())).encode())
+    digest.update(b'|games|')
+    for game in games:
+        digest.update(repr((game.get_date(), game.get_time(), game.get_number(), game.get_difficulty(),
+                            game.get_location(), game.get_min_refs(), game.get_max_refs())).encode())
+    digest.update(repr((max_hours_per_week, max_hours_per_day, skill_combo_formulation,
+                        sorted(families), symmetry_breaking, elastic, presolve)).encode())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, max_entries=4):
+        """
+        Keep recently built models alive between optimize() calls.
+
+        The dashboard's job worker (phase2.jobs) holds one instance for its
+        lifetime, so a weight change only swaps the objective of the cached
+        model and re-solves; the cache is lost when the worker exits.
+
+        Args:
+            max_entries: Models kept before the least recently used is dropped
+        """
+        self.max_entries = max_entries
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached model for key (marking it recently used), or None."""
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                self.misses += 1
+                return None
+            self._models.move_to_end(key)
+            self.hits += 1
+            return model
+
+    def put(self, key, model):
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self):
+        return len(self._models)
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Objective components in reporting order, with the sign each takes in the objective
+COMPONENTS = ['effort', 'balancing', 'low_skill', 'shift_block', 'skill_combo']
+COMPONENT_SIGNS = {'effort': 1, 'balancing': -1, 'low_skill': -1, 'shift_block': -1, 'skill_combo': 1}
+
+# Scheduler attribute holding each component's weight
+WEIGHT_ATTRIBUTES = {
+    'effort': 'weight_effort_bonus',
+    'balancing': 'weight_hour_balancing',
+    'low_skill': 'weight_low_skill_penalty',
+    'shift_block': 'weight_shift_block_penalty',
+    'skill_combo': 'weight_skill_combo'
+}
+
+# Target baseline for all normalized objectives (when weights = 1.0, objectives should be around this value)
+# Scale: 0-10 for weight control, starting at 2.5 baseline for balanced objectives
+TARGET_BASELINE = 2.5
+WEIGHT_SCALE_MAX = 10.0
+
+# Objective cost of each missing ref or hour over a cap in elastic mode. A weighted
+# component moves by a few units per assignment at most, so any schedule with fewer
+# violations scores higher.
+ELASTIC_PENALTY = 1000.0
+
+
+def scheduler_weights(scheduler):
+    """Read the five objective weights off a Scheduler as a component -> weight dict."""
+    return {name: getattr(scheduler, attribute) for name, attribute in WEIGHT_ATTRIBUTES.items()}
+
+
+def normalization_constants(index):
+    """
+    Compute the fixed constants that scale every objective component to ~TARGET_BASELINE.
+
+    Shared by the Pyomo and matrix model builders so both optimize the same objective.
+
+    Args:
+        index: ScheduleIndex for the week
+
+    Returns:
+        dict: C_set (refs not at their cap), the mean values and the component normalizers
+    """
+    num_refs = index.num_refs
+
+    # Define set C = refs not at their cap (static evaluation)
+    # C = refs where max_hours > mean_max_hours - 3
+    mean_max_hours = float(index.ref_max_hours.mean()) if num_refs else 0.0
+    threshold = mean_max_hours - 3
+    C_set = [r for r in range(num_refs) if index.ref_max_hours[r] > threshold]
+
+    # Calculate mean effort across refs in C (constant)
+    all_ref_efforts = [index.ref_effort[r] for r in C_set] if C_set else [1]
+    MEAN_EFFORT = float(np.mean(all_ref_efforts))
+
+    # Calculate expected mean hours (constant - based on total games distributed)
+    expected_total_assignments = len(index.games) * 2  # Assuming ~2 refs per game on average
+    MEAN_HOURS = expected_total_assignments / len(C_set) if C_set else 1.0
+
+    # Calculate mean skill across all refs (constant)
+    MEAN_SKILL = float(index.ref_experience.mean()) if num_refs else 3.0
+
+    # Calculate mean difficulty across all (d, h, g) cells (constant)
+    MEAN_DIFFICULTY = float(index.slot_difficulty.mean()) if index.slot_difficulty.size else 3.0
+
+    max_possible_starts = num_refs * index.num_days
+    TB_NORMALIZER = max_possible_starts * 0.3 if max_possible_starts > 0 else 1.0
+
+    max_skill_diff = 4.0  # Max experience is 5, min is 1: 5-1=4
+    max_possible_pairs = num_refs * (num_refs - 1) / 2  # All possible ref pairs
+    expected_active_pairs = max_possible_pairs * 0.6  # Expect 60% of pairs to be active
+    COMBO_NORMALIZER = max_skill_diff * expected_active_pairs if expected_active_pairs > 0 else 1.0
+
+    return {
+        'C_set': C_set,
+        'NUM_GAMES': len(index.games),
+        'mean_max_hours': mean_max_hours,
+        'threshold': threshold,
+        'MEAN_EFFORT': MEAN_EFFORT,
+        'MEAN_HOURS': MEAN_HOURS,
+        'MEAN_SKILL': MEAN_SKILL,
+        'MEAN_DIFFICULTY': MEAN_DIFFICULTY,
+        # Each normalizer is adjusted so the typical objective value = TARGET_BASELINE
+        'EFFORT_NORMALIZER': (MEAN_EFFORT * MEAN_HOURS) / TARGET_BASELINE,
+        'BALANCING_NORMALIZER': 1.0 / TARGET_BASELINE,  # Balancing typically ranges 0-3
+        'SKILL_NORMALIZER': MEAN_SKILL / TARGET_BASELINE,
+        'TB_NORMALIZER': TB_NORMALIZER / TARGET_BASELINE,
+        'COMBO_NORMALIZER': COMBO_NORMALIZER / TARGET_BASELINE
+    }
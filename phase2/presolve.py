@@ -0,0 +1,123 @@
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+
+
+class PresolveResult:
+    def __init__(self, pairs_before, pairs_after, removed, idle_refs, covered_games, error=None):
+        """
+        What the presolve pass removed from the free problem.
+
+        Args:
+            pairs_before, pairs_after: Feasible (ref, game) pairs before and after
+            removed: Reason -> number of pairs removed for it
+            idle_refs: Refs left with no free game (no availability, no hours left)
+            covered_games: Games whose seats are all taken by manual assignments
+            error: Message if the manual assignments already break a hard constraint
+        """
+        self.pairs_before = pairs_before
+        self.pairs_after = pairs_after
+        self.removed = removed
+        self.idle_refs = idle_refs
+        self.covered_games = covered_games
+        self.error = error
+
+    @property
+    def shrink(self):
+        """Fraction of the x variables removed."""
+        return 1 - self.pairs_after / self.pairs_before if self.pairs_before else 0.0
+
+    def to_dict(self):
+        return {
+            'pairs_before': self.pairs_before,
+            'pairs_after': self.pairs_after,
+            'removed': dict(self.removed),
+            'idle_refs': len(self.idle_refs),
+            'covered_games': len(self.covered_games),
+            'shrink': self.shrink
+        }
+
+    def summary(self):
+        reasons = ', '.join(f"{count} {reason}" for reason, count in self.removed.items() if count)
+        return (f"Presolve: {self.pairs_before} -> {self.pairs_after} pairs ({self.shrink:.1%} smaller"
+                f"{'; ' + reasons if reasons else ''}), {len(self.idle_refs)} refs with no free games, "
+                f"{len(self.covered_games)} games fully covered by manual assignments")
+
+
+def presolve(index, fixed_pairs=(), max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+             max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY):
+    """
+    Remove the (ref, game) pairs that no feasible schedule can use.
+
+    The manual assignments are fixed first and taken off each ref's slot,
+    night and week capacity and each game's seats. A pair is dropped when:
+      - its ref is already fixed to another game in that hour;
+      - its ref has no hours left that night or week (this includes refs
+        with max_hours = 0);
+      - its game's MAX_REF seats are all taken by manual assignments.
+    Only pairs that must be 0 are removed, so the optimum is unchanged; the
+    model rules over fewer pairs then skip more rows on their own. Refs stay
+    in the index (they still count towards the mean hours), they just have
+    no columns left.
+
+    The index is restricted in place (see ScheduleIndex.restrict_pairs).
+
+    Args:
+        index: ScheduleIndex for the week
+        fixed_pairs: (r, k) manual assignments
+        max_hours_per_week, max_hours_per_day: Hour caps
+
+    Returns:
+        PresolveResult
+    """
+    fixed = set(fixed_pairs)
+    pairs_before = len(index.pairs)
+
+    fixed_slot = {}   # (r, d, h) -> fixed game
+    fixed_day = {}    # (r, d) -> fixed games that night
+    fixed_week = [0] * index.num_refs
+    fixed_seats = [0] * index.num_games
+    error = None
+    for r, k in sorted(fixed):
+        d, h, _ = index.game_slot[k]
+        if (r, d, h) in fixed_slot and error is None:
+            error = (f"{index.refs[r].get_name()} is manually assigned to two games at "
+                     f"{index.sorted_days[d]} {index.sorted_times[h]}")
+        fixed_slot[(r, d, h)] = k
+        fixed_day[(r, d)] = fixed_day.get((r, d), 0) + 1
+        fixed_week[r] += 1
+        fixed_seats[k] += 1
+
+    week_left = [min(max_hours_per_week, index.ref_max_hours[r]) - fixed_week[r] for r in range(index.num_refs)]
+    for r in range(index.num_refs):
+        if week_left[r] < 0 and error is None:
+            error = f"{index.refs[r].get_name()} has more manual assignments than their weekly hour cap"
+    for (r, d), count in fixed_day.items():
+        if count > max_hours_per_day and error is None:
+            error = (f"{index.refs[r].get_name()} has more manual assignments on "
+                     f"{index.sorted_days[d]} than max_hours_per_day")
+    for k in range(index.num_games):
+        if fixed_seats[k] > index.game_max_refs[k] and error is None:
+            game = index.game_list[k]
+            error = f"Game {game.get_number()} has more manual assignments than its {index.game_max_refs[k]} max refs"
+
+    removed = {'slot taken': 0, 'no hours left': 0, 'game covered': 0}
+    keep = []
+    for r, k in index.pairs:
+        if (r, k) in fixed:
+            keep.append((r, k))
+            continue
+        d, h, _ = index.game_slot[k]
+        if (r, d, h) in fixed_slot:
+            removed['slot taken'] += 1
+        elif week_left[r] <= 0 or fixed_day.get((r, d), 0) >= max_hours_per_day:
+            removed['no hours left'] += 1
+        elif fixed_seats[k] >= index.game_max_refs[k]:
+            removed['game covered'] += 1
+        else:
+            keep.append((r, k))
+    index.restrict_pairs(keep)
+
+    idle_refs = [r for r in range(index.num_refs)
+                 if all((r, k) in fixed for k in index.pairs_by_ref[r])]
+    covered_games = [k for k in range(index.num_games)
+                     if fixed_seats[k] and len(index.pairs_by_game[k]) == fixed_seats[k]]
+    return PresolveResult(pairs_before, len(index.pairs), removed, idle_refs, covered_games, error)
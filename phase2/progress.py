@@ -0,0 +1,221 @@
+import io
+import json
+import os
+import re
+import sys
+import time
+
+# Solver log lines carrying (incumbent, bound), per backend
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|-?inf'
+LOG_PATTERNS = [
+    # HiGHS: "L   0   0   0   0.00%   -8.29   -9.18   9.69%   1200   88   0   460   0.2s"
+    ('highs', re.compile(rf'^\s*[A-Za-z]?\s+\d+\s+\d+\s+\d+\s+[\d.]+%\s+(?P<bound>{_NUMBER})\s+'
+                         rf'(?P<incumbent>{_NUMBER})\s+(?:[\d.]+%|inf|Large)\s+\d+\s+\d+\s+\d+\s+\d+\s+'
+                         rf'(?P<time>[\d.]+)s')),
+    # Gurobi: "H    0     0    -3.2115385   -4.00000  24.6%     -    0s"
+    ('gurobi', re.compile(rf'^\s*[H*]?\s*\d+\s+\d+.*?\s(?P<incumbent>{_NUMBER})\s+(?P<bound>{_NUMBER})\s+'
+                          rf'[\d.]+%\s+\S+\s+(?P<time>\d+)s\s*$')),
+    # CBC: "Cbc0010I After 100 nodes, 3 on tree, -8.5 best solution, best possible -9.1 (0.52 seconds)"
+    ('cbc', re.compile(rf'Cbc00(?:10|04)I .*?(?P<incumbent>{_NUMBER}) best solution, best possible '
+                       rf'(?P<bound>{_NUMBER}) \((?P<time>[\d.]+) seconds\)')),
+    ('cbc', re.compile(rf'Cbc0012I Integer solution of (?P<incumbent>{_NUMBER}) .*\((?P<time>[\d.]+) seconds\)')),
+    # GLPK: "+   123: mip =  -8.5e+00 >=  -9.1e+00   6.7% (12; 0)" (no clock; wall time is used)
+    ('glpk', re.compile(rf'^\+\s*\d+: mip =\s+(?P<incumbent>{_NUMBER}|not found yet)\s+[<>]=\s+'
+                        rf'(?P<bound>{_NUMBER}|tree is empty)')),
+]
+
+
+def _number(text):
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return value if abs(value) != float('inf') else None
+
+
+class ProgressLog:
+    def __init__(self, path=None, stop_path=None, incumbents_path=None):
+        """
+        Stream of solver progress events.
+
+        Each event is a dict with 'time' (wall clock), 'runtime' (seconds
+        into the solve), 'incumbent' and 'bound' (objective of the best
+        schedule and best bound proven so far, None until known), 'gap'
+        (relative, as in SolveResult.gap) and 'solutions' (improving
+        schedules found). Backends emit an event from their callback or from
+        their log whenever one of these changes; with `path` each event is
+        also appended to a JSON-lines file as it happens, so another process
+        can follow the solve (see read_progress).
+
+        Creating the file at `stop_path` asks the solve to stop and keep its
+        incumbent; backends that can be interrupted (highspy) check it from
+        their callback, the others run to their limits.
+
+        Backends that hand over each improving solution (highspy) also
+        publish it whole: its assignments and component breakdown go to
+        `incumbents` and, with `incumbents_path`, to a second JSON-lines
+        file, so a schedule can be shown (and accepted) while the solve
+        keeps improving it.
+
+        Args:
+            path: Optional .jsonl file the events are appended to
+            stop_path: Optional file whose existence requests an early stop
+            incumbents_path: Optional .jsonl file the published incumbents are appended to
+        """
+        self.path = path
+        self.stop_path = stop_path
+        self.incumbents_path = incumbents_path
+        self.events = []
+        self.incumbents = []
+        self.solutions = 0
+        self._last = None
+        self._start = time.time()
+
+    def begin(self):
+        """Start of a solve; runtimes from log parsers without a clock count from here."""
+        self._start = time.time()
+        self.solutions = 0
+        self._last = None
+
+    def emit(self, runtime=None, incumbent=None, bound=None, improved=False):
+        """Record an event if the incumbent, bound or solution count changed."""
+        if improved:
+            self.solutions += 1
+        elif incumbent is not None and (self._last is None or self._last['incumbent'] is None):
+            self.solutions = max(self.solutions, 1)
+        gap = None
+        if incumbent is not None and bound is not None:
+            gap = abs(bound - incumbent) / max(abs(incumbent), 1e-10)
+        key = (incumbent, bound, self.solutions)
+        if self._last is not None and (self._last['incumbent'], self._last['bound'], self._last['solutions']) == key:
+            return
+        event = {
+            'time': time.time(),
+            'runtime': runtime if runtime is not None else time.time() - self._start,
+            'incumbent': incumbent,
+            'bound': bound,
+            'gap': gap,
+            'solutions': self.solutions
+        }
+        self._last = event
+        self.events.append(event)
+        if self.path is not None:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+
+    def publish(self, runtime, objective, components, assignments):
+        """
+        Record an improving schedule.
+
+        Args:
+            runtime: Seconds into the solve
+            objective: Weighted objective value
+            components: Component -> pre-weight value
+            assignments: One dict per (ref, game), as in Scheduler results
+        """
+        incumbent = {
+            'time': time.time(),
+            'runtime': runtime,
+            'objective': objective,
+            'components': components,
+            'assignments': assignments
+        }
+        self.incumbents.append(incumbent)
+        if self.incumbents_path is not None:
+            with open(self.incumbents_path, 'a') as f:
+                f.write(json.dumps(incumbent, default=str) + '\n')
+
+    def stop_requested(self):
+        return self.stop_path is not None and os.path.exists(self.stop_path)
+
+    def request_stop(self):
+        if self.stop_path is not None:
+            open(self.stop_path, 'w').close()
+
+    def parse_line(self, line):
+        """Emit an event for a solver log line that reports progress (any backend in LOG_PATTERNS)."""
+        for backend, pattern in LOG_PATTERNS:
+            match = pattern.search(line)
+            if match is None:
+                continue
+            fields = match.groupdict()
+            incumbent = _number(fields.get('incumbent'))
+            bound = _number(fields.get('bound'))
+            if bound is None and self._last is not None:
+                bound = self._last['bound']
+            # Logs round the incumbent differently from line to line
+            last = self._last['incumbent'] if self._last is not None else None
+            improved = incumbent is not None and (last is None or abs(incumbent - last) > 1e-5 * max(1.0, abs(last)))
+            runtime = _number(fields.get('time'))
+            self.emit(runtime, incumbent, bound, improved)
+            return True
+        return False
+
+    def summary(self):
+        """Last event, or None before the first."""
+        return self.events[-1] if self.events else None
+
+
+class _LogTee:
+    """Write-through stdout wrapper feeding complete lines to a ProgressLog."""
+
+    def __init__(self, stream, progress):
+        self._stream = stream
+        self._progress = progress
+        self._buffer = ''
+
+    def write(self, text):
+        self._stream.write(text)
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            self._progress.parse_line(line)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def fileno(self):
+        # Without a file descriptor, Pyomo's TeeStream has to go through write()
+        raise io.UnsupportedOperation('fileno')
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class parse_stdout:
+    def __init__(self, progress):
+        """
+        Context manager parsing what a Pyomo solver prints (tee=True) into progress events.
+
+        Does nothing when progress is None.
+        """
+        self.progress = progress
+        self._stdout = None
+
+    def __enter__(self):
+        if self.progress is not None:
+            self.progress.begin()
+            self._stdout = sys.stdout
+            sys.stdout = _LogTee(sys.stdout, self.progress)
+        return self.progress
+
+    def __exit__(self, *exc):
+        if self._stdout is not None:
+            sys.stdout = self._stdout
+        return False
+
+
+def read_progress(path):
+    """Events (or incumbents) written to a ProgressLog file so far (a partly written last line is skipped)."""
+    events = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    break
+    except OSError:
+        pass
+    return events
@@ -0,0 +1,158 @@
+import time
+
+import numpy as np
+
+from phase2.feasibility import staffing_check
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import normalization_constants
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK, ScheduleIndex
+from phase2.warm_start import solution_values
+
+# The week's weighted objective only breaks ties between repairs with the same number of
+# changes: weights are at most WEIGHT_SCALE_MAX and components sit near TARGET_BASELINE,
+# so at this scale it moves the objective by well under one change
+TIE_BREAK_SCALE = 1e-3
+
+
+class ScheduleRepair:
+    def __init__(self, refs, games, assignments, max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                 max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY):
+        """
+        Patch a solved week after a last-minute change, moving as few assignments as possible.
+
+        The repaired week is a MILP over the same hard constraints as the
+        weekly model whose objective counts the (ref, game) assignments that
+        differ from the current schedule. Only the nights the change touches
+        are reopened: on every other night the current crews are kept fixed,
+        so the model is a night's worth of free variables. If those nights
+        cannot be repaired on their own the whole week is reopened.
+
+        Args:
+            refs: List of Ref objects
+            games: List of Game objects of the current week
+            assignments: Current schedule as Scheduler result assignments
+                         (dicts with 'ref_name' and 'game_number')
+            max_hours_per_week, max_hours_per_day: Hour caps
+        """
+        self.refs = refs
+        self.games = games
+        self.max_hours_per_week = max_hours_per_week
+        self.max_hours_per_day = max_hours_per_day
+        self.current = {(assignment['ref_name'], assignment['game_number']) for assignment in assignments}
+
+    def solve(self, unavailable=None, cancelled=(), added=(), weights=None, time_limit=10, solver='auto',
+              elastic=False):
+        """
+        Apply a change and repair the schedule.
+
+        Args:
+            unavailable: {ref name: list of days, or None for the whole week}
+                         of refs who dropped out
+            cancelled: Numbers of cancelled games
+            added: New Game objects
+            weights: Optional component -> weight dict breaking ties between
+                     repairs with the same number of changes
+            time_limit: Seconds for the solve
+            solver: Matrix solver ('auto', 'highspy' or 'scipy')
+            elastic: Return a best-effort repair (missing refs, hours over
+                     caps) when no repair meets every hard constraint
+
+        Returns:
+            dict: 'success', 'error', 'games' (the week after the change),
+            'index', 'pairs' ((r, k) pairs of the repaired week), 'changes'
+            ('removed'/'added' (ref name, game number) lists), 'scope'
+            ('nights' or 'week'), 'violations' (elastic only), 'termination'
+            and 'runtime'
+        """
+        start = time.time()
+        unavailable = unavailable or {}
+        cancelled = set(cancelled)
+        games = [game for game in self.games if game.get_number() not in cancelled] + list(added)
+        index = ScheduleIndex(self.refs, games)
+        ref_position = {ref.get_name(): r for r, ref in enumerate(self.refs)}
+
+        # Pairs the change rules out: dropped-out refs on their days
+        dropped = set()
+        for name, days in unavailable.items():
+            r = ref_position.get(name)
+            if r is None:
+                continue
+            for k in index.pairs_by_ref[r]:
+                if days is None or index.sorted_days[index.game_slot[k][0]] in days:
+                    dropped.add((r, k))
+        pairs = [pair for pair in index.pairs if pair not in dropped]
+
+        current = set()
+        for name, number in self.current:
+            k = index.game_id.get(index.find_game_by_number(number))
+            if name in ref_position and k is not None:
+                current.add((ref_position[name], k))
+        lost = current & dropped
+        kept = current - dropped
+
+        manual = set(index.fixed_pairs()[0]) - dropped
+
+        # Nights the change touches: where refs were lost and where games were added
+        nights = {index.game_slot[k][0] for _, k in lost}
+        nights |= {index.game_to_slot[game][0] for game in added if game in index.game_to_slot}
+
+        result = None
+        for scope in ('nights', 'week'):
+            if scope == 'nights':
+                # Other nights keep exactly their current crews
+                scoped = [(r, k) for r, k in pairs if index.game_slot[k][0] in nights or (r, k) in kept]
+                fixed = manual | {(r, k) for r, k in kept if index.game_slot[k][0] not in nights}
+            else:
+                scoped = pairs
+                fixed = manual
+            index.restrict_pairs(scoped)
+            staffing = staffing_check(index, sorted(fixed), self.max_hours_per_week, self.max_hours_per_day)
+            if staffing.feasible:
+                result = self._solve_scope(index, sorted(fixed), kept, weights, time_limit, solver, False)
+                if result['success']:
+                    break
+            elif scope == 'week' and elastic:
+                result = self._solve_scope(index, sorted(fixed), kept, weights, time_limit, solver, True)
+            elif scope == 'week':
+                result = {'success': False, 'error': staffing.message(), 'termination': 'infeasible'}
+
+        result['scope'] = scope
+        result['games'] = games
+        result['index'] = index
+        if result['success']:
+            chosen = set(result['pairs'])
+            removed = sorted(current - chosen)
+            result['changes'] = {
+                'removed': [(self.refs[r].get_name(), index.game_list[k].get_number()) for r, k in removed]
+                           + sorted((name, number) for name, number in self.current if number in cancelled),
+                'added': [(self.refs[r].get_name(), index.game_list[k].get_number())
+                          for r, k in sorted(chosen - current)]
+            }
+        result['runtime'] = time.time() - start
+        return result
+
+    def _solve_scope(self, index, fixed, kept, weights, time_limit, solver, elastic):
+        """Solve the repair over the pairs currently in the index."""
+        norm = normalization_constants(index)
+        model = MatrixModel(index, self.max_hours_per_week, self.max_hours_per_day, fixed, normalizers=norm,
+                            elastic=elastic)
+
+        # Maximize sum of kept x - sum of other x, i.e. minimize the assignments changed
+        x0, x1 = model.blocks['x']
+        keep = np.array([(int(r), int(k)) in kept for r, k in zip(model.pair_r, model.pair_k)])
+        cost = -model.violation_cost.copy()
+        cost[x0:x1] += np.where(keep, 1.0, -1.0)
+        if weights:
+            cost += TIE_BREAK_SCALE * (model.objective(weights) + model.violation_cost)
+
+        start = None
+        if not elastic:
+            start = model.start_vector(solution_values(index, [pair for pair in index.pairs if pair in kept], norm))
+        result, solution = model.solve(None, solver, time_limit, 0.0, tee=False, start=start, cost=cost)
+        if solution is None:
+            return {'success': False, 'error': result.message or 'No repair found', 'termination': result.termination}
+        repaired = {'success': True, 'error': None, 'pairs': model.selected_pairs(solution),
+                    'termination': result.termination}
+        if elastic:
+            repaired['violations'] = model.violations(solution)
+        return repaired
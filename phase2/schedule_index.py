@@ -0,0 +1,206 @@
+import numpy as np
+from datetime import datetime
+
+DAYS_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Hour caps used when none are set: the Scheduler's defaults and the dashboard's starting values
+DEFAULT_MAX_HOURS_PER_WEEK = 20
+DEFAULT_MAX_HOURS_PER_DAY = 8
+
+# Fallback difficulty levels for division names that are not numeric
+DIFFICULTY_MAP = {
+    "Open - Just Fun": 4,
+    "Open - Top Gun": 5,
+    "Co-Rec - Just Fun": 1,
+    "Co-Rec - Top Gun": 4,
+    "Womens": 3,
+    "TBD": 3
+}
+
+
+def parse_time_for_sort(time_str):
+    """Parse a game time ('18:30' or '18') into a time object for sorting."""
+    try:
+        if ':' in time_str:
+            return datetime.strptime(time_str, "%H:%M").time()
+        else:
+            return datetime.strptime(f"{time_str}:00", "%H:%M").time()
+    except (ValueError, TypeError):
+        return datetime.strptime("12:00", "%H:%M").time()
+
+
+def difficulty_value(difficulty_str):
+    """Convert a game difficulty (numeric or division name) to a number."""
+    try:
+        return float(difficulty_str)
+    except (ValueError, TypeError):
+        return DIFFICULTY_MAP.get(difficulty_str, 3)
+
+
+def availability_flag(value):
+    """Coerce a raw availability entry to 0/1, treating bad values as unavailable."""
+    if isinstance(value, int):
+        return 1 if value else 0
+    try:
+        return 1 if int(value) else 0
+    except (ValueError, TypeError):
+        return 0
+
+
+class ScheduleIndex:
+    def __init__(self, refs, games, times=None):
+        """
+        Build the (day, time, game) lookup tables used by the optimizer.
+
+        Days are ordered Monday-Sunday, times by clock time and games within a
+        slot by game number, so index (d, h, g) is stable for a given input.
+        Everything is computed once here; the model rules only read arrays.
+
+        Args:
+            refs: List of Ref objects
+            games: List of Game objects
+            times: Optional time slots to lay out instead of the games' own, so
+                   that hours h keep their positions in a larger schedule (one
+                   night solved on its own, see phase2.decomposition); ref
+                   availability then has one entry per slot in `times`
+        """
+        self.refs = refs
+        self.games = games
+        self.num_refs = len(refs)
+
+        unique_days = set(game.get_date() for game in games)
+        unique_times = set(times if times is not None else (game.get_time() for game in games))
+        self.sorted_days = sorted(unique_days, key=lambda day: DAYS_ORDER.index(day) if day in DAYS_ORDER else 999)
+        self.sorted_times = sorted(unique_times, key=parse_time_for_sort)
+        self.num_days = len(self.sorted_days)
+        self.num_times = len(self.sorted_times)
+
+        day_pos = {day: d for d, day in enumerate(self.sorted_days)}
+        time_pos = {time: h for h, time in enumerate(self.sorted_times)}
+
+        # Group games by (d, h) and order them by game number
+        games_by_slot = {}
+        for game in games:
+            key = (day_pos[game.get_date()], time_pos[game.get_time()])
+            games_by_slot.setdefault(key, []).append(game)
+        for slot_games in games_by_slot.values():
+            slot_games.sort(key=lambda game: game.get_number())
+
+        self.max_games_in_hour = max((len(g) for g in games_by_slot.values()), default=0)
+        shape = (self.num_days, self.num_times, self.max_games_in_hour)
+
+        # Dense (d, h, g) -> Game table plus per-slot game data (0 where no game)
+        self.slot_games = np.full(shape, None, dtype=object)
+        self.slot_scheduled = np.zeros(shape, dtype=int)
+        self.slot_difficulty = np.zeros(shape)
+        self.slot_min_refs = np.zeros(shape, dtype=int)
+        self.slot_max_refs = np.zeros(shape, dtype=int)
+        self.game_to_slot = {}  # Game -> (d, h, g)
+        self.games_by_number = {}
+
+        for (d, h), slot_games in games_by_slot.items():
+            for g, game in enumerate(slot_games):
+                self.slot_games[d, h, g] = game
+                self.slot_scheduled[d, h, g] = 1
+                self.slot_difficulty[d, h, g] = difficulty_value(game.get_difficulty())
+                self.slot_min_refs[d, h, g] = game.get_min_refs()
+                self.slot_max_refs[d, h, g] = game.get_max_refs()
+                self.game_to_slot[game] = (d, h, g)
+
+        for game in games:
+            self.games_by_number.setdefault(game.get_number(), game)
+
+        # Flat game ids k in (d, h, g) order, used to index the sparse variables
+        self.game_list = [self.slot_games[slot] for slot in zip(*np.nonzero(self.slot_scheduled))]
+        self.game_slot = [self.game_to_slot[game] for game in self.game_list]
+        self.game_id = {game: k for k, game in enumerate(self.game_list)}
+        self.num_games = len(self.game_list)
+        self.game_difficulty = np.array([self.slot_difficulty[slot] for slot in self.game_slot])
+        self.game_min_refs = np.array([self.slot_min_refs[slot] for slot in self.game_slot], dtype=int)
+        self.game_max_refs = np.array([self.slot_max_refs[slot] for slot in self.game_slot], dtype=int)
+
+        # Per-ref data
+        self.ref_experience = np.array([ref.get_experience() for ref in refs], dtype=float)
+        self.ref_effort = np.array([ref.get_effort() for ref in refs], dtype=float)
+        self.ref_max_hours = np.array([ref.get_max_hours() for ref in refs], dtype=float)
+
+        # a_{r,d,h}: availability lists are laid out day-major, one entry per time slot
+        self.availability = np.zeros((self.num_refs, self.num_days, self.num_times), dtype=int)
+        for r, ref in enumerate(refs):
+            availability = ref.get_availability() or []
+            for d in range(self.num_days):
+                for h in range(self.num_times):
+                    i = d * self.num_times + h
+                    if i < len(availability):
+                        self.availability[r, d, h] = availability_flag(availability[i])
+
+        # Feasible (r, k) pairs: the ref is available and the game exists
+        self.restrict_pairs((r, k) for r in range(self.num_refs)
+                            for k, (d, h, g) in enumerate(self.game_slot) if self.availability[r, d, h])
+
+    def restrict_pairs(self, pairs):
+        """
+        Replace the feasible (r, k) pairs and rebuild the per-ref/game/slot lookups.
+
+        Used by phase2.presolve to drop pairs that can never be assigned.
+
+        Args:
+            pairs: (r, k) pairs in (r, k) order
+        """
+        self.pairs = []
+        self.pairs_by_ref = [[] for _ in range(self.num_refs)]
+        self.pairs_by_game = [[] for _ in range(self.num_games)]
+        self.pairs_by_ref_day = {}   # (r, d) -> [k]
+        self.pairs_by_ref_slot = {}  # (r, d, h) -> [k]
+        for r, k in pairs:
+            d, h, _ = self.game_slot[k]
+            self.pairs.append((r, k))
+            self.pairs_by_ref[r].append(k)
+            self.pairs_by_game[k].append(r)
+            self.pairs_by_ref_day.setdefault((r, d), []).append(k)
+            self.pairs_by_ref_slot.setdefault((r, d, h), []).append(k)
+        self.pair_set = set(self.pairs)
+
+    def get_game_info(self, d, h, g):
+        """Return the Game object at (d, h, g) if it exists, else None."""
+        if d >= self.num_days or h >= self.num_times or g >= self.max_games_in_hour:
+            return None
+        return self.slot_games[d, h, g]
+
+    def game_to_index(self, game):
+        """Return the (d, h, g) indices of a Game object, or None if not indexed."""
+        if not game:
+            return None
+        return self.game_to_slot.get(game)
+
+    def find_game_by_number(self, game_number):
+        """Return the first game with the given number, or None."""
+        return self.games_by_number.get(game_number)
+
+    def fixed_pairs(self):
+        """
+        Map the refs' manual assignments to (r, k) pairs.
+
+        Call before phase2.presolve restricts the pairs, which would hide
+        assignments the ref is not available for.
+
+        Returns:
+            tuple: (pairs, unmapped, unavailable): the (r, k) pairs to fix, and the
+            (r, game number) assignments to games not in this week and to games
+            outside the ref's availability
+        """
+        pairs, unmapped, unavailable = [], [], []
+        for r, ref in enumerate(self.refs):
+            for game_number in ref.get_assigned_games():
+                k = self.game_id.get(self.find_game_by_number(game_number))
+                if k is None:
+                    unmapped.append((r, game_number))
+                elif (r, k) not in self.pair_set:
+                    unavailable.append((r, game_number))
+                else:
+                    pairs.append((r, k))
+        return pairs, unmapped, unavailable
+
+    def dense_size(self):
+        """Number of cells in the dense r x d x h x g assignment block."""
+        return self.num_refs * self.num_days * self.num_times * self.max_games_in_hour
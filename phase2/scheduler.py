@@ -1,3 +1,14 @@
+import numpy as np
+
+from phase2.evaluate import ScheduleEvaluator, assignment_matrix
+from phase2.feasibility import staffing_check
+from phase2.objective import COMPONENTS, COMPONENT_SIGNS, TARGET_BASELINE, WEIGHT_SCALE_MAX, normalization_constants, scheduler_weights
+from phase2.presolve import presolve
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK, ScheduleIndex
+from phase2.symmetry import canonical_pairs, interchangeable_games, symmetry_rows
+from phase2.warm_start import construct_schedule, solution_values
+
+
 class Scheduler:
     def __init__(self, refs, games):
         """
@@ -11,8 +22,8 @@ class Scheduler:
         self.games = games
         
         # Optimization parameters (will be set from Schedule Management)
-        self.max_hours_per_week = 20
-        self.max_hours_per_day = 8
+        self.max_hours_per_week = DEFAULT_MAX_HOURS_PER_WEEK
+        self.max_hours_per_day = DEFAULT_MAX_HOURS_PER_DAY
         
         # Constraint weights
         self.weight_hour_balancing = 1.0
@@ -20,17 +31,120 @@ class Scheduler:
         self.weight_low_skill_penalty = 1.0
         self.weight_shift_block_penalty = 1.0
         self.weight_effort_bonus = 1.0
+
+        # Skill combination formulation: 'pairs' (one variable per ref pair that
+        # can share a game) or the opt-in 'spread' (per-game max/min experience)
+        self.skill_combo_formulation = 'pairs'
+
+        # Solver settings: backend name ('auto' tries Gurobi -> HiGHS -> CBC -> GLPK;
+        # 'local_search' anneals without a MILP solver, also used when none is installed)
+        self.solver = 'auto'
+        self.time_limit = 240
+        self.mip_gap = 0.05
+        self.threads = None
+        self.solver_fallback = True
+
+        # Model builder: 'pyomo', 'matrix' (sparse arrays, no Pyomo) or 'auto'
+        # (matrix for large leagues when solving with HiGHS)
+        self.builder = 'auto'
+
+        # Seed the solver with a greedy schedule (MIP start)
+        self.warm_start = True
+
+        # Order the crews of interchangeable games (same slot, difficulty and
+        # min/max refs) so the solver does not explore relabelled copies
+        self.symmetry_breaking = True
+
+        # Fix manual assignments and drop the pairs they rule out before building
+        self.presolve = True
+
+        # Best-effort mode: when the week cannot be fully staffed, solve with penalized
+        # slack on MIN_REF and the hour caps instead of failing
+        self.elastic = False
+
+        # Optional ModelCache: keeps built models (and their solver) alive between runs
+        self.model_cache = None
+
+        # Optional ProgressLog: receives incumbent/bound events while the solver runs
+        self.progress = None
+
+        # Decomposition: None (one weekly model) or 'day' (one model per night,
+        # solved in parallel by `workers` processes; None = one per CPU)
+        self.decomposition = None
+        self.workers = None
+
+        # Large-neighborhood search: improve the warm start by re-solving one night,
+        # ref cluster or difficulty tier at a time for the whole time limit (matrix builder)
+        self.lns = False
+
+        # Solution pool: also return pool_size - 1 alternative schedules, each differing
+        # from the others in at least pool_min_distance assignments (matrix builder only)
+        self.pool_size = 1
+        self.pool_min_distance = 10
+
+        # Optional SeasonLedger: the weeks already played, so balancing works on season
+        # totals and the fairness-day and repeat-pairing terms apply (matrix builder only)
+        self.season_ledger = None
+        self.weight_fairness_day = 1.0
+        self.weight_repeat_pairs = 1.0
     
     def set_parameters(self, params):
         """Set optimization parameters from Schedule Management."""
-        self.max_hours_per_week = params.get('max_hours_per_week', 20)
-        self.max_hours_per_day = params.get('max_hours_per_day', 8)
+        self.max_hours_per_week = params.get('max_hours_per_week', DEFAULT_MAX_HOURS_PER_WEEK)
+        self.max_hours_per_day = params.get('max_hours_per_day', DEFAULT_MAX_HOURS_PER_DAY)
         self.weight_hour_balancing = params.get('weight_hour_balancing', 1.0)
         self.weight_skill_combo = params.get('weight_skill_combo', 1.0)
         self.weight_low_skill_penalty = params.get('weight_low_skill_penalty', 1.0)
         self.weight_shift_block_penalty = params.get('weight_shift_block_penalty', 1.0)
         self.weight_effort_bonus = params.get('weight_effort_bonus', 1.0)
+        self.skill_combo_formulation = params.get('skill_combo_formulation', 'pairs')
+        self.solver = params.get('solver', 'auto')
+        self.time_limit = params.get('time_limit', 240)
+        self.mip_gap = params.get('mip_gap', 0.05)
+        self.threads = params.get('threads', None)
+        self.solver_fallback = params.get('solver_fallback', True)
+        self.builder = params.get('builder', 'auto')
+        self.warm_start = params.get('warm_start', True)
+        self.symmetry_breaking = params.get('symmetry_breaking', True)
+        self.presolve = params.get('presolve', True)
+        self.elastic = params.get('elastic', False)
+        self.decomposition = params.get('decomposition', None)
+        self.workers = params.get('workers', None)
+        self.lns = params.get('lns', False)
+        self.pool_size = params.get('pool_size', 1)
+        self.pool_min_distance = params.get('pool_min_distance', 10)
+        self.weight_fairness_day = params.get('weight_fairness_day', 1.0)
+        self.weight_repeat_pairs = params.get('weight_repeat_pairs', 1.0)
     
+    def set_model_cache(self, model_cache):
+        """
+        Reuse built models across optimize() calls.
+
+        With a cache the matrix builder is used and its HiGHS instance stays
+        loaded, so re-running with different weights only replaces the
+        objective and starts from the previous incumbent.
+        """
+        self.model_cache = model_cache
+
+    def set_progress(self, progress):
+        """
+        Stream solver progress (runtime, incumbent, bound, gap, solutions) into a ProgressLog.
+
+        The matrix builder's highspy solve reports from the solver callbacks,
+        publishes every improving schedule with its component breakdown and
+        stops early when the log's stop file appears; Pyomo backends report
+        by parsing their log. Decomposed solves are not tracked.
+        """
+        self.progress = progress
+
+    def set_season_ledger(self, ledger):
+        """
+        Schedule this week as part of a season (see phase2.season.SeasonScheduler).
+
+        The ledger is read, not updated; the caller records the solved week.
+        """
+        self.season_ledger = ledger
+
     def optimize(self):
         """
         Run the optimization algorithm to assign referees to games.
@@ -65,58 +179,191 @@ class Scheduler:
             print("No manual assignments found.")
         
 
-        # Start Pyomo Code
-        
-        import pyomo.environ as pyo
-        from pyomo.environ import RangeSet, Constraint
-        import numpy as np
-        from pyomo.opt import SolverFactory
+        import time
 
-        refs = self.refs
-        model = pyo.ConcreteModel()
+        build_start = time.time()
 
-        # Get the unique set of days and times from all games
-        unique_days = set()
-        days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        unique_times = set()
-        games_per_time = {}
+        refs = self.refs
 
-        for game in self.games:
-            day = game.get_date()
-            time = game.get_time()
-            unique_days.add(day)
-            unique_times.add(time)
-            # Use (day, time) as the key to count games at the same time
-            key = (day, time)
-            if key not in games_per_time:
-                games_per_time[key] = 0
-            games_per_time[key] += 1
-
-        # Find the maximum number of games occurring at the same time
-        max_games_in_hour = max(games_per_time.values()) if games_per_time else 1
+        # Build the (d, h, g) lookup tables once; every rule below reads from them
+        index = ScheduleIndex(self.refs, self.games)
+        max_games_in_hour = index.max_games_in_hour
 
         # Validate input dimensions before creating the decision variable
         num_refs = len(self.refs)
-        num_days = len(unique_days)
-        num_times = len(unique_times)
+        num_days = index.num_days
+        num_times = index.num_times
         if num_refs == 0 or num_days == 0 or num_times == 0 or max_games_in_hour == 0:
             raise ValueError("Cannot create decision variables: refs, days, times, or games per hour is zero.")
 
-        model.x = pyo.Var( # x_{r,d,h,g}
-            range(num_refs),
-            range(num_days),
-            range(num_times),
-            range(max_games_in_hour),
-            within=pyo.Binary
-        )
-        model.R = pyo.RangeSet(0, num_refs - 1)
-        model.D = pyo.RangeSet(0, num_days - 1)
-        model.H = pyo.RangeSet(0, num_times - 1)
-        model.G = pyo.RangeSet(0, max_games_in_hour - 1)
+        num_games = index.num_games
+        pairs = index.pairs
+        pairs_by_ref = index.pairs_by_ref
+        pairs_by_game = index.pairs_by_game
+        pairs_by_ref_slot = index.pairs_by_ref_slot
+
+        # Manual assignments become fixed (r, k) pairs
+        fixed_pairs, unmapped, unavailable = index.fixed_pairs()
+        for _, game_number in unmapped:
+            print(f"Warning: Could not map game number {game_number} to indices for manual assignment.")
+        if unavailable:
+            ref_idx, game_number = unavailable[0]
+            error = f"{refs[ref_idx].get_name()} is manually assigned to game {game_number} but is not available at that time"
+            print(f"❌ {error}")
+            return {'success': False, 'error': error}
+
+        # Take the manual assignments out of the free problem
+        reduction = None
+        if self.presolve:
+            reduction = presolve(index, fixed_pairs, self.max_hours_per_week, self.max_hours_per_day)
+            print(reduction.summary())
+            if reduction.error:
+                print(f"❌ {reduction.error}")
+                return {'success': False, 'error': reduction.error}
+            pairs = index.pairs
+            pairs_by_ref = index.pairs_by_ref
+            pairs_by_game = index.pairs_by_game
+            pairs_by_ref_slot = index.pairs_by_ref_slot
+
+        # Max-flow check: the model is feasible exactly when every game can be staffed to MIN_REF
+        staffing = staffing_check(index, fixed_pairs, self.max_hours_per_week, self.max_hours_per_day)
+        elastic = False
+        if not staffing.feasible:
+            error = staffing.message()
+            print(f"❌ {error}")
+            for row in staffing.slot_shortages():
+                print(f"  {row['day']} {row['time']}: games {row['games']} need {row['needed']} refs, "
+                      f"{row['available']} available, {row['missing']} missing")
+            if not self.elastic:
+                return {'success': False, 'error': error, 'shortage': staffing.to_dict()}
+            # Slack is only added when it is needed; a staffable week solves the usual model
+            elastic = True
+            # Lexicographic solve: relaxing a cap by one hour fills at most one more seat, so the
+            # fewest violations is exactly the flow shortage. The model caps its slack there and
+            # optimizes the usual objective among those schedules, with the usual mip_gap
+            print(f"Elastic mode: optimizing among the schedules with the fewest ({staffing.shortage}) "
+                  f"missing refs and hours over caps")
+        else:
+            print(staffing.message())
+
+        # Calculate all normalization constants as fixed values
+        norm = normalization_constants(index)
+        C_set = norm['C_set']
+        MEAN_SKILL = norm['MEAN_SKILL']
+        MEAN_DIFFICULTY = norm['MEAN_DIFFICULTY']
+        EFFORT_NORMALIZER = norm['EFFORT_NORMALIZER']
+        BALANCING_NORMALIZER = norm['BALANCING_NORMALIZER']
+        SKILL_NORMALIZER = norm['SKILL_NORMALIZER']
+        TB_NORMALIZER = norm['TB_NORMALIZER']
+        COMBO_NORMALIZER = norm['COMBO_NORMALIZER']
+
+        print(f"Mean max hours: {norm['mean_max_hours']:.2f}, Threshold: {norm['threshold']:.2f}")
+        print(f"Refs not at cap (C): {len(C_set)} out of {num_refs}")
+        print(f"=== NORMALIZATION CONSTANTS (Baseline: {TARGET_BASELINE}, Scale: 0-{WEIGHT_SCALE_MAX}) ===")
+        print(f"Mean Effort: {norm['MEAN_EFFORT']:.3f}")
+        print(f"Expected Mean Hours: {norm['MEAN_HOURS']:.3f}")
+        print(f"Mean Skill: {MEAN_SKILL:.3f}")
+        print(f"Mean Difficulty: {MEAN_DIFFICULTY:.3f}")
+        print(f"Effort Normalizer: {EFFORT_NORMALIZER:.3f}")
+        print(f"Skill Normalizer: {SKILL_NORMALIZER:.3f}")
+        print(f"Time Block Normalizer: {TB_NORMALIZER:.3f}")
+        print(f"Skill Combo Normalizer: {COMBO_NORMALIZER:.3f}")
+        print(f"All objectives target ~{TARGET_BASELINE} when weights = 1.0")
+        print(f"Weight scale: 0-{WEIGHT_SCALE_MAX} (0=disable, {TARGET_BASELINE}=baseline, {WEIGHT_SCALE_MAX}=max emphasis)")
+        print()
+
+        # Only build the auxiliary variable families whose objective weight is nonzero
+        build_balancing = self.weight_hour_balancing != 0 and len(C_set) > 0
+        build_shift_blocks = self.weight_shift_block_penalty != 0
+        build_skill_combo = self.weight_skill_combo != 0
+        build_skill_deficit = self.weight_low_skill_penalty != 0
+        skipped = [name for name, built in [('balancing (d)', build_balancing),
+                                            ('shift blocks (start)', build_shift_blocks),
+                                            ('skill combo', build_skill_combo),
+                                            ('skill deficit (u)', build_skill_deficit)] if not built]
+        if skipped:
+            print(f"Skipping zero-weight objective families: {', '.join(skipped)}")
+
+        symmetry_classes = interchangeable_games(index, fixed_pairs) if self.symmetry_breaking else []
+        if symmetry_classes:
+            print(f"Symmetry breaking: {sum(len(games) for games in symmetry_classes)} games in "
+                  f"{len(symmetry_classes)} interchangeable classes")
+
+        # Season history terms for this week's model
+        season = None
+        if self.season_ledger is not None:
+            from phase2.season import season_terms
+            season = season_terms(index, self.season_ledger, self.weight_fairness_day, self.weight_repeat_pairs)
+            print(f"Season mode: {self.season_ledger.weeks} weeks played, "
+                  f"{len(season['repeat_pairs'])} ref pairs have worked together")
+
+        # Greedy schedule honoring staffing, hour caps and manual assignments, used as a MIP start
+        start_values = None
+        if self.warm_start:
+            heuristic = construct_schedule(index, self.max_hours_per_week, self.max_hours_per_day, fixed_pairs)
+            print(f"Warm start heuristic: {len(heuristic['pairs'])} assignments in {heuristic['time'] * 1000:.1f} ms")
+            if heuristic['complete'] or elastic:
+                start_pairs = canonical_pairs(heuristic['pairs'], symmetry_classes)
+                start_values = solution_values(index, start_pairs, norm, self.skill_combo_formulation,
+                                               season['prior_hours'] if season else None,
+                                               season['repeat_pairs'] if season else None)
+                if elastic:
+                    # The greedy schedule respects the caps; missing refs go into the 'short' slack
+                    staffed = [0] * num_games
+                    for _, k in start_pairs:
+                        staffed[k] += 1
+                    start_values['short'] = {k: max(0, int(index.game_min_refs[k]) - staffed[k])
+                                             for k in range(num_games) if index.game_min_refs[k] > 0}
+                    start_values['over_day'] = {key: 0.0 for key in index.pairs_by_ref_day}
+                    start_values['over_week'] = {r: 0.0 for r in range(num_refs)}
+                    if sum(start_values['short'].values()) > staffing.shortage:
+                        print(f"Warm start skipped: the greedy schedule misses "
+                              f"{sum(start_values['short'].values())} refs, more than the fewest possible")
+                        start_values = None
+            else:
+                print(f"Warm start skipped: {len(heuristic['shortfall'])} games could not reach MIN_REF greedily")
+
+        families = [name for name, built in [('balancing', build_balancing),
+                                             ('shift_block', build_shift_blocks),
+                                             ('skill_combo', build_skill_combo),
+                                             ('low_skill', build_skill_deficit)] if built]
+        presolve_stats = reduction.to_dict() if reduction is not None else None
+        if self._use_local_search():
+            if season is not None:
+                print("Season history needs the matrix builder; this week is balanced on its own")
+            result = self._optimize_local_search(index, fixed_pairs, norm, build_start, elastic)
+            result['stats']['presolve'] = presolve_stats
+            return result
+        if self.decomposition == 'day':
+            if elastic or season is not None:
+                reason = 'elastic mode' if elastic else 'season history'
+                print(f"Day decomposition does not support {reason}; solving the whole week as one model")
+            else:
+                result = self._optimize_by_day(index, fixed_pairs, families, norm, build_start)
+                result['stats']['presolve'] = presolve_stats
+                return result
+        if self._use_matrix_builder(index):
+            result = self._optimize_matrix(index, fixed_pairs, families, norm, build_start, start_values,
+                                           symmetry_classes, elastic, staffing.shortage, season)
+            result['stats']['presolve'] = presolve_stats
+            return result
+        if season is not None:
+            print("Season history needs the matrix builder; this week is balanced on its own")
 
-        def is_available(r, d, h): # rule of a_{r,d,h}
-            availability = refs[r].get_availability()
-            return availability[d*num_times + h] #offset by day and get hour index
+        # Start Pyomo Code
+
+        import pyomo.environ as pyo
+        from pyomo.environ import RangeSet, Constraint
+        from phase2.solvers import backend_chain
+
+        model = pyo.ConcreteModel()
+
+        # x_{r,k} only exists where ref r is available and game k is scheduled,
+        # which replaces the old availability (rule4) and empty-slot (rule6) constraints
+        model.P = pyo.Set(initialize=pairs, dimen=2, ordered=True)
+        model.x = pyo.Var(model.P, within=pyo.Binary)
+        model.R = pyo.RangeSet(0, num_refs - 1)
+        model.K = pyo.RangeSet(0, num_games - 1)
 
         def get_ref_experience(r): # REx_r
             return refs[r].get_experience()
@@ -127,353 +374,121 @@ class Scheduler:
         def get_ref_max_weekly_hours(r):
             return refs[r].get_max_hours()
 
-        def game_to_index(game):
-            """
-            Convert a Game object to its (d, h, g) indices.
-            
-            Args:
-                game: Game object to convert
-                
-            Returns:
-                tuple: (d, h, g) indices, or None if game not found
-            """
-            if not game:
-                return None
-                
-            # Sort days and times (same as get_game_info)
-            sorted_days = sorted(unique_days, key=lambda day: days_order.index(day) if day in days_order else 999)
-            
-            def parse_time_for_sort(time_str):
-                from datetime import datetime
-                try:
-                    if ':' in time_str:
-                        return datetime.strptime(time_str, "%H:%M").time()
-                    else:
-                        return datetime.strptime(f"{time_str}:00", "%H:%M").time()
-                except:
-                    return datetime.strptime("12:00", "%H:%M").time()
-            
-            sorted_times = sorted(unique_times, key=parse_time_for_sort)
-            
-            # Find day index
-            target_day = game.get_date()
-            try:
-                d = sorted_days.index(target_day)
-            except ValueError:
-                return None  # Day not found
-            
-            # Find hour index  
-            target_time = game.get_time()
-            try:
-                h = sorted_times.index(target_time)
-            except ValueError:
-                return None  # Time not found
-            
-            # Find game index at this day/time
-            games_at_time = []
-            for g_candidate in self.games:
-                if g_candidate.get_date() == target_day and g_candidate.get_time() == target_time:
-                    games_at_time.append(g_candidate)
-            
-            # Sort games by their number (same as get_game_info)
-            games_at_time.sort(key=lambda g: g.get_number())
-            
-            # Find the position of our target game
-            try:
-                g = games_at_time.index(game)
-            except ValueError:
-                return None  # Game not found in the list
-            
-            return (d, h, g)
-
-        def get_game_info(d, h, g):
-            """
-            Return the Game object at (d, h, g) if it exists, else return None.
-            d: day index
-            h: time index
-            g: game index at that day/time
-            """
-            # Sort days and times
-            sorted_days = sorted(unique_days, key=lambda day: days_order.index(day) if day in days_order else 999)
-
-            def parse_time_for_sort(time_str):
-                from datetime import datetime
-                try:
-                    if ':' in time_str:
-                        return datetime.strptime(time_str, "%H:%M").time()
-                    else:
-                        return datetime.strptime(f"{time_str}:00", "%H:%M").time()
-                except:
-                    return datetime.strptime("12:00", "%H:%M").time()
-
-            sorted_times = sorted(unique_times, key=parse_time_for_sort)
-
-            # Check if indices are valid
-            if d >= len(sorted_days) or h >= len(sorted_times):
-                return None
-
-            target_day = sorted_days[d]
-            target_time = sorted_times[h]
-
-            # Find all games at this day/time
-            games_at_time = []
-            for game in self.games:
-                if game.get_date() == target_day and game.get_time() == target_time:
-                    games_at_time.append(game)
-
-            # Sort games by their number (lowest number = 0th game)
-            games_at_time.sort(key=lambda game: game.get_number())
-
-            if g >= len(games_at_time):
-                return None
-
-            return games_at_time[g]
-
-        # For compatibility, provide wrappers
-        def get_game_difficulty(d, h, g):
-            """Return the difficulty of the game at (d, h, g), or 0 if no game exists."""
-            game = get_game_info(d, h, g)
-            if not game:
-                return 0
-            difficulty_str = game.get_difficulty()
-            try:
-                return float(difficulty_str)
-            except ValueError:
-                difficulty_map = {
-                    "Open - Just Fun": 4,
-                    "Open - Top Gun": 5,
-                    "Co-Rec - Just Fun": 1,
-                    "Co-Rec - Top Gun": 4,
-                    "Womens": 3,
-                    "TBD": 3
-                }
-                return difficulty_map.get(difficulty_str, 3)
-
-        def is_game_scheduled(d, h, g):
-            """Return 1 if a game exists at (d, h, g), else 0."""
-            return 1 if get_game_info(d, h, g) else 0
-
-        # Handles both scheduled and number of refs
-        def get_max_refs(d, h, g):
-            game = get_game_info(d, h, g)
-            if not game:
-                return 0
-            return game.get_max_refs()
+        def get_game_difficulty(k):
+            """Return the difficulty of game k."""
+            return float(index.game_difficulty[k])
+
+        def slot_hours(model, r, d, h):
+            """Number of games ref r works at (d, h): sum_g x_{r,d,h,g}."""
+            return sum(model.x[r, k] for k in pairs_by_ref_slot.get((r, d, h), []))
 
-        def get_min_refs(d, h, g):
-            game = get_game_info(d, h, g)
-            if not game:
-                return 0
-            return game.get_min_refs()
-            
         # Hard Constraints 
+        model.RDH = pyo.Set(initialize=sorted(key for key, ks in pairs_by_ref_slot.items() if len(ks) > 1), dimen=3)
         def rule1(model, r, d, h):
             """No referee can be assigned to more than one game per hour."""
-            return sum(model.x[r, d, h, g] for g in model.G) <= 1
+            return slot_hours(model, r, d, h) <= 1
         model.rule1_constraint = Constraint(
-            model.R, model.D, model.H, rule=rule1
+            model.RDH, rule=rule1
         )
 
+        model.RD = pyo.Set(initialize=sorted(key for key, ks in index.pairs_by_ref_day.items()
+                                             if len(ks) > self.max_hours_per_day), dimen=2)
+        model.RW = pyo.Set(initialize=[r for r in range(num_refs)
+                                       if len(pairs_by_ref[r]) > min(self.max_hours_per_week, get_ref_max_weekly_hours(r))])
+        model.KM = pyo.Set(initialize=[k for k in range(num_games) if index.game_min_refs[k] > 0])
+
+        if elastic:
+            # Slack, capped in total below: refs missing from each game, hours over each cap
+            model.short = pyo.Var(model.KM, within=pyo.NonNegativeIntegers)
+            model.over_day = pyo.Var(model.RD, within=pyo.NonNegativeIntegers)
+            model.over_week = pyo.Var(model.RW, within=pyo.NonNegativeIntegers)
+
         def rule2(model, r, d):
             """No referee can work more than max_hours_per_day in a night."""
-            return sum(
-                sum(model.x[r, d, h, g] for g in model.G)
-                for h in model.H
-            ) <= self.max_hours_per_day
+            over = model.over_day[r, d] if elastic else 0
+            return sum(model.x[r, k] for k in index.pairs_by_ref_day[(r, d)]) - over <= self.max_hours_per_day
         model.rule2_constraint = Constraint(
-            model.R, model.D, rule=rule2
+            model.RD, rule=rule2
         )
 
         def rule3(model, r):
             """No referee can be scheduled more than the designated hours a week."""
-            return sum(
-                sum(
-                    sum(model.x[r, d, h, g] for g in model.G)
-                    for h in model.H
-                )
-                for d in model.D
-            ) <= min(self.max_hours_per_week, get_ref_max_weekly_hours(r))
+            cap = min(self.max_hours_per_week, get_ref_max_weekly_hours(r))
+            over = model.over_week[r] if elastic else 0
+            return sum(model.x[r, k] for k in pairs_by_ref[r]) - over <= cap
         model.rule3_constraint = Constraint(
-            model.R, rule=rule3
+            model.RW, rule=rule3
         )
 
-        def rule4(model, r, d, h, g):
-            """
-            No referee can be scheduled during a time they have no availability.
-            """
-            # is_available should return 0 or 1
-            avail = is_available(r, d, h)
-            # Defensive: if avail is not 0 or 1, treat as unavailable
-            if not isinstance(avail, int):
-                try:
-                    avail = int(avail)
-                except Exception:
-                    print('Excepted')
-                    avail = 0
-            return model.x[r, d, h, g] <= avail
-        model.rule4_constraint = Constraint(
-            model.R, model.D, model.H, model.G, rule=rule4
-        )
+        fixed_set = set(fixed_pairs)
 
-        def rule5_min(model, d, h, g):
+        def rule5_min(model, k):
             """Each scheduled game must have at least MIN_REF assigned."""
-            if not is_game_scheduled(d, h, g):
-                return pyo.Constraint.Skip
-            refs_assigned = sum(model.x[r, d, h, g] for r in model.R)
-            return refs_assigned >= get_min_refs(d, h, g)
+            if not elastic and pairs_by_game[k] and all((r, k) in fixed_set for r in pairs_by_game[k]):
+                return pyo.Constraint.Skip  # staffed by manual assignments alone
+            refs_assigned = sum(model.x[r, k] for r in pairs_by_game[k])
+            short = model.short[k] if elastic else 0
+            return refs_assigned + short >= int(index.game_min_refs[k])
         model.rule5_min_constraint = pyo.Constraint(
-            model.D, model.H, model.G, rule=rule5_min
+            model.KM, rule=rule5_min
         )
+
+        if elastic:
+            # Lexicographic second phase: no more slack than the max-flow shortage
+            model.slack_limit_constraint = pyo.Constraint(
+                expr=sum(model.short[k] for k in model.KM) + sum(model.over_day[key] for key in model.RD)
+                + sum(model.over_week[r] for r in model.RW) <= staffing.shortage
+            )
         
-        def rule5_max(model, d, h, g):
+        def rule5_max(model, k):
             """Each scheduled game must have no more than MAX_REF assigned."""
-            if not is_game_scheduled(d, h, g):
+            if len(pairs_by_game[k]) <= index.game_max_refs[k]:
                 return pyo.Constraint.Skip
-            refs_assigned = sum(model.x[r, d, h, g] for r in model.R)
-            return refs_assigned <= get_max_refs(d, h, g)
+            refs_assigned = sum(model.x[r, k] for r in pairs_by_game[k])
+            return refs_assigned <= int(index.game_max_refs[k])
         model.rule5_max_constraint = pyo.Constraint(
-            model.D, model.H, model.G, rule=rule5_max
+            model.K, rule=rule5_max
         )
 
-        def rule6(model, r, d, h, g):
-            """Referees can only work games that are scheduled."""
-            return model.x[r, d, h, g] <= is_game_scheduled(d, h, g)
-        model.rule6_constraint = Constraint(
-            model.R, model.D, model.H, model.G, rule=rule6
-        )
+        # Symmetry breaking: the lowest ref on each interchangeable game increases along its class
+        model.symmetry = pyo.ConstraintList()
+        for r, k2, lower_pairs in symmetry_rows(index, symmetry_classes):
+            model.symmetry.add(model.x[r, k2] <= sum(model.x[pair] for pair in lower_pairs))
 
-        # Helper function to find game by number
-        def find_game_by_number(game_number):
-            for game in self.games:
-                if game.get_number() == game_number:
-                    return game
-            return None
-        
         # User Defined Constraints
 
-        # Create a ConstraintList to hold manual assignment constraints
-        model.c1 = pyo.ConstraintList()
-
-        for ref_idx, ref in enumerate(refs):
-            for game_number in ref.get_assigned_games():
-                game = find_game_by_number(game_number)
-                indices = game_to_index(game)
-                if indices is not None:
-                    d, h, g = indices
-                    # Force assignment: x[ref_idx, d, h, g] == 1
-                    model.c1.add(model.x[ref_idx, d, h, g] == 1)
-                else:
-                    print(f"Warning: Could not map game number {game_number} to indices for manual assignment.")
+        # Manual assignments are fixed variables (constants to the solver), not equality rows
+        for ref_idx, k in fixed_pairs:
+            model.x[ref_idx, k].fix(1)
         
         #Objective
 
         n = len(refs) # N
 
         def ref_total_hours(model, r): #h_i
-            # Triple sum over d, h, g for referee r
-            return sum(
-                sum(
-                    sum(model.x[r, d, h, g] for g in model.G)
-                    for h in model.H
-                )
-                for d in model.D
-            )
+            return sum(model.x[r, k] for k in pairs_by_ref[r])
 
-        def ref_mean_hours(model): # h-bar_i
-            return sum(ref_total_hours(model, r) for r in model.R) / n
+        if build_balancing:
+            # h-bar: mean hours over all refs, one variable shared by every d_i constraint
+            model.h_bar = pyo.Var(within=pyo.NonNegativeReals)
+            model.h_bar_definition = pyo.Constraint(expr=n * model.h_bar == sum(model.x[r, k] for (r, k) in pairs))
 
-        # Define set C = refs not at their cap (static evaluation)
-        # C = refs where max_hours > mean_max_hours - 3
-        all_max_hours = [get_ref_max_weekly_hours(r) for r in range(num_refs)]
-        mean_max_hours = sum(all_max_hours) / len(all_max_hours)
-        threshold = mean_max_hours - 3
-        C_set = [r for r in range(num_refs) if get_ref_max_weekly_hours(r) > threshold]
-        
-        print(f"Mean max hours: {mean_max_hours:.2f}, Threshold: {threshold:.2f}")
-        print(f"Refs not at cap (C): {len(C_set)} out of {num_refs}")
+            # Create auxiliary variables d_i >= 0 for each referee in C
+            model.C = pyo.Set(initialize=C_set)
+            model.d = pyo.Var(model.C, within=pyo.NonNegativeReals)
 
-        # Create auxiliary variables d_i >= 0 for each referee
-        model.d = pyo.Var(model.R, within=pyo.NonNegativeReals)
-
-        # Add constraints for d_i >= h_i - h_bar and d_i >= h_bar - h_i, only for refs in C
-        def d_lower_bound_1(model, r):
-            if r not in C_set:
-                return pyo.Constraint.Skip
-            h_i = ref_total_hours(model, r)
-            h_bar = ref_mean_hours(model)
-            return model.d[r] >= h_i - h_bar
-        model.d_lower_1 = pyo.Constraint(model.R, rule=d_lower_bound_1)
+            # Add constraints for d_i >= h_i - h_bar and d_i >= h_bar - h_i, only for refs in C
+            def d_lower_bound_1(model, r):
+                return model.d[r] >= ref_total_hours(model, r) - model.h_bar
+            model.d_lower_1 = pyo.Constraint(model.C, rule=d_lower_bound_1)
 
-        def d_lower_bound_2(model, r):
-            if r not in C_set:
-                return pyo.Constraint.Skip
-            h_i = ref_total_hours(model, r)
-            h_bar = ref_mean_hours(model)
-            return model.d[r] >= h_bar - h_i
-        model.d_lower_2 = pyo.Constraint(model.R, rule=d_lower_bound_2)
-        
-        # Calculate all normalization constants as fixed values
-        
-        # Calculate mean effort across all refs (constant)
-        all_ref_efforts = [get_ref_effort(r) for r in C_set] if C_set else [1]
-        MEAN_EFFORT = sum(all_ref_efforts) / len(all_ref_efforts) if all_ref_efforts else 1.0
-        
-        # Calculate expected mean hours (constant - based on total games distributed)
-        total_games = len(self.games)
-        expected_total_assignments = total_games * 2  # Assuming ~2 refs per game on average
-        MEAN_HOURS = expected_total_assignments / len(C_set) if C_set else 1.0
-        
-        # Calculate mean skill across all refs (constant)
-        all_ref_experiences = [get_ref_experience(r) for r in model.R]
-        MEAN_SKILL = sum(all_ref_experiences) / len(all_ref_experiences) if all_ref_experiences else 3.0
-        
-        # Calculate mean difficulty across all games (constant)
-        all_game_difficulties = []
-        for dd in model.D:
-            for hh in model.H:
-                for gg in model.G:
-                    all_game_difficulties.append(get_game_difficulty(dd, hh, gg))
-        MEAN_DIFFICULTY = sum(all_game_difficulties) / len(all_game_difficulties) if all_game_difficulties else 3.0
-        
-        # Calculate additional normalizers
-        max_possible_starts = len(refs) * len(set(game.get_date() for game in self.games))  
-        TB_NORMALIZER = max_possible_starts * 0.3 if max_possible_starts > 0 else 1.0
+            def d_lower_bound_2(model, r):
+                return model.d[r] >= model.h_bar - ref_total_hours(model, r)
+            model.d_lower_2 = pyo.Constraint(model.C, rule=d_lower_bound_2)
         
-        max_skill_diff = 4.0  # Max experience is 5, min is 1: 5-1=4
-        max_possible_pairs = len(refs) * (len(refs) - 1) / 2  # All possible ref pairs
-        expected_active_pairs = max_possible_pairs * 0.6  # Expect 650% of pairs to be active
-
-        COMBO_NORMALIZER = max_skill_diff * expected_active_pairs if expected_active_pairs > 0 else 1.0
-        
-        # Target baseline for all normalized objectives (when weights = 1.0, objectives should be around this value)
-        # Scale: 0-10 for weight control, starting at 2.5 baseline for balanced objectives
-        TARGET_BASELINE = 2.5  # All objectives will be scaled to be around 2.5 when balanced
-        WEIGHT_SCALE_MAX = 10.0  # Maximum meaningful weight value (provides 0-10 scale)
-        
-        # Calculate normalizers to achieve the target baseline
-        # Each normalizer is adjusted so the typical objective value = TARGET_BASELINE
-        EFFORT_NORMALIZER = (MEAN_EFFORT * MEAN_HOURS) / TARGET_BASELINE
-        BALANCING_NORMALIZER = 1.0 / TARGET_BASELINE  # Balancing typically ranges 0-3, target 2.5
-        SKILL_NORMALIZER = MEAN_SKILL / TARGET_BASELINE 
-        TB_NORMALIZER = TB_NORMALIZER / TARGET_BASELINE  # Adjust shift block normalizer 
-        COMBO_NORMALIZER = COMBO_NORMALIZER / TARGET_BASELINE  # Adjust combo normalizer
-        
-        print(f"=== NORMALIZATION CONSTANTS (Baseline: {TARGET_BASELINE}, Scale: 0-{WEIGHT_SCALE_MAX}) ===")
-        print(f"Mean Effort: {MEAN_EFFORT:.3f}")
-        print(f"Expected Mean Hours: {MEAN_HOURS:.3f}")
-        print(f"Mean Skill: {MEAN_SKILL:.3f}")
-        print(f"Mean Difficulty: {MEAN_DIFFICULTY:.3f}")
-        print(f"Effort Normalizer: {EFFORT_NORMALIZER:.3f}")
-        print(f"Skill Normalizer: {SKILL_NORMALIZER:.3f}")
-        print(f"Time Block Normalizer: {TB_NORMALIZER:.3f}")
-        print(f"Skill Combo Normalizer: {COMBO_NORMALIZER:.3f}")
-        print(f"All objectives target ~{TARGET_BASELINE} when weights = 1.0")
-        print(f"Weight scale: 0-{WEIGHT_SCALE_MAX} (0=disable, {TARGET_BASELINE}=baseline, {WEIGHT_SCALE_MAX}=max emphasis)")
-        print()
-
         # Define the balancing penalty b(x) = (1/|C|) * sum_{i in C} d_i
         def balancing_penalty(model):
-            if len(C_set) == 0:
+            if not build_balancing:
                 return 0
             return (1.0 / (len(C_set) * BALANCING_NORMALIZER)) * sum(model.d[r] for r in C_set)
 
@@ -486,114 +501,136 @@ class Scheduler:
                 for r in C_set
             )
 
-        # Create auxiliary variables for shift blocks
-        model.start = pyo.Var(model.R, model.D, model.H, within=pyo.Binary)
+        if build_shift_blocks:
+            # Create auxiliary variables for shift blocks, only where the ref can work
+            model.S = pyo.Set(initialize=sorted(pairs_by_ref_slot), dimen=3)
+            model.start = pyo.Var(model.S, within=pyo.Binary)
         
-        # Shift block constraints
-        def start_constraint_1(model, r, d, h):
-            """start_{r,d,h} >= sum_g x_{r,d,h,g} - sum_g x_{r,d,h-1,g}"""
-            current_hour = sum(model.x[r, d, h, g] for g in model.G)
-            if h == 0:  # First hour of day - no previous hour
-                prev_hour = 0
-            else:
-                prev_hour = sum(model.x[r, d, h-1, g] for g in model.G)
-            return model.start[r, d, h] >= current_hour - prev_hour
-        model.start_constraint_1 = pyo.Constraint(model.R, model.D, model.H, rule=start_constraint_1)
+            # Shift block constraints
+            def start_constraint_1(model, r, d, h):
+                """start_{r,d,h} >= sum_g x_{r,d,h,g} - sum_g x_{r,d,h-1,g}"""
+                current_hour = slot_hours(model, r, d, h)
+                if h == 0:  # First hour of day - no previous hour
+                    prev_hour = 0
+                else:
+                    prev_hour = slot_hours(model, r, d, h-1)
+                return model.start[r, d, h] >= current_hour - prev_hour
+            model.start_constraint_1 = pyo.Constraint(model.S, rule=start_constraint_1)
         
-        def start_constraint_2(model, r, d, h):
-            """start_{r,d,h} <= sum_g x_{r,d,h,g}"""
-            return model.start[r, d, h] <= sum(model.x[r, d, h, g] for g in model.G)
-        model.start_constraint_2 = pyo.Constraint(model.R, model.D, model.H, rule=start_constraint_2)
+            def start_constraint_2(model, r, d, h):
+                """start_{r,d,h} <= sum_g x_{r,d,h,g}"""
+                return model.start[r, d, h] <= slot_hours(model, r, d, h)
+            model.start_constraint_2 = pyo.Constraint(model.S, rule=start_constraint_2)
         
-        def start_constraint_3(model, r, d, h):
-            """start_{r,d,h} <= 1 - sum_g x_{r,d,h-1,g}"""
-            if h == 0:  # First hour of day
-                return model.start[r, d, h] <= 1  # No constraint from previous hour
-            else:
-                prev_hour = sum(model.x[r, d, h-1, g] for g in model.G)
-                return model.start[r, d, h] <= 1 - prev_hour
-        model.start_constraint_3 = pyo.Constraint(model.R, model.D, model.H, rule=start_constraint_3)
+            def start_constraint_3(model, r, d, h):
+                """start_{r,d,h} <= 1 - sum_g x_{r,d,h-1,g}"""
+                if h == 0 or (r, d, h-1) not in pairs_by_ref_slot:  # No games the hour before
+                    return pyo.Constraint.Skip
+                return model.start[r, d, h] <= 1 - slot_hours(model, r, d, h-1)
+            model.start_constraint_3 = pyo.Constraint(model.S, rule=start_constraint_3)
         
         # Time block penalty tb(x) = (1/TB_NORMALIZER) * sum_r sum_d sum_h start_{r,d,h}
         def time_block_penalty(model):
-            return (1.0 / TB_NORMALIZER) * sum(
-                sum(
-                    sum(model.start[r, d, h] for h in model.H)
-                    for d in model.D
+            if not build_shift_blocks:
+                return 0
+            return (1.0 / TB_NORMALIZER) * sum(model.start[s] for s in model.S)
+
+        L = len(self.games)  # Total number of games
+        combo_games = [k for k in range(num_games)
+                       if len(pairs_by_game[k]) > 1 and index.game_max_refs[k] > 1]
+
+        if not build_skill_combo:
+            def combo_term(model):
+                return 0
+        elif self.skill_combo_formulation == 'pairs':
+            # Create auxiliary variables for skill pair combinations, only for refs
+            # who can both work game k
+            model.Y = pyo.Set(initialize=[(i, j, k) for k in combo_games
+                                          for i in pairs_by_game[k] for j in pairs_by_game[k] if i < j], dimen=3)
+            model.y = pyo.Var(model.Y, within=pyo.Binary)
+            # Skill pair constraints y_{i,j,k}
+            def y_constraint_1(model, i, j, k):
+                """y_{i,j,k} <= x_{i,k}"""
+                return model.y[i, j, k] <= model.x[i, k]
+            model.y_constraint_1 = pyo.Constraint(model.Y, rule=y_constraint_1)
+            
+            def y_constraint_2(model, i, j, k):
+                """y_{i,j,k} <= x_{j,k}"""
+                return model.y[i, j, k] <= model.x[j, k]
+            model.y_constraint_2 = pyo.Constraint(model.Y, rule=y_constraint_2)
+            
+            def y_constraint_3(model, i, j, k):
+                """y_{i,j,k} >= x_{i,k} + x_{j,k} - 1"""
+                return model.y[i, j, k] >= model.x[i, k] + model.x[j, k] - 1
+            model.y_constraint_3 = pyo.Constraint(model.Y, rule=y_constraint_3)
+
+            def combo_term(model):
+                return sum(
+                    abs(get_ref_experience(i) - get_ref_experience(j)) * model.y[i, j, k]
+                    for (i, j, k) in model.Y
+                )
+        else:
+            # Experience spread per game: hi_{r,k} / lo_{r,k} pick the most and least
+            # experienced ref on game k, so the bonus is max - min experience.
+            # For two-ref games this equals the pair term; the model grows linearly
+            # in refs per game and needs no extra binaries (vertices are integral).
+            model.CP = pyo.Set(initialize=[(r, k) for k in combo_games for r in pairs_by_game[k]], dimen=2)
+            model.CK = pyo.Set(initialize=combo_games)
+            model.hi = pyo.Var(model.CP, bounds=(0, 1))
+            model.lo = pyo.Var(model.CP, bounds=(0, 1))
+
+            def hi_constraint(model, r, k):
+                """hi_{r,k} <= x_{r,k}"""
+                return model.hi[r, k] <= model.x[r, k]
+            model.hi_constraint = pyo.Constraint(model.CP, rule=hi_constraint)
+
+            def lo_constraint(model, r, k):
+                """lo_{r,k} <= x_{r,k}"""
+                return model.lo[r, k] <= model.x[r, k]
+            model.lo_constraint = pyo.Constraint(model.CP, rule=lo_constraint)
+
+            def spread_pick_one(model, k):
+                """sum_r hi_{r,k} <= 1"""
+                return sum(model.hi[r, k] for r in pairs_by_game[k]) <= 1
+            model.spread_pick_one = pyo.Constraint(model.CK, rule=spread_pick_one)
+
+            def spread_balance(model, k):
+                """sum_r lo_{r,k} == sum_r hi_{r,k}"""
+                return sum(model.lo[r, k] for r in pairs_by_game[k]) == sum(model.hi[r, k] for r in pairs_by_game[k])
+            model.spread_balance = pyo.Constraint(model.CK, rule=spread_balance)
+
+            def combo_term(model):
+                return sum(
+                    get_ref_experience(r) * (model.hi[r, k] - model.lo[r, k])
+                    for (r, k) in model.CP
                 )
-                for r in model.R
-            )
 
-        # Create auxiliary variables for skill pair combinations
-        model.y = pyo.Var(model.R, model.R, model.D, model.H, model.G, within=pyo.Binary)
-        # Skill pair constraints y_{i,j,d,h,g}
-        def y_constraint_1(model, i, j, d, h, g):
-            """y_{i,j,d,h,g} <= x_{i,d,h,g}"""
-            if i >= j:  # Only for i < j
-                return pyo.Constraint.Skip
-            return model.y[i, j, d, h, g] <= model.x[i, d, h, g]
-        model.y_constraint_1 = pyo.Constraint(model.R, model.R, model.D, model.H, model.G, rule=y_constraint_1)
-        
-        def y_constraint_2(model, i, j, d, h, g):
-            """y_{i,j,d,h,g} <= x_{j,d,h,g}"""
-            if i >= j:  # Only for i < j
-                return pyo.Constraint.Skip
-            return model.y[i, j, d, h, g] <= model.x[j, d, h, g]
-        model.y_constraint_2 = pyo.Constraint(model.R, model.R, model.D, model.H, model.G, rule=y_constraint_2)
-        
-        def y_constraint_3(model, i, j, d, h, g):
-            """y_{i,j,d,h,g} >= x_{i,d,h,g} + x_{j,d,h,g} - 1"""
-            if i >= j:  # Only for i < j
-                return pyo.Constraint.Skip
-            return model.y[i, j, d, h, g] >= model.x[i, d, h, g] + model.x[j, d, h, g] - 1
-        model.y_constraint_3 = pyo.Constraint(model.R, model.R, model.D, model.H, model.G, rule=y_constraint_3)
-        
         # Skill combination bonus p(x)
-        L = len(self.games)  # Total number of games
         def skill_combination_bonus(model):
             if L == 0 or COMBO_NORMALIZER == 0:
                 return 0
-            return (1.0 / COMBO_NORMALIZER) * sum(
-                sum(
-                    sum(
-                        sum(
-                            sum(
-                                ((get_ref_experience(i) - get_ref_experience(j)) * model.y[i, j, d, h, g] 
-                                if get_ref_experience(i) >= get_ref_experience(j) 
-                                else (get_ref_experience(j) - get_ref_experience(i)) * model.y[i, j, d, h, g])
-                                for j in model.R if j > i
-                            )
-                            for i in model.R
-                        )
-                        for g in model.G
-                    )
-                    for h in model.H
-                )
-                for d in model.D
-            )
+            return (1.0 / COMBO_NORMALIZER) * combo_term(model)
 
-        # Create auxiliary variables for skill deficit penalty
-        model.u = pyo.Var(model.D, model.H, model.G, within=pyo.NonNegativeReals)
+        if build_skill_deficit:
+            # Create auxiliary variables for skill deficit penalty
+            model.u = pyo.Var(model.K, within=pyo.NonNegativeReals)
         
-        # Skill deficit constraints (use constant mean values calculated above)
-        def skill_deficit_constraint(model, d, h, g):
-            """
-            u_{d,h,g} >= (GEx_{d,h,g} / MEAN_DIFFICULTY) * sum_i x_{i,d,h,g} - sum_i (REx_i / MEAN_SKILL) * x_{i,d,h,g}
-            """
-            game_difficulty = get_game_difficulty(d, h, g)
-            refs_assigned = sum(model.x[r, d, h, g] for r in model.R)
-            skill_sum = sum((get_ref_experience(r) / MEAN_SKILL) * model.x[r, d, h, g] for r in model.R)
-            return model.u[d, h, g] >= (game_difficulty / MEAN_DIFFICULTY) * refs_assigned - skill_sum
-        model.skill_deficit_constraint = pyo.Constraint(model.D, model.H, model.G, rule=skill_deficit_constraint)
+            # Skill deficit constraints (use constant mean values calculated above)
+            def skill_deficit_constraint(model, k):
+                """
+                u_k >= (GEx_k / MEAN_DIFFICULTY) * sum_i x_{i,k} - sum_i (REx_i / MEAN_SKILL) * x_{i,k}
+                """
+                game_difficulty = get_game_difficulty(k)
+                refs_assigned = sum(model.x[r, k] for r in pairs_by_game[k])
+                skill_sum = sum((get_ref_experience(r) / MEAN_SKILL) * model.x[r, k] for r in pairs_by_game[k])
+                return model.u[k] >= (game_difficulty / MEAN_DIFFICULTY) * refs_assigned - skill_sum
+            model.skill_deficit_constraint = pyo.Constraint(model.K, rule=skill_deficit_constraint)
         
-        # Skill penalty s(x) = (1/SKILL_NORMALIZER) * sum_{d,h,g} u_{d,h,g}
+        # Skill penalty s(x) = (1/SKILL_NORMALIZER) * sum_k u_k
         def skill_penalty(model):
-            if L == 0 or SKILL_NORMALIZER == 0:
+            if not build_skill_deficit or L == 0 or SKILL_NORMALIZER == 0:
                 return 0
-            return (1.0 / (L * SKILL_NORMALIZER)) * sum(
-                sum(sum(model.u[d, h, g] for g in model.G) for h in model.H)
-                for d in model.D
-            )
+            return (1.0 / (L * SKILL_NORMALIZER)) * sum(model.u[k] for k in model.K)
 
         # Final Objective Function
         def objective_function(model):
@@ -609,234 +646,580 @@ class Scheduler:
 
         print('=== MODEL CONSTRUCTION COMPLETE ===')
         print(f"Model size: {num_refs} refs × {num_days} days × {num_times} times × {max_games_in_hour} games")
-        print('Now solving with Gurobi...')
+        print(f"Assignment variables: {len(pairs)} feasible (ref, game) pairs "
+              f"(dense block would be {index.dense_size()})")
+        print(f"Variables: {model.nvariables()}, Constraints: {model.nconstraints()}")
+        build_time = time.time() - build_start
+        print(f"Build time: {build_time:.2f}s")
+
+        if start_values is not None:
+            # Load the greedy schedule into the variables; backends that support it use it as a MIP start
+            for name, family in start_values.items():
+                component = getattr(model, name, None)
+                if component is None:
+                    continue
+                if name == 'h_bar':
+                    component.set_value(family)
+                    continue
+                for key, value in family.items():
+                    if key in component:
+                        component[key].set_value(value)
+            print(f"Warm start objective: {pyo.value(model.objective):.4f}")
         
-        # Solve with Gurobi
         try:
+            backends = backend_chain(self.solver, self.solver_fallback)
+            if not backends:
+                raise RuntimeError("No MILP solver available (install HiGHS, CBC, GLPK or Gurobi)")
             
-            solver = SolverFactory('gurobi')
-            solver.options['OutputFlag'] = 1
-            solver.options['TimeLimit']  = 240
-            solver.options['MIPGap']     = 0.05
-            
+            # Walk the fallback chain until a backend runs without error (e.g. licensing)
+            for backend in backends:
+                print(f'Now solving with {backend.name}...')
+                result = backend.solve(model, time_limit=self.time_limit, mip_gap=self.mip_gap,
+                                       threads=self.threads, tee=True, warmstart=start_values is not None,
+                                       progress=self.progress)
+                if result.termination != 'error':
+                    break
+                print(f"❌ {backend.name} failed: {result.message}")
+            if self.progress is not None:
+                self.progress.emit(result.runtime, result.objective, result.bound)
+            stats = {'build_time': build_time, 'num_variables': model.nvariables(),
+                     'num_constraints': model.nconstraints(), 'warm_start': start_values is not None,
+                     'presolve': presolve_stats, **result.to_dict()}
             
-            # Add callback for progress tracking
-            import json
-            import os
-            
-            def gurobi_callback(cb_m, cb_where):
-                """Gurobi callback to track optimization progress"""
-                try:
-                    if cb_where == gurobipy.GRB.Callback.MIP:
-                        # Get progress information
-                        objbnd = cb_m.cbGet(gurobipy.GRB.Callback.MIP_OBJBND)
-                        objbst = cb_m.cbGet(gurobipy.GRB.Callback.MIP_OBJBST)
-                        solcnt = cb_m.cbGet(gurobipy.GRB.Callback.MIP_SOLCNT)
-                        runtime = cb_m.cbGet(gurobipy.GRB.Callback.RUNTIME)
-                        
-                        # Calculate percentage progress (approximate)
-                        if objbnd != float('inf') and objbst != float('inf') and objbnd != 0:
-                            gap = abs(objbst - objbnd) / abs(objbnd)
-                            progress = max(0, min(95, (1 - gap) * 100))  # Cap at 95%
-                        else:
-                            progress = min(95, (runtime / 600) * 100)  # Time-based progress, cap at 95%
-                        
-                        # Write progress to file
-                        progress_data = {
-                            'progress': progress,
-                            'runtime': runtime,
-                            'solutions_found': solcnt,
-                            'best_objective': objbst if objbst != float('inf') else None,
-                            'bound': objbnd if objbnd != float('inf') else None
-                        }
-                        
-                        with open('optimization_progress.json', 'w') as f:
-                            json.dump(progress_data, f)
-                            
-                except Exception as e:
-                    # Don't let callback errors crash the optimization
-                    pass
-            
-            # Try to set callback if using Gurobi directly
-            try:
-                import gurobipy
-                solver.options['LogToConsole'] = 1
-                # Note: Callback through Pyomo is limited, but we'll try
-                results = solver.solve(model, tee=True)
-            except ImportError:
-                # Fallback if gurobipy not available
-                results = solver.solve(model, tee=True)
-
-
-            
-            # If infeasible, use Gurobi's IIS analysis
-            if (results.solver.termination_condition == pyo.TerminationCondition.infeasible):
-                print("\n=== GUROBI INFEASIBILITY ANALYSIS ===")
-                print("Computing Irreducible Inconsistent Subsystem (IIS)...")
-                
-                try:
-                    # Access the Gurobi model directly for IIS
-                    gurobi_model = solver._solver_model
-                    gurobi_model.computeIIS()
-                    
-                    print("\nInfeasible constraints:")
-                    for c in gurobi_model.getConstrs():
-                        if c.IISConstr:
-                            print(f"  - {c.ConstrName}")
-                    
-                    print("\nInfeasible bounds:")
-                    for v in gurobi_model.getVars():
-                        if v.IISLB:
-                            print(f"  - {v.VarName} lower bound")
-                        if v.IISUB:
-                            print(f"  - {v.VarName} upper bound")
-                    
-                    # Write IIS to file
-                    gurobi_model.write("infeasible_model.ilp")
-                    print("\n✅ IIS written to 'infeasible_model.ilp'")
-                    
-                except Exception as e:
-                    print(f"❌ Could not compute IIS: {e}")
-                    print("This may happen if using Gurobi through Pyomo interface")
-                
-                return False
+            # staffing_check already ruled out infeasible weeks; this is a solver-side failure
+            if result.termination == 'infeasible':
+                return {'success': False, 'error': 'Model is infeasible', 'stats': stats}
             
             print(f"\n=== SOLVER RESULTS ===")
-            print(f"Solver status: {results.solver.status}")
-            print(f"Termination condition: {results.solver.termination_condition}")
+            print(f"Backend: {result.backend}")
+            print(f"Termination condition: {result.termination}")
+            print(f"Solve time: {result.runtime:.2f}s")
+            if result.gap is not None:
+                print(f"Gap: {result.gap:.2%}")
+            if result.first_incumbent_time is not None:
+                print(f"First incumbent after: {result.first_incumbent_time:.2f}s")
             
             # Check if solution was found
-            if (results.solver.termination_condition == pyo.TerminationCondition.optimal or 
-                results.solver.termination_condition == pyo.TerminationCondition.feasible or
-                results.solver.termination_condition == pyo.TerminationCondition.maxTimeLimit):
+            if result.has_solution:
                 
                 print(f"Final objective value: {pyo.value(model.objective):.4f}")
-                
-                # Print individual objective component values (before weighting)
-                print(f"\n=== INDIVIDUAL OBJECTIVE COMPONENTS (PRE-WEIGHTED) ===")
-                
-                try:
-                    # Calculate individual components using the same functions
-                    effort_value = pyo.value(effort_objective(model))
-                    balancing_penalty_value = pyo.value(balancing_penalty(model))
-                    skill_penalty_value = pyo.value(skill_penalty(model))
-                    time_block_penalty_value = pyo.value(time_block_penalty(model))
-                    skill_combination_value = pyo.value(skill_combination_bonus(model))
-                    
-                    print(f"Effort Objective (scaled to baseline {TARGET_BASELINE}): {effort_value:.4f}")
-                    print(f"Hour Balancing Penalty (scaled to baseline {TARGET_BASELINE}): {balancing_penalty_value:.4f}")
-                    print(f"Low Skill Penalty (scaled to baseline {TARGET_BASELINE}): {skill_penalty_value:.4f}")
-                    print(f"Shift Block Penalty (scaled to baseline {TARGET_BASELINE}): {time_block_penalty_value:.4f}")
-                    print(f"Skill Combination Bonus (scaled to baseline {TARGET_BASELINE}): {skill_combination_value:.4f}")
-                    
-                    print(f"\n=== SCALING ANALYSIS ===")
-                    print(f"Target Baseline: {TARGET_BASELINE}")
-                    print(f"Range when weights=1.0: {min(effort_value, balancing_penalty_value, skill_penalty_value, time_block_penalty_value, skill_combination_value):.3f} - {max(effort_value, balancing_penalty_value, skill_penalty_value, time_block_penalty_value, skill_combination_value):.3f}")
-                    ratio = max(effort_value, balancing_penalty_value, skill_penalty_value, time_block_penalty_value, skill_combination_value) / min(effort_value, balancing_penalty_value, skill_penalty_value, time_block_penalty_value, skill_combination_value) if min(effort_value, balancing_penalty_value, skill_penalty_value, time_block_penalty_value, skill_combination_value) > 0 else float('inf')
-                    print(f"Max/Min Ratio: {ratio:.2f}x (lower is better for balanced scaling)")
-                    
-                    print(f"\n=== NORMALIZATION FACTORS USED ===")
-                    print(f"Effort Normalizer: {EFFORT_NORMALIZER:.3f}")
-                    print(f"Balancing Normalizer: {BALANCING_NORMALIZER:.3f}")
-                    print(f"Skill Normalizer: {SKILL_NORMALIZER:.3f}")
-                    print(f"Time Block Normalizer: {TB_NORMALIZER:.3f}")
-                    print(f"Skill Combo Normalizer: {COMBO_NORMALIZER:.3f}")
-                    
-                    print(f"\n=== WEIGHTED OBJECTIVE COMPONENTS ===")
-                    print(f"Effort Objective × {self.weight_effort_bonus} = {effort_value * self.weight_effort_bonus:.4f}")
-                    print(f"Hour Balancing Penalty × {self.weight_hour_balancing} = {-balancing_penalty_value * self.weight_hour_balancing:.4f}")
-                    print(f"Low Skill Penalty × {self.weight_low_skill_penalty} = {-skill_penalty_value * self.weight_low_skill_penalty:.4f}")
-                    print(f"Shift Block Penalty × {self.weight_shift_block_penalty} = {-time_block_penalty_value * self.weight_shift_block_penalty:.4f}")
-                    print(f"Skill Combination Bonus × {self.weight_skill_combo} = {skill_combination_value * self.weight_skill_combo:.4f}")
-                    
-                    # Verify the calculation
-                    calculated_objective = (
-                        self.weight_effort_bonus * effort_value -
-                        self.weight_hour_balancing * balancing_penalty_value -
-                        self.weight_low_skill_penalty * skill_penalty_value -
-                        self.weight_shift_block_penalty * time_block_penalty_value +
-                        self.weight_skill_combo * skill_combination_value
-                    )
-                    print(f"\nCalculated total: {calculated_objective:.4f}")
-                    print(f"Solver reported: {pyo.value(model.objective):.4f}")
-                    
-                except Exception as e:
-                    print(f"❌ Could not calculate individual objective values: {e}")
-                
+
+                # Read every x value in one pass (model.x follows index.pairs) and keep the chosen pairs;
+                # the components are scored from that assignment instead of re-walking the expressions
+                extract_start = time.time()
+                x = np.fromiter((var.value or 0.0 for var in model.x.values()), dtype=float, count=len(pairs))
+                selected = [tuple(pair) for pair in np.array(pairs, dtype=int).reshape(-1, 2)[x > 0.5].tolist()]
+                evaluator = ScheduleEvaluator(index, norm, self.max_hours_per_week, self.max_hours_per_day,
+                                              fixed_pairs, self.skill_combo_formulation)
+                components = evaluator.components(assignment_matrix(index, selected))
+                stats['extraction_time'] = time.time() - extract_start
+                print(f"Solution extraction: {stats['extraction_time'] * 1000:.1f} ms")
+                self._print_objective_components(components, norm, pyo.value(model.objective))
+
                 # Process solution and assign refs to games
-                def _process_solution_local(model, get_game_info):
-                    """Process the optimization solution and assign refs to games (local version)"""
-                    print("\n=== PROCESSING SOLUTION ===")
-                    
-                    # Clear all existing optimized assignments
-                    for ref in self.refs:
-                        ref.clear_optimized_games()
-                    for game in self.games:
-                        game.set_refs([])  # Clear existing assignments
-                    
-                    assignments = []
-                    total_assignments = 0
-                    
-                    # Go through all decision variables and find assignments (x[r,d,h,g] = 1)
-                    for r in model.R:
-                        for d in model.D:
-                            for h in model.H:
-                                for g in model.G:
-                                    if pyo.value(model.x[r, d, h, g]) > 0.5:  # Binary variable = 1
-                                        # Get the actual game object
-                                        game = get_game_info(d, h, g)
-                                        if game:
-                                            ref = self.refs[r]
-                                            
-                                            # Assign ref to game and game to ref
-                                            game.add_ref(ref)
-                                            ref.add_optimized_game(game)
-                                            
-                                            assignments.append({
-                                                'ref_name': ref.get_name(),
-                                                'game_number': game.get_number(),
-                                                'day': game.get_date(),
-                                                'time': game.get_time(),
-                                                'location': game.get_location(),
-                                                'difficulty': game.get_difficulty()
-                                            })
-                                            total_assignments += 1
-                    
-                    # Print optimization metrics
-                    print("\n=== OPTIMIZATION METRICS ===")
-                    ref_hours = {}
-                    for ref in self.refs:
-                        ref_hours[ref.get_name()] = len(ref.get_optimized_games())
-                    
-                    if ref_hours:
-                        avg_hours = sum(ref_hours.values()) / len(ref_hours)
-                        max_hours = max(ref_hours.values())
-                        min_hours = min(ref_hours.values())
-                        print(f"Average hours per ref: {avg_hours:.2f}")
-                        print(f"Hours range: {min_hours} - {max_hours}")
-                        
-                        # Show hour distribution
-                        print("\nHour distribution:")
-                        for ref_name, hours in sorted(ref_hours.items(), key=lambda x: x[1], reverse=True):
-                            print(f"  {ref_name}: {hours} hours")
-                    
-                    print("\n=== SOLUTION PROCESSING COMPLETE ===")
-                    
-                    return assignments
-
-                assignments = _process_solution_local(model, get_game_info)
+                assignments = self._process_solution(index, selected)
                 # Optionally: Save assignments to a file for further analysis
                 
                 # Return the updated referee objects and assignments for dashboard integration
-                return {'success': True, 'refs': self.refs, 'assignments': assignments}
+                output = {'success': True, 'refs': self.refs, 'assignments': assignments, 'stats': stats}
+                if elastic:
+                    slack = {name: {key: int(round(value)) for key, value in getattr(model, name).extract_values().items()
+                                    if value is not None and value > 0.5}
+                             for name in ('short', 'over_day', 'over_week')}
+                    output['violations'] = self._violation_report(index, slack)
+                return output
             else:
                 print("❌ No optimal solution found!")
                 print("Check constraints - model may be infeasible")
-                return {'success': False, 'error': 'No optimal solution found'}
+                error = result.message or 'No optimal solution found'
+                return {'success': False, 'error': error, 'stats': stats}
                 
         except Exception as e:
             print(f"❌ Solver error: {e}")
             return {'success': False, 'error': str(e)}
-    
-    
-    
+
+    def repair(self, assignments, unavailable=None, cancelled=(), added=(), time_limit=10):
+        """
+        Patch a solved week after a last-minute change instead of re-optimizing it.
+
+        The fewest possible assignments are changed (see phase2.repair), with
+        the objective weights only breaking ties. Afterwards the scheduler's
+        games are the week after the change and refs and games hold the
+        repaired crews, as after optimize(). With elastic on, a change no
+        repair can absorb returns the best-effort schedule and its violations.
+
+        Args:
+            assignments: Current schedule (the 'assignments' of an optimize() result)
+            unavailable: {ref name: list of days, or None for the whole week}
+            cancelled: Numbers of cancelled games
+            added: New Game objects
+            time_limit: Seconds for the repair solve
+
+        Returns:
+            dict: 'success', 'refs', 'assignments', 'stats' and 'changes'
+            ('removed' and 'added' lists of (ref name, game number)), plus
+            'violations' for a best-effort repair; or 'success' False and 'error'
+        """
+        from phase2.repair import ScheduleRepair
+
+        print("=== SCHEDULE REPAIR ===")
+        for name, days in (unavailable or {}).items():
+            print(f"{name} unavailable: {', '.join(days) if days else 'all week'}")
+        if cancelled:
+            print(f"Cancelled games: {sorted(cancelled)}")
+        for game in added:
+            print(f"Added game {game.get_number()}: {game.get_date()} {game.get_time()}")
+
+        repair = ScheduleRepair(self.refs, self.games, assignments, self.max_hours_per_week, self.max_hours_per_day)
+        result = repair.solve(unavailable, cancelled, added, scheduler_weights(self), time_limit,
+                              elastic=self.elastic)
+        stats = {'runtime': result['runtime'], 'scope': result['scope'], 'termination': result['termination']}
+        if not result['success']:
+            print(f"❌ Repair failed: {result['error']}")
+            return {'success': False, 'error': result['error'], 'stats': stats}
+
+        changes = result['changes']
+        print(f"Repaired in {result['runtime']:.2f}s ({result['scope']} reopened): "
+              f"{len(changes['removed'])} assignments removed, {len(changes['added'])} added")
+        for name, number in changes['removed']:
+            print(f"  - {name} off game {number}")
+        for name, number in changes['added']:
+            print(f"  + {name} on game {number}")
+
+        for game in self.games:
+            if game not in result['index'].game_id:
+                game.set_refs([])  # cancelled
+        self.games = result['games']
+        index = result['index']
+        output = {'success': True, 'refs': self.refs,
+                  'assignments': self._process_solution(index, result['pairs']),
+                  'stats': stats, 'changes': changes}
+        if 'violations' in result:
+            output['violations'] = self._violation_report(index, result['violations'])
+        return output
+
+    def _use_local_search(self):
+        """Anneal instead of solving a MILP: on request, or when no MILP solver is installed."""
+        from phase2.matrix_builder import matrix_solvers_available
+        from phase2.solvers import available_backends
+
+        if self.solver == 'local_search':
+            return True
+        if not self.solver_fallback or matrix_solvers_available() or available_backends():
+            return False
+        print("No MILP solver available: falling back to local search")
+        return True
+
+    def _optimize_local_search(self, index, fixed_pairs, norm, build_start, elastic=False):
+        """Improve the greedy schedule by simulated annealing for the time limit (see phase2.local_search)."""
+        import time
+        from phase2.local_search import LocalSearch
+
+        weights = scheduler_weights(self)
+        heuristic = construct_schedule(index, self.max_hours_per_week, self.max_hours_per_day, fixed_pairs)
+        search = LocalSearch(index, weights, norm, self.max_hours_per_week, self.max_hours_per_day, fixed_pairs,
+                             self.skill_combo_formulation)
+        build_time = time.time() - build_start
+        print(f"\n=== LOCAL SEARCH ({self.time_limit}s) ===")
+        result = search.run(heuristic['pairs'], self.time_limit)
+        if self.progress is not None:
+            self.progress.emit(result['runtime'], result['objective'], None)
+        stats = {'build_time': build_time, 'warm_start': True, 'backend': 'local_search',
+                 'termination': 'time_limit', 'has_solution': True, 'objective': result['objective'],
+                 'bound': None, 'gap': None, 'runtime': result['runtime'],
+                 'message': f"{result['iterations']} moves tried, {result['accepted']} accepted",
+                 'iterations': result['iterations'], 'accepted': result['accepted']}
+        print(f"Moves tried: {result['iterations']}, accepted: {result['accepted']}")
+        print(f"Solve time: {result['runtime']:.2f}s")
+
+        if result['short'] and not elastic:
+            # staffing_check passed, so only the search failed to fill these seats
+            error = f"Local search left {len(result['short'])} games below MIN_REF"
+            print(f"❌ {error}")
+            return {'success': False, 'error': error, 'stats': stats}
+
+        print(f"Final objective value: {result['objective']:.4f}")
+        self._print_objective_components(result['components'], norm, result['objective'])
+        output = {'success': True, 'refs': self.refs,
+                  'assignments': self._process_solution(index, result['pairs']), 'stats': stats}
+        if elastic:
+            output['violations'] = self._violation_report(index, {'short': result['short'], 'over_day': {},
+                                                                  'over_week': {}})
+        return output
+
+    def _use_matrix_builder(self, index):
+        """Decide between the Pyomo and matrix builders for this instance."""
+        from phase2.matrix_builder import MATRIX_BUILDER_MIN_PAIRS, matrix_solvers_available
+
+        if self.builder == 'matrix':
+            return True
+        if self.builder != 'auto':
+            return False
+        # The matrix path solves with HiGHS; explicit Pyomo backends keep the Pyomo model.
+        # Cached models always use it since only the matrix path can swap the objective in place,
+        # and so do solution pools, which add no-good cuts to the matrix, season weeks and LNS.
+        return (self.solver in ('auto', 'highs')
+                and (len(index.pairs) >= MATRIX_BUILDER_MIN_PAIRS or self.model_cache is not None
+                     or self.pool_size > 1 or self.season_ledger is not None or self.lns)
+                and bool(matrix_solvers_available()))
+
+    def _optimize_matrix(self, index, fixed_pairs, families, norm, build_start, start_values=None,
+                         symmetry_classes=(), elastic=False, max_slack=None, season=None):
+        """Build the model as sparse arrays and solve it without Pyomo."""
+        import time
+        from phase2.matrix_builder import MatrixModel
+        from phase2.model_cache import input_hash
+
+        model = None
+        # The cache key does not cover the season history, so season weeks are always built
+        use_cache = self.model_cache is not None and season is None
+        if use_cache:
+            key = input_hash(self.refs, self.games, self.max_hours_per_week, self.max_hours_per_day,
+                             self.skill_combo_formulation, families, self.symmetry_breaking, elastic,
+                             self.presolve)
+            model = self.model_cache.get(key)
+        cached = model is not None
+        if model is None:
+            model = MatrixModel(index, self.max_hours_per_week, self.max_hours_per_day, fixed_pairs,
+                                families, self.skill_combo_formulation, norm, symmetry_classes=symmetry_classes,
+                                elastic=elastic, max_slack=max_slack if elastic else None, **(season or {}))
+            if use_cache:
+                self.model_cache.put(key, model)
+        # Components are scored from the chosen assignment, as on the Pyomo path: auxiliary
+        # columns of zero-weight families are free in the model and may sit anywhere
+        evaluator = ScheduleEvaluator(index, norm, self.max_hours_per_week, self.max_hours_per_day, fixed_pairs,
+                                      self.skill_combo_formulation, (season or {}).get('prior_hours'))
+        build_time = time.time() - build_start
+
+        if cached:
+            print('=== REUSING CACHED MODEL (only the objective changes) ===')
+        else:
+            print('=== MODEL CONSTRUCTION COMPLETE (matrix builder) ===')
+        print(f"Model size: {index.num_refs} refs × {index.num_days} days × {index.num_times} times × {index.max_games_in_hour} games")
+        print(f"Assignment variables: {len(index.pairs)} feasible (ref, game) pairs "
+              f"(dense block would be {index.dense_size()})")
+        print(f"Variables: {model.num_cols}, Constraints: {model.num_rows}, Nonzeros: {model.matrix().nnz}")
+        print(f"Build time: {build_time:.2f}s")
+
+        solver = 'auto' if self.solver in ('auto', 'highs') else self.solver
+        weights = scheduler_weights(self)
+        start = None
+        if cached and model.last_solution is not None:
+            # The previous incumbent stays feasible when only the weights change
+            start = model.last_solution
+        elif start_values is not None:
+            start = model.start_vector(start_values)
+        if start is not None:
+            print(f"Warm start objective: {model.objective(weights) @ start:.4f}")
+        on_incumbent = None
+        if self.progress is not None:
+            c = model.objective(weights)
+
+            def on_incumbent(runtime, solution):
+                # Anytime mode: every improving schedule is published whole while the solve goes on
+                pairs = model.selected_pairs(solution)
+                assignments = [self._assignment_record(self.refs[r], index.game_list[k]) for r, k in pairs]
+                self.progress.publish(runtime, float(c @ solution),
+                                      evaluator.components(assignment_matrix(index, pairs)), assignments)
+
+        if self.lns:
+            result, solution = self._lns_solve(model, weights, start, self.mip_gap, on_incumbent)
+        else:
+            result, solution = model.solve(weights, solver, self.time_limit, self.mip_gap, self.threads,
+                                           tee=True, start=start, persistent=use_cache,
+                                           progress=self.progress, on_incumbent=on_incumbent)
+        stats = {'build_time': build_time, 'num_variables': model.num_cols,
+                 'num_constraints': model.num_rows, 'warm_start': start is not None,
+                 'model_cached': cached, **result.to_dict(), 'incumbents': result.incumbents}
+
+        print(f"\n=== SOLVER RESULTS ===")
+        print(f"Backend: {result.backend}")
+        print(f"Termination condition: {result.termination}")
+        print(f"Solve time: {result.runtime:.2f}s")
+        if result.gap is not None:
+            print(f"Gap: {result.gap:.2%}")
+        if result.first_incumbent_time is not None:
+            print(f"First incumbent after: {result.first_incumbent_time:.2f}s")
+
+        if result.termination == 'infeasible':
+            return {'success': False, 'error': 'Model is infeasible', 'stats': stats}
+        if not result.has_solution:
+            print("❌ No optimal solution found!")
+            error = result.message or 'No optimal solution found'
+            return {'success': False, 'error': error, 'stats': stats}
+
+        print(f"Final objective value: {result.objective:.4f}")
+        selected = model.selected_pairs(solution)
+        self._print_objective_components(evaluator.components(assignment_matrix(index, selected)), norm,
+                                         result.objective)
+        assignments = self._process_solution(index, selected)
+        output = {'success': True, 'refs': self.refs, 'assignments': assignments, 'stats': stats}
+        if elastic:
+            output['violations'] = self._violation_report(index, model.violations(solution))
+        if season is not None:
+            output['season'] = self._season_report(model, solution)
+        if self.pool_size > 1:
+            output['alternatives'] = self._solution_pool(index, model, weights, solution, evaluator)
+        return output
+
+    def _lns_solve(self, model, weights, start, mip_gap, on_incumbent=None):
+        """
+        Spend the time limit on large-neighborhood search (see phase2.lns).
+
+        Starts from the warm start, or from the full model's first incumbent
+        when the greedy schedule was incomplete.
+
+        Returns:
+            tuple: (SolveResult, solution vector or None)
+        """
+        import time
+        from phase2.lns import LargeNeighborhoodSearch
+        from phase2.solvers import SolveResult
+
+        began = time.time()
+        if start is None:
+            first_limit = min(self.time_limit, max(5.0, self.time_limit / 10))
+            print(f"LNS: no warm start, solving the full model for {first_limit:.0f}s for a first schedule")
+            result, start = model.solve(weights, 'auto', first_limit, mip_gap, self.threads, tee=False)
+            if start is None:
+                return result, None
+
+        print(f"\n=== LARGE NEIGHBORHOOD SEARCH (workers: {self.workers or 'all CPUs'}) ===")
+        on_improvement = None
+        if self.progress is not None:
+            cost = model.objective(weights)
+            self.progress.begin()
+
+            def on_improvement(seconds, solution):
+                self.progress.emit(seconds, float(cost @ solution), None, improved=True)
+                if on_incumbent is not None:
+                    on_incumbent(seconds, solution)
+
+        lns = LargeNeighborhoodSearch(model, weights, self.workers)
+        budget = self.time_limit - (time.time() - began)
+        search = lns.run(start, budget, sub_time_limit=max(1.0, self.time_limit / 20), mip_gap=min(mip_gap, 1e-4),
+                         on_improvement=on_improvement,
+                         should_stop=self.progress.stop_requested if self.progress is not None else None)
+        for seconds, objective in search['trace']:
+            print(f"  {seconds:7.2f}s  objective {objective:.4f}")
+        print(f"LNS: {search['rounds']} rounds, improvements by neighborhood: {search['improvements']}")
+        runtime = time.time() - began
+        if self.progress is not None:
+            self.progress.emit(runtime, search['objective'], None)
+        return SolveResult('lns', 'feasible', True, search['objective'], None, runtime,
+                           f"{search['rounds']} LNS rounds", search['trace']), search['solution']
+
+    def _season_report(self, model, solution):
+        """Print and return what the season history terms cost this week's schedule."""
+        repeats = 0
+        if 'together' in model.blocks:
+            start, end = model.blocks['together']
+            repeats = sum(1 for value in solution[start:end] if value > 0.5)
+        report = {'penalty': model.season_penalty_value(solution), 'repeat_pairings': repeats}
+        print(f"\n=== SEASON HISTORY ===")
+        print(f"Season penalty (fairness day + repeat pairings): {report['penalty']:.4f}")
+        print(f"Games repeating an earlier pairing: {repeats}")
+        return report
+
+    def _solution_pool(self, index, model, weights, solution, evaluator):
+        """
+        Find alternatives to the chosen schedule (see phase2.solution_pool).
+
+        Returns:
+            list: One dict per alternative ('objective', 'components', 'distance'
+            (assignments changed from the chosen schedule), 'assignments'),
+            best first
+        """
+        from phase2.solution_pool import SolutionPool
+
+        print(f"\n=== SOLUTION POOL ({self.pool_size - 1} alternatives, "
+              f"at least {self.pool_min_distance} assignments apart) ===")
+        pool = SolutionPool(model, weights, self.pool_min_distance).run(
+            self.pool_size, first=solution, time_limit=self.time_limit, mip_gap=self.mip_gap, workers=self.workers)
+        alternatives = []
+        for entry in pool:
+            if entry['termination'] == 'given':
+                continue
+            alternatives.append({
+                'objective': entry['objective'],
+                'components': evaluator.components(assignment_matrix(index, entry['pairs'])),
+                'distance': model.assignment_distance(entry['solution'], solution),
+                'assignments': [self._assignment_record(self.refs[r], index.game_list[k]) for r, k in entry['pairs']]
+            })
+            print(f"Alternative {len(alternatives)}: objective {entry['objective']:.4f}, "
+                  f"{alternatives[-1]['distance']} assignments changed")
+        if len(alternatives) < self.pool_size - 1:
+            print(f"Only {len(alternatives)} alternatives exist at that distance within the limits")
+        return alternatives
+
+    def _optimize_by_day(self, index, fixed_pairs, families, norm, build_start):
+        """Solve each night separately in parallel and merge (see phase2.decomposition)."""
+        import time
+        from phase2.decomposition import DayDecomposition
+
+        print(f"=== DAY DECOMPOSITION ({index.num_days} nights, workers: {self.workers or 'all CPUs'}) ===")
+        solver = 'auto' if self.solver in ('auto', 'highs') else self.solver
+        decomposition = DayDecomposition(index, self.max_hours_per_week, self.max_hours_per_day,
+                                         scheduler_weights(self), norm, fixed_pairs, families,
+                                         self.skill_combo_formulation, solver, self.mip_gap, self.workers,
+                                         self.warm_start)
+        build_time = time.time() - build_start
+        result = decomposition.solve(self.time_limit)
+        # Same keys as the other paths; the merged week has no bound, so no gap either
+        stats = {'build_time': build_time, 'warm_start': result['warm_start'], 'backend': 'day-decomposition',
+                 'termination': 'feasible' if result['success'] else 'error', 'has_solution': result['success'],
+                 'objective': result.get('objective'), 'bound': None, 'gap': None, 'runtime': result['runtime'],
+                 'message': f"{len(result['iterations'])} rounds", 'iterations': result['iterations']}
+        if not result['success']:
+            print(f"❌ {result['error']}")
+            return {'success': False, 'error': result['error'], 'stats': stats}
+
+        print(f"Final objective value: {result['objective']:.4f}")
+        self._print_objective_components(result['components'], norm, result['objective'])
+        assignments = self._process_solution(index, result['pairs'])
+        return {'success': True, 'refs': self.refs, 'assignments': assignments, 'stats': stats}
+
+    def _violation_report(self, index, slack):
+        """
+        Describe the slack an elastic solution used.
+
+        Args:
+            slack: 'short' {k: refs missing}, 'over_day' {(r, d): hours over},
+                   'over_week' {r: hours over}
+
+        Returns:
+            dict: 'understaffed' (one dict per game: number, day, time, min refs,
+            assigned, missing), 'over_hours' (one dict per ref and cap: ref, day
+            or None for the weekly cap, hours over) and the totals
+        """
+        understaffed = []
+        for k, missing in sorted(slack['short'].items()):
+            game = index.game_list[k]
+            understaffed.append({
+                'game_number': game.get_number(),
+                'day': game.get_date(),
+                'time': game.get_time(),
+                'min_refs': int(index.game_min_refs[k]),
+                'assigned': int(index.game_min_refs[k]) - missing,
+                'missing': missing
+            })
+        over_hours = [{'ref_name': self.refs[r].get_name(), 'day': index.sorted_days[d], 'hours_over': extra}
+                      for (r, d), extra in sorted(slack['over_day'].items())]
+        over_hours += [{'ref_name': self.refs[r].get_name(), 'day': None, 'hours_over': extra}
+                       for r, extra in sorted(slack['over_week'].items())]
+
+        print("\n=== BEST-EFFORT SCHEDULE: UNMET REQUIREMENTS ===")
+        for row in understaffed:
+            print(f"Game {row['game_number']} ({row['day']} {row['time']}): {row['assigned']}/{row['min_refs']} refs, "
+                  f"{row['missing']} missing")
+        for row in over_hours:
+            cap = f"{row['day']} cap" if row['day'] else "weekly cap"
+            print(f"{row['ref_name']}: {row['hours_over']} hours over the {cap}")
+        return {
+            'understaffed': understaffed,
+            'over_hours': over_hours,
+            'missing_refs': sum(row['missing'] for row in understaffed),
+            'extra_hours': sum(row['hours_over'] for row in over_hours)
+        }
+
+    def _print_objective_components(self, components, norm, reported_objective):
+        """Print the pre-weighted and weighted objective components of a solution."""
+        weights = scheduler_weights(self)
+        labels = {
+            'effort': 'Effort Objective',
+            'balancing': 'Hour Balancing Penalty',
+            'low_skill': 'Low Skill Penalty',
+            'shift_block': 'Shift Block Penalty',
+            'skill_combo': 'Skill Combination Bonus'
+        }
+
+        # Print individual objective component values (before weighting)
+        print(f"\n=== INDIVIDUAL OBJECTIVE COMPONENTS (PRE-WEIGHTED) ===")
+        for name in COMPONENTS:
+            print(f"{labels[name]} (scaled to baseline {TARGET_BASELINE}): {components[name]:.4f}")
+
+        values = list(components.values())
+        print(f"\n=== SCALING ANALYSIS ===")
+        print(f"Target Baseline: {TARGET_BASELINE}")
+        print(f"Range when weights=1.0: {min(values):.3f} - {max(values):.3f}")
+        ratio = max(values) / min(values) if min(values) > 0 else float('inf')
+        print(f"Max/Min Ratio: {ratio:.2f}x (lower is better for balanced scaling)")
+
+        print(f"\n=== NORMALIZATION FACTORS USED ===")
+        print(f"Effort Normalizer: {norm['EFFORT_NORMALIZER']:.3f}")
+        print(f"Balancing Normalizer: {norm['BALANCING_NORMALIZER']:.3f}")
+        print(f"Skill Normalizer: {norm['SKILL_NORMALIZER']:.3f}")
+        print(f"Time Block Normalizer: {norm['TB_NORMALIZER']:.3f}")
+        print(f"Skill Combo Normalizer: {norm['COMBO_NORMALIZER']:.3f}")
+
+        print(f"\n=== WEIGHTED OBJECTIVE COMPONENTS ===")
+        calculated_objective = 0.0
+        for name in COMPONENTS:
+            weighted = COMPONENT_SIGNS[name] * weights[name] * components[name]
+            calculated_objective += weighted
+            print(f"{labels[name]} × {weights[name]} = {weighted:.4f}")
+
+        # Verify the calculation
+        print(f"\nCalculated total: {calculated_objective:.4f}")
+        print(f"Solver reported: {reported_objective:.4f}")
+
+    @staticmethod
+    def _assignment_record(ref, game):
+        """Dashboard dict for one (ref, game) assignment."""
+        return {
+            'ref_name': ref.get_name(),
+            'game_number': game.get_number(),
+            'day': game.get_date(),
+            'time': game.get_time(),
+            'location': game.get_location(),
+            'difficulty': game.get_difficulty()
+        }
+
+    def _process_solution(self, index, selected_pairs):
+        """
+        Assign refs to games from the chosen (r, k) pairs of a solution.
+
+        Returns:
+            list: One assignment dict per (ref, game) for the dashboard
+        """
+        print("\n=== PROCESSING SOLUTION ===")
+
+        # Clear all existing optimized assignments
+        for ref in self.refs:
+            ref.clear_optimized_games()
+        for game in self.games:
+            game.set_refs([])  # Clear existing assignments
+
+        assignments = []
+        for (r, k) in selected_pairs:
+            # Get the actual game object
+            game = index.game_list[k]
+            ref = self.refs[r]
+
+            # Assign ref to game and game to ref
+            game.add_ref(ref)
+            ref.add_optimized_game(game)
+
+            assignments.append(self._assignment_record(ref, game))
+
+        # Print optimization metrics
+        print("\n=== OPTIMIZATION METRICS ===")
+        ref_hours = {}
+        for ref in self.refs:
+            ref_hours[ref.get_name()] = len(ref.get_optimized_games())
+
+        if ref_hours:
+            avg_hours = sum(ref_hours.values()) / len(ref_hours)
+            max_hours = max(ref_hours.values())
+            min_hours = min(ref_hours.values())
+            print(f"Average hours per ref: {avg_hours:.2f}")
+            print(f"Hours range: {min_hours} - {max_hours}")
+
+            # Show hour distribution
+            print("\nHour distribution:")
+            for ref_name, hours in sorted(ref_hours.items(), key=lambda x: x[1], reverse=True):
+                print(f"  {ref_name}: {hours} hours")
+
+        print("\n=== SOLUTION PROCESSING COMPLETE ===")
+
+        return assignments
@@ -0,0 +1,233 @@
+import json
+import time
+
+import numpy as np
+
+from phase2.objective import TARGET_BASELINE
+
+# Night whose hours are shared out evenly over the season by default
+FAIRNESS_DAY = 'Thursday'
+
+
+class SeasonLedger:
+    def __init__(self, fairness_day=FAIRNESS_DAY):
+        """
+        Running season totals per referee, carried from one week's solve to the next.
+
+        Refs are matched by name across weeks. For each ref the ledger keeps
+        the hours worked, the hours worked on `fairness_day` and, in a
+        ref x ref matrix, the number of games every two refs have shared. That
+        is all a week's solve needs from the weeks before it, so a season of
+        any length is carried in O(refs²) numbers.
+
+        Args:
+            fairness_day: Game date (day name) whose hours are balanced separately
+        """
+        self.fairness_day = fairness_day
+        self.names = []
+        self._position = {}
+        self.hours = np.zeros(0)
+        self.fairness_hours = np.zeros(0)
+        self.together = np.zeros((0, 0), dtype=np.int32)
+        self.weeks = 0
+
+    def _positions(self, names):
+        """Ledger rows of the given ref names, adding rows for new names."""
+        new = [name for name in dict.fromkeys(names) if name not in self._position]
+        if new:
+            for name in new:
+                self._position[name] = len(self.names)
+                self.names.append(name)
+            grow = len(new)
+            self.hours = np.concatenate([self.hours, np.zeros(grow)])
+            self.fairness_hours = np.concatenate([self.fairness_hours, np.zeros(grow)])
+            self.together = np.pad(self.together, ((0, grow), (0, grow)))
+        return np.array([self._position[name] for name in names], dtype=int)
+
+    def record_week(self, assignments):
+        """
+        Add one week's schedule to the totals.
+
+        Args:
+            assignments: Scheduler result assignments (dicts with 'ref_name',
+                         'game_number' and 'day')
+        """
+        crews = {}
+        for assignment in assignments:
+            position = self._positions([assignment['ref_name']])[0]
+            self.hours[position] += 1
+            if assignment['day'] == self.fairness_day:
+                self.fairness_hours[position] += 1
+            crews.setdefault(assignment['game_number'], []).append(position)
+        for crew in crews.values():
+            for a, i in enumerate(crew):
+                for j in crew[a + 1:]:
+                    self.together[i, j] += 1
+                    self.together[j, i] += 1
+        self.weeks += 1
+
+    def totals(self, refs):
+        """
+        Season totals of a week's refs, in their order (zeros for refs new to the season).
+
+        Returns:
+            tuple: (hours, fairness-day hours, games shared matrix)
+        """
+        positions = self._positions([ref.get_name() for ref in refs])
+        return (self.hours[positions], self.fairness_hours[positions],
+                self.together[np.ix_(positions, positions)])
+
+    def report(self):
+        """
+        Per-ref season summary, most hours first.
+
+        Returns:
+            list: Dicts with 'ref_name', 'hours', 'fairness_hours' and
+            'most_shared' (most games shared with any one other ref)
+        """
+        rows = [{'ref_name': name,
+                 'hours': int(self.hours[p]),
+                 'fairness_hours': int(self.fairness_hours[p]),
+                 'most_shared': int(self.together[p].max()) if len(self.names) else 0}
+                for name, p in self._position.items()]
+        return sorted(rows, key=lambda row: -row['hours'])
+
+    def to_dict(self):
+        """JSON-serializable copy of the ledger (see from_dict)."""
+        return {
+            'fairness_day': self.fairness_day,
+            'weeks': self.weeks,
+            'names': list(self.names),
+            'hours': self.hours.tolist(),
+            'fairness_hours': self.fairness_hours.tolist(),
+            'together': self.together.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        ledger = cls(data.get('fairness_day', FAIRNESS_DAY))
+        ledger.names = list(data['names'])
+        ledger._position = {name: p for p, name in enumerate(ledger.names)}
+        ledger.hours = np.asarray(data['hours'], dtype=float)
+        ledger.fairness_hours = np.asarray(data['fairness_hours'], dtype=float)
+        ledger.together = np.asarray(data['together'], dtype=np.int32).reshape(len(ledger.names), len(ledger.names))
+        ledger.weeks = data['weeks']
+        return ledger
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def season_terms(index, ledger, weight_fairness_day=1.0, weight_repeat_pairs=1.0):
+    """
+    Turn the ledger into MatrixModel arguments for one week.
+
+    - prior_hours: season hours so far, so balancing works on season totals;
+    - assignment_penalty: each fairness-day assignment costs in proportion to
+      how far the ref is above the mean fairness-day hours (and earns when
+      below), scaled like the other components so that a typical week sums to
+      about TARGET_BASELINE;
+    - repeat_pairs: every game two refs share again costs in proportion to
+      the games they shared per week so far, scaled so that a week where every
+      multi-ref game repeats a weekly pairing sums to about TARGET_BASELINE.
+
+    Args:
+        index: ScheduleIndex for the week
+        ledger: SeasonLedger of the weeks before
+        weight_fairness_day, weight_repeat_pairs: Weights of the two history terms
+
+    Returns:
+        dict: 'prior_hours', 'assignment_penalty' and 'repeat_pairs'
+    """
+    hours, fairness_hours, together = ledger.totals(index.refs)
+    terms = {'prior_hours': hours, 'assignment_penalty': None, 'repeat_pairs': {}}
+    if ledger.weeks == 0:
+        return terms
+
+    pairs = np.array(index.pairs, dtype=int).reshape(-1, 2)
+    day = np.array([index.sorted_days[d] for d, _, _ in index.game_slot])
+    on_fairness_day = day[pairs[:, 1]] == ledger.fairness_day
+    if weight_fairness_day and on_fairness_day.any():
+        excess = fairness_hours - fairness_hours.mean()
+        seats = index.game_min_refs[day == ledger.fairness_day].sum()
+        normalizer = max(seats, 1) * max(np.abs(excess).mean(), 1.0) / TARGET_BASELINE
+        terms['assignment_penalty'] = np.where(on_fairness_day,
+                                               weight_fairness_day * excess[pairs[:, 0]] / normalizer, 0.0)
+
+    combo_games = sum(1 for k in range(index.num_games)
+                      if len(index.pairs_by_game[k]) > 1 and index.game_max_refs[k] > 1)
+    if weight_repeat_pairs and combo_games:
+        normalizer = combo_games / TARGET_BASELINE
+        i, j = np.nonzero(np.triu(together, 1))
+        terms['repeat_pairs'] = {(int(a), int(b)): weight_repeat_pairs * together[a, b] / ledger.weeks / normalizer
+                                 for a, b in zip(i, j)}
+    return terms
+
+
+class SeasonScheduler:
+    def __init__(self, weeks, params=None, ledger=None):
+        """
+        Schedule a season week by week on a rolling horizon.
+
+        Each week is solved by its own Scheduler (matrix builder) with the
+        ledger of the weeks before it, so balancing works on season hours,
+        fairness-day hours are shared out over the season and refs are kept
+        from being paired with the same partners week after week. The solved
+        week is then added to the ledger and the horizon rolls on. Every solve
+        is one week's size, so a 12-week season of 70-game weeks costs twelve
+        weekly solves instead of one model twelve times larger.
+
+        Args:
+            weeks: List of (refs, games) per week; refs are matched across
+                   weeks by name and carry that week's availability
+            params: Scheduler.set_parameters dict used for every week (plus
+                    'weight_fairness_day' and 'weight_repeat_pairs')
+            ledger: Optional SeasonLedger of weeks already played
+        """
+        self.weeks = weeks
+        self.params = params or {}
+        self.ledger = ledger if ledger is not None else SeasonLedger()
+
+    def optimize(self):
+        """
+        Solve every week in order.
+
+        Returns:
+            dict: 'success' (every week solved), 'weeks' (each week's
+            Scheduler result), 'ledger', 'summary' (SeasonLedger.report())
+            and 'runtime'
+        """
+        from phase2.scheduler import Scheduler
+
+        start = time.time()
+        results = []
+        for week, (refs, games) in enumerate(self.weeks, 1):
+            print(f"\n=== SEASON WEEK {week} OF {len(self.weeks)} ===")
+            scheduler = Scheduler(refs, games)
+            scheduler.set_parameters(self.params)
+            scheduler.set_season_ledger(self.ledger)
+            result = scheduler.optimize()
+            results.append(result)
+            if result.get('success'):
+                self.ledger.record_week(result['assignments'])
+            else:
+                print(f"❌ Week {week} was not scheduled: {result.get('error')}")
+
+        summary = self.ledger.report()
+        if summary:
+            hours = [row['hours'] for row in summary]
+            print(f"\n=== SEASON TOTALS ({self.ledger.weeks} weeks) ===")
+            print(f"Hours per ref: {min(hours)} - {max(hours)} (mean {np.mean(hours):.1f})")
+        return {
+            'success': all(result.get('success') for result in results),
+            'weeks': results,
+            'ledger': self.ledger,
+            'summary': summary,
+            'runtime': time.time() - start
+        }
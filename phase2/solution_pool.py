@@ -0,0 +1,140 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from phase2.symmetry import canonical_pairs
+from phase2.warm_start import construct_schedule, solution_values
+
+# Model shared by the calls a worker process handles (set by _init_worker)
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _solve_alternative(job):
+    """Solve the shared model away from the pool so far (runs in a worker process)."""
+    cost, cuts, start, time_limit, mip_gap = job
+    result, solution = _worker_model.solve(None, 'auto', time_limit, mip_gap, threads=1, tee=False,
+                                           start=start, cuts=cuts, cost=cost)
+    return result.termination, result.runtime, solution
+
+
+class SolutionPool:
+    def __init__(self, model, weights, min_distance=10):
+        """
+        Find several near-optimal schedules that differ in at least `min_distance` assignments.
+
+        Alternatives are found in rounds. Every solve of a round gets one
+        no-good cut per schedule already in the pool (MatrixModel.no_good_cuts),
+        so anything it returns is far enough from those, and starts from a
+        greedy schedule built to avoid the pool's assignments (the pool's own
+        schedules are cut off, so they cannot seed it). The solves of a round
+        run in parallel: the first uses the true objective and the others a
+        copy with small random changes to the assignment costs, so that they
+        land on different schedules. Candidates are then accepted best first
+        if they are also far enough from the ones accepted before them.
+        Every schedule is scored with the true objective.
+
+        Args:
+            model: Built MatrixModel
+            weights: Component -> weight dict
+            min_distance: Fewest (ref, game) assignments any two schedules may differ in
+        """
+        self.model = model
+        self.weights = weights
+        self.min_distance = min_distance
+        self.cost = model.objective(weights)
+
+    def _entry(self, solution, termination, runtime):
+        model = self.model
+        return {
+            'objective': float(self.cost @ solution),
+            'components': model.component_values(solution),
+            'pairs': model.selected_pairs(solution),
+            'termination': termination,
+            'runtime': runtime,
+            'solution': solution
+        }
+
+    def _start(self, pool):
+        """MIP start avoiding the pool's assignments, or None if the greedy schedule is incomplete."""
+        model = self.model
+        index = model.index
+        start, end = model.blocks['x']
+        fixed = [(int(r), int(k)) for r, k, lower in zip(model.pair_r, model.pair_k, model.col_lower[start:end])
+                 if lower > 0.5]
+        avoid = {pair for entry in pool for pair in entry['pairs']}
+        heuristic = construct_schedule(index, model.max_hours_per_week, model.max_hours_per_day, fixed, avoid)
+        if not heuristic['complete']:
+            return None
+        pairs = canonical_pairs(heuristic['pairs'], model.symmetry_classes)
+        return model.start_vector(solution_values(index, pairs, model.normalizers, model.skill_combo_formulation,
+                                                  model.prior_hours, model.repeat_pairs))
+
+    def _perturbed_cost(self, rng, jitter):
+        """True costs with each assignment's cost moved by up to `jitter` of the mean assignment cost."""
+        start, end = self.model.blocks['x']
+        cost = self.cost.copy()
+        scale = jitter * max(np.abs(cost[start:end]).mean(), 1e-3)
+        cost[start:end] += rng.uniform(-scale, scale, end - start)
+        return cost
+
+    def run(self, size, first=None, time_limit=30, mip_gap=0.05, workers=None, max_rounds=None, jitter=0.25,
+            seed=0):
+        """
+        Build the pool.
+
+        Args:
+            size: Number of schedules wanted (the first included)
+            first: Solution vector of the best schedule already found (solved here if None)
+            time_limit: Seconds per solve
+            mip_gap: Relative gap per solve
+            workers: Process pool size (None = one per CPU)
+            max_rounds: Rounds of parallel solves before giving up (default: size)
+            jitter: Size of the cost changes that separate the solves of a round
+            seed: Random seed for those changes
+
+        Returns:
+            list: Up to `size` dicts ('objective', 'components', 'pairs',
+            'termination', 'runtime', 'solution', 'distance' (assignments
+            changed from the best schedule)), best objective first. Fewer
+            come back when no more schedules exist that far apart.
+        """
+        model = self.model
+        rng = np.random.default_rng(seed)
+        if first is None:
+            result, first = model.solve(self.weights, 'auto', time_limit, mip_gap, tee=False, start=self._start([]))
+            if first is None:
+                return []
+            pool = [self._entry(first, result.termination, result.runtime)]
+        else:
+            pool = [self._entry(first, 'given', 0.0)]
+
+        rounds = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as executor:
+            while len(pool) < size and rounds < (max_rounds or size):
+                rounds += 1
+                cuts = model.no_good_cuts([entry['solution'] for entry in pool], self.min_distance)
+                start = self._start(pool)
+                needed = size - len(pool)
+                jobs = [(self.cost if i == 0 else self._perturbed_cost(rng, jitter), cuts, start, time_limit, mip_gap)
+                        for i in range(needed)]
+                candidates = [self._entry(solution, termination, runtime)
+                              for termination, runtime, solution in executor.map(_solve_alternative, jobs)
+                              if solution is not None]
+                if not candidates:
+                    break   # no schedule is that far from the pool
+                for candidate in sorted(candidates, key=lambda entry: -entry['objective']):
+                    if len(pool) < size and all(
+                            model.assignment_distance(candidate['solution'], entry['solution']) >= self.min_distance
+                            for entry in pool):
+                        pool.append(candidate)
+
+        # A later solve can beat the first schedule when that one stopped at its limit
+        pool.sort(key=lambda entry: -entry['objective'])
+        for entry in pool:
+            entry['distance'] = model.assignment_distance(entry['solution'], pool[0]['solution'])
+        return pool
@@ -0,0 +1,304 @@
+import time
+
+from phase2.progress import parse_stdout
+
+# Backends tried in order when no solver (or 'auto') is requested
+SOLVER_PREFERENCE = ['gurobi', 'highs', 'cbc', 'glpk']
+
+
+class SolveResult:
+    def __init__(self, backend, termination, has_solution, objective=None, bound=None,
+                 runtime=0.0, message='', incumbents=None):
+        """
+        Solver-independent outcome of a solve.
+
+        Args:
+            backend: Name of the backend that ran the solve
+            termination: 'optimal', 'feasible', 'time_limit', 'infeasible', 'error' or 'unknown'
+            has_solution: True if a feasible solution was loaded into the model
+            objective: Objective value of the loaded solution
+            bound: Best objective bound proven by the solver
+            runtime: Wall-clock solve time in seconds
+            message: Extra detail from the solver (errors, status text)
+            incumbents: (seconds, objective) for each improving solution, if the
+                        backend reports them
+        """
+        self.backend = backend
+        self.termination = termination
+        self.has_solution = has_solution
+        self.objective = objective
+        self.bound = bound
+        self.runtime = runtime
+        self.message = message
+        self.incumbents = incumbents or []
+
+    @property
+    def gap(self):
+        """Relative gap between the incumbent and the bound, or None if unknown."""
+        if self.objective is None or self.bound is None:
+            return None
+        return abs(self.bound - self.objective) / max(abs(self.objective), 1e-10)
+
+    @property
+    def first_incumbent_time(self):
+        """Seconds until the first feasible solution, or None if not tracked."""
+        return self.incumbents[0][0] if self.incumbents else None
+
+    def to_dict(self):
+        return {
+            'backend': self.backend,
+            'termination': self.termination,
+            'has_solution': self.has_solution,
+            'objective': self.objective,
+            'bound': self.bound,
+            'gap': self.gap,
+            'runtime': self.runtime,
+            'message': self.message,
+            'first_incumbent_time': self.first_incumbent_time
+        }
+
+    def __repr__(self):
+        return (f"SolveResult(backend='{self.backend}', termination='{self.termination}', "
+                f"objective={self.objective}, gap={self.gap}, runtime={self.runtime:.2f})")
+
+
+def _termination_name(condition):
+    """Map a Pyomo termination condition onto the SolveResult vocabulary."""
+    name = str(condition).split('.')[-1]
+    if name == 'optimal':
+        return 'optimal'
+    if name in ('feasible', 'locallyOptimal', 'globallyOptimal'):
+        return 'feasible'
+    if name == 'maxTimeLimit':
+        return 'time_limit'
+    if name in ('infeasible', 'infeasibleOrUnbounded'):
+        return 'infeasible'
+    if name in ('error', 'solverFailure', 'internalSolverError', 'licensingProblems'):
+        return 'error'
+    return 'unknown'
+
+
+def _finite(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if abs(value) != float('inf') and value == value else None
+
+
+class SolverBackend:
+    """Base class for a Pyomo solver plugin with mapped options."""
+    name = None
+    solver_name = None
+    # Generic option -> solver-specific option name (None = unsupported)
+    option_names = {'time_limit': None, 'mip_gap': None, 'threads': None}
+
+    def __init__(self):
+        self._solver = None
+
+    def solver(self):
+        if self._solver is None:
+            import pyomo.environ  # registers the plugins SolverFactory looks up
+            from pyomo.opt import SolverFactory
+            self._solver = SolverFactory(self.solver_name)
+        return self._solver
+
+    def available(self):
+        try:
+            return bool(self.solver().available(exception_flag=False))
+        except Exception:
+            return False
+
+    def map_options(self, time_limit=None, mip_gap=None, threads=None):
+        """Translate generic options into this solver's option names."""
+        options = {}
+        for key, value in (('time_limit', time_limit), ('mip_gap', mip_gap), ('threads', threads)):
+            option = self.option_names.get(key)
+            if option is not None and value is not None:
+                options[option] = value
+        return options
+
+    def solve(self, model, time_limit=240, mip_gap=0.05, threads=None, tee=True, warmstart=False, progress=None):
+        """
+        Solve a Pyomo model and load the solution into it if one was found.
+
+        With warmstart=True the current variable values are passed as a MIP
+        start where the solver supports it (ignored otherwise). With a
+        ProgressLog (and tee=True) the solver's log lines are parsed into
+        progress events as they are printed.
+        """
+        import pyomo.environ as pyo
+        solver = self.solver()
+        options = self.map_options(time_limit, mip_gap, threads)
+        kwargs = {'warmstart': True} if warmstart and self.warm_start_capable() else {}
+        start = time.time()
+        try:
+            with parse_stdout(progress):
+                results = solver.solve(model, tee=tee, load_solutions=False, options=options, **kwargs)
+        except Exception as e:
+            return SolveResult(self.name, 'error', False, runtime=time.time() - start, message=str(e))
+        runtime = time.time() - start
+
+        termination = _termination_name(results.solver.termination_condition)
+        has_solution = self._load_solution(model, results)
+        if has_solution and termination == 'unknown':
+            termination = 'feasible'
+
+        objective = pyo.value(self._active_objective(model)) if has_solution else None
+        bound = self._bound(model, results)
+        if termination != 'optimal' and bound is not None and objective is not None and bound == objective:
+            # Some file interfaces (CBC) echo the incumbent as the bound when stopped early
+            bound = None
+        message = results.solver.message
+        message = '' if message is None or str(message) == '<undefined>' else str(message)
+        return SolveResult(self.name, termination, has_solution, objective, bound, runtime, message)
+
+    def warm_start_capable(self):
+        try:
+            return bool(self.solver().warm_start_capable())
+        except Exception:
+            return False
+
+    # Helpers shared by the shell-based (file) interfaces
+    def _load_solution(self, model, results):
+        if len(results.solution) == 0:
+            return False
+        model.solutions.load_from(results)
+        return True
+
+    def _bound(self, model, results):
+        import pyomo.environ as pyo
+        objective = self._active_objective(model)
+        if objective.sense == pyo.maximize:
+            return _finite(results.problem.upper_bound)
+        return _finite(results.problem.lower_bound)
+
+    @staticmethod
+    def _active_objective(model):
+        import pyomo.environ as pyo
+        return next(model.component_data_objects(pyo.Objective, active=True))
+
+
+class GurobiBackend(SolverBackend):
+    name = 'gurobi'
+    solver_name = 'gurobi_direct'
+    option_names = {'time_limit': 'TimeLimit', 'mip_gap': 'MIPGap', 'threads': 'Threads'}
+
+    def _load_solution(self, model, results):
+        gurobi_model = self.solver()._solver_model
+        if gurobi_model is None or gurobi_model.SolCount == 0:
+            return False
+        self.solver().load_vars()
+        return True
+
+
+class HighsBackend(SolverBackend):
+    name = 'highs'
+    solver_name = 'appsi_highs'
+    option_names = {'time_limit': 'time_limit', 'mip_gap': 'mip_rel_gap', 'threads': 'threads'}
+
+    def solver(self):
+        if self._solver is None:
+            from pyomo.contrib.appsi.solvers import Highs
+            self._solver = Highs()
+        return self._solver
+
+    def available(self):
+        try:
+            return bool(self.solver().available())
+        except Exception:
+            return False
+
+    def solve(self, model, time_limit=240, mip_gap=0.05, threads=None, tee=True, warmstart=False, progress=None):
+        solver = self.solver()
+        solver.config.load_solution = False
+        solver.config.stream_solver = tee
+        solver.config.warmstart = warmstart
+        if time_limit is not None:
+            solver.config.time_limit = time_limit
+        solver.highs_options.update(self.map_options(None, mip_gap, threads))
+        start = time.time()
+        try:
+            with parse_stdout(progress):
+                results = solver.solve(model)
+        except Exception as e:
+            return SolveResult(self.name, 'error', False, runtime=time.time() - start, message=str(e))
+        runtime = time.time() - start
+
+        termination = _termination_name(results.termination_condition)
+        has_solution = results.best_feasible_objective is not None
+        if has_solution:
+            results.solution_loader.load_vars()
+            if termination == 'unknown':
+                termination = 'feasible'
+        return SolveResult(self.name, termination, has_solution,
+                           _finite(results.best_feasible_objective),
+                           _finite(results.best_objective_bound), runtime)
+
+
+class CbcBackend(SolverBackend):
+    name = 'cbc'
+    solver_name = 'cbc'
+    option_names = {'time_limit': 'sec', 'mip_gap': 'ratio', 'threads': 'threads'}
+
+
+class GlpkBackend(SolverBackend):
+    name = 'glpk'
+    solver_name = 'glpk'
+    option_names = {'time_limit': 'tmlim', 'mip_gap': 'mipgap', 'threads': None}
+
+
+BACKENDS = {
+    'gurobi': GurobiBackend,
+    'highs': HighsBackend,
+    'cbc': CbcBackend,
+    'glpk': GlpkBackend
+}
+
+
+def available_backends():
+    """Names of the installed and licensed backends, in preference order."""
+    return [name for name in SOLVER_PREFERENCE if BACKENDS[name]().available()]
+
+
+def backend_chain(preference='auto', fallback=True):
+    """
+    Build the ranked list of available solver backends.
+
+    Args:
+        preference: A backend name, a list of names to try in order, or 'auto'
+                    for the default chain (Gurobi -> HiGHS -> CBC -> GLPK)
+        fallback: Append the rest of the default chain after the requested backends
+
+    Returns:
+        list: Available SolverBackend instances, requested ones first and (with
+        fallback) the rest of the default chain after them.
+    """
+    if preference in (None, 'auto'):
+        chain = list(SOLVER_PREFERENCE)
+    elif isinstance(preference, str):
+        chain = [preference]
+    else:
+        chain = list(preference)
+
+    backends = []
+    if fallback:
+        chain = chain + [n for n in SOLVER_PREFERENCE if n not in chain]
+    for name in chain:
+        if name not in BACKENDS:
+            print(f"Warning: Unknown solver backend '{name}', skipping.")
+            continue
+        backend = BACKENDS[name]()
+        if backend.available():
+            backends.append(backend)
+        else:
+            print(f"Solver '{name}' is not available.")
+    return backends
+
+
+def select_backend(preference='auto'):
+    """Return the first available backend for the preference (see backend_chain)."""
+    backends = backend_chain(preference)
+    if not backends:
+        raise RuntimeError(f"No MILP solver available (tried {', '.join(SOLVER_PREFERENCE)}).")
+    return backends[0]
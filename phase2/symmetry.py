@@ -0,0 +1,73 @@
+def interchangeable_games(index, fixed_pairs=()):
+    """
+    Group games that can swap their refs without changing anything.
+
+    Games in the same (day, time) with the same difficulty and min/max refs
+    have the same candidate refs and the same objective terms, so any
+    schedule stays feasible and scores the same when their crews are
+    permuted. Games with a manual assignment are left out.
+
+    Args:
+        index: ScheduleIndex for the week
+        fixed_pairs: (r, k) manual assignments
+
+    Returns:
+        list: Classes of two or more game ids k, each in ascending order
+    """
+    pinned = {k for _, k in fixed_pairs}
+    groups = {}
+    for k, (d, h, _) in enumerate(index.game_slot):
+        if k in pinned:
+            continue
+        key = (d, h, index.game_difficulty[k], index.game_min_refs[k], index.game_max_refs[k])
+        groups.setdefault(key, []).append(k)
+    return [games for games in groups.values() if len(games) > 1]
+
+
+def crew_key(crew):
+    """Ordering key of a game's crew: its lowest ref index (crews in one slot never share a ref)."""
+    return min(crew, default=float('inf'))
+
+
+def symmetry_rows(index, classes):
+    """
+    Ordering constraints for each class: the lowest ref on k1 is below the lowest ref on k2.
+
+    For consecutive games k1, k2 of a class and each candidate ref r,
+    x[r, k2] <= sum of x[r', k1] over candidates r' < r. Any schedule can be
+    relabeled to satisfy them (sort the crews by their lowest ref; empty
+    crews go last), so they only cut off duplicate copies of a schedule.
+
+    Returns:
+        list: (r, k2, [(r', k1), ...]) per row: x[r, k2] - sum x[r', k1] <= 0
+    """
+    rows = []
+    for games in classes:
+        for k1, k2 in zip(games, games[1:]):
+            candidates = index.pairs_by_game[k1]
+            for r in index.pairs_by_game[k2]:
+                rows.append((r, k2, [(lower, k1) for lower in candidates if lower < r]))
+    return rows
+
+
+def canonical_pairs(pairs, classes):
+    """
+    Relabel a schedule so it satisfies the ordering constraints.
+
+    Args:
+        pairs: (r, k) assignments
+        classes: Result of interchangeable_games
+
+    Returns:
+        list: Sorted (r, k) assignments with each class's crews in key order
+    """
+    crews = {}
+    for r, k in pairs:
+        crews.setdefault(k, []).append(r)
+    relabeled = {}
+    for games in classes:
+        ordered = sorted((crews.get(k, []) for k in games), key=crew_key)
+        for k, crew in zip(games, ordered):
+            relabeled[k] = crew
+    crews.update(relabeled)
+    return sorted((r, k) for k, crew in crews.items() for r in crew)
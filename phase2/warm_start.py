@@ -0,0 +1,155 @@
+import time
+
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK
+
+
+def construct_schedule(index, max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                       max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY, fixed_pairs=(), avoid=()):
+    """
+    Build a schedule greedily to use as a MIP start.
+
+    Like phase1's balanced greedy, but aware of the phase2 rules: manual
+    assignments are placed first, games are staffed to MIN_REF in order of
+    scarcity (fewest spare candidate refs first) and each seat goes to the
+    ref with the fewest hours so far. Ties favour refs already working the
+    neighbouring hour (fewer shift blocks), then refs with less availability.
+    A ref is never given two games in one hour, more than max_hours_per_day
+    in a night or more than min(max_hours_per_week, max hours) in the week.
+
+    With `avoid`, those pairs are only used when no other ref can take the
+    seat, which gives a start far from schedules already found (see
+    phase2.solution_pool).
+
+    Args:
+        index: ScheduleIndex for the week
+        max_hours_per_week, max_hours_per_day: Hour caps
+        fixed_pairs: (r, k) manual assignments
+        avoid: (r, k) pairs to use last
+
+    Returns:
+        dict: 'pairs' (sorted (r, k) list), 'shortfall' ({k: refs missing}),
+        'complete' (every game reached MIN_REF) and 'time' (seconds)
+    """
+    start = time.time()
+    avoid = set(avoid)
+    num_refs = index.num_refs
+    caps = [min(max_hours_per_week, index.ref_max_hours[r]) for r in range(num_refs)]
+    hours = [0] * num_refs
+    day_hours = {}  # (r, d) -> games that night
+    busy = set()    # (r, d, h) slots already worked
+    on_game = [set() for _ in range(index.num_games)]
+
+    def assign(r, k):
+        d, h, _ = index.game_slot[k]
+        on_game[k].add(r)
+        busy.add((r, d, h))
+        hours[r] += 1
+        day_hours[(r, d)] = day_hours.get((r, d), 0) + 1
+
+    def can_work(r, k):
+        d, h, _ = index.game_slot[k]
+        return (r not in on_game[k] and (r, d, h) not in busy
+                and day_hours.get((r, d), 0) < max_hours_per_day and hours[r] < caps[r])
+
+    def adjacent(r, k):
+        d, h, _ = index.game_slot[k]
+        return (r, d, h - 1) in busy or (r, d, h + 1) in busy
+
+    for r, k in fixed_pairs:
+        assign(r, k)
+
+    shortfall = {}
+    order = sorted(range(index.num_games),
+                   key=lambda k: (len(index.pairs_by_game[k]) - index.game_min_refs[k], k))
+    for k in order:
+        need = int(index.game_min_refs[k]) - len(on_game[k])
+        while need > 0:
+            candidates = [r for r in index.pairs_by_game[k] if can_work(r, k)]
+            if not candidates:
+                shortfall[k] = need
+                break
+            r = min(candidates, key=lambda r: ((r, k) in avoid, hours[r], not adjacent(r, k),
+                                               len(index.pairs_by_ref[r]), r))
+            assign(r, k)
+            need -= 1
+
+    pairs = sorted((r, k) for k in range(index.num_games) for r in on_game[k])
+    return {'pairs': pairs, 'shortfall': shortfall, 'complete': not shortfall,
+            'time': time.time() - start}
+
+
+def solution_values(index, selected_pairs, normalizers, skill_combo_formulation='pairs', prior_hours=None,
+                    repeat_pairs=None):
+    """
+    Complete an assignment into values for every model variable.
+
+    The auxiliary variables take the values the solver would give them for
+    this assignment, so the point satisfies all linearization constraints.
+
+    Args:
+        index: ScheduleIndex for the week
+        selected_pairs: (r, k) pairs with x = 1
+        normalizers: Result of normalization_constants(index)
+        skill_combo_formulation: 'pairs' (default) or 'spread'
+        prior_hours: Season hours per ref before this week (MatrixModel prior_hours)
+        repeat_pairs: MatrixModel repeat_pairs, to fill its 'together' columns
+
+    Returns:
+        dict: Variable family name -> {index key: value} ('h_bar' maps to a float)
+    """
+    selected = set(selected_pairs)
+    hours = [0] * index.num_refs
+    worked = set()
+    refs_on_game = [[] for _ in range(index.num_games)]
+    for r, k in selected:
+        d, h, _ = index.game_slot[k]
+        hours[r] += 1
+        worked.add((r, d, h))
+        refs_on_game[k].append(r)
+
+    values = {'x': {pair: 1.0 if pair in selected else 0.0 for pair in index.pairs}}
+
+    # Balancing: h_bar is the mean over all refs, d_i the deviation for refs in C
+    if prior_hours is not None:
+        hours = [hours[r] + prior_hours[r] for r in range(index.num_refs)]
+    h_bar = sum(hours) / index.num_refs if index.num_refs else 0.0
+    values['h_bar'] = h_bar
+    values['d'] = {r: abs(hours[r] - h_bar) for r in normalizers['C_set']}
+
+    # Season history: refs who worked together before and share a game again
+    if repeat_pairs:
+        values['together'] = {(i, j, k): 1.0 for k in range(index.num_games) for i in refs_on_game[k]
+                              for j in refs_on_game[k] if i < j and (i, j) in repeat_pairs}
+
+    # Shift blocks: a start wherever the ref works an hour but not the hour before
+    values['start'] = {(r, d, h): 1.0 if (r, d, h) in worked and (r, d, h - 1) not in worked else 0.0
+                       for (r, d, h) in index.pairs_by_ref_slot}
+
+    # Skill combination: most/least experienced ref (spread) or co-assigned pairs
+    experience = index.ref_experience
+    combo_games = [k for k in range(index.num_games)
+                   if len(index.pairs_by_game[k]) > 1 and index.game_max_refs[k] > 1]
+    if skill_combo_formulation == 'pairs':
+        values['y'] = {(i, j, k): 1.0 if i in refs_on_game[k] and j in refs_on_game[k] else 0.0
+                       for k in combo_games for i in index.pairs_by_game[k]
+                       for j in index.pairs_by_game[k] if i < j}
+    else:
+        values['hi'] = {}
+        values['lo'] = {}
+        for k in combo_games:
+            top = max(refs_on_game[k], key=lambda r: experience[r], default=None)
+            bottom = min(refs_on_game[k], key=lambda r: experience[r], default=None)
+            for r in index.pairs_by_game[k]:
+                values['hi'][(r, k)] = 1.0 if r == top else 0.0
+                values['lo'][(r, k)] = 1.0 if r == bottom else 0.0
+
+    # Skill deficit: u_k = max(0, difficulty share - skill share)
+    mean_difficulty = normalizers['MEAN_DIFFICULTY']
+    mean_skill = normalizers['MEAN_SKILL']
+    values['u'] = {}
+    for k in range(index.num_games):
+        deficit = sum(index.game_difficulty[k] / mean_difficulty - experience[r] / mean_skill
+                      for r in refs_on_game[k])
+        values['u'][k] = max(0.0, float(deficit))
+
+    return values
@@ -0,0 +1,166 @@
+import itertools
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from phase2.evaluate import ScheduleEvaluator, assignment_matrix
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import COMPONENTS, COMPONENT_SIGNS, WEIGHT_SCALE_MAX, normalization_constants
+from phase2.presolve import presolve
+from phase2.schedule_index import DEFAULT_MAX_HOURS_PER_DAY, DEFAULT_MAX_HOURS_PER_WEEK, ScheduleIndex
+from phase2.warm_start import construct_schedule, solution_values
+
+# Model shared by the calls a worker process handles (set by _init_worker)
+_worker_model = None
+_worker_start = None
+_worker_evaluator = None
+
+
+def weight_grid(levels=(0.0, 2.5, 5.0)):
+    """
+    Every combination of the given levels for the five weights.
+
+    Returns:
+        list: Component -> weight dicts (the all-zero combination is left out)
+    """
+    grid = []
+    for values in itertools.product(levels, repeat=len(COMPONENTS)):
+        if any(values):
+            grid.append(dict(zip(COMPONENTS, values)))
+    return grid
+
+
+def sample_weights(count, low=0.0, high=WEIGHT_SCALE_MAX, seed=None):
+    """Draw `count` weight dicts uniformly from [low, high] per component."""
+    rng = random.Random(seed)
+    return [{name: round(rng.uniform(low, high), 2) for name in COMPONENTS} for _ in range(count)]
+
+
+def pareto_front(results):
+    """
+    Keep the solved results no other result beats on every component.
+
+    Effort and skill combination are maximized, the three penalties minimized.
+    Results with identical component values are reported once.
+
+    Returns:
+        list: Non-dominated results, in input order
+    """
+    solved = [result for result in results if result['components'] is not None]
+    scores = [tuple(round(COMPONENT_SIGNS[name] * result['components'][name], 9) for name in COMPONENTS)
+              for result in solved]
+
+    front = []
+    seen = set()
+    for i, score in enumerate(scores):
+        if score in seen:
+            continue
+        dominated = any(all(a >= b for a, b in zip(other, score)) and other != score for other in scores)
+        if not dominated:
+            front.append(solved[i])
+            seen.add(score)
+    return front
+
+
+def _init_worker(model, start, evaluator):
+    global _worker_model, _worker_start, _worker_evaluator
+    _worker_model = model
+    _worker_start = start
+    _worker_evaluator = evaluator
+
+
+def _solve_weights(job):
+    """Solve the shared model for one weight set (runs in a worker process)."""
+    weights, time_limit, mip_gap = job
+    model = _worker_model
+    # The worker's previous schedule is feasible for any weights, so it seeds the next solve
+    start = model.last_solution if model.last_solution is not None else _worker_start
+    result, solution = model.solve(weights, 'auto', time_limit, mip_gap, threads=1, tee=False,
+                                   start=start, persistent=True)
+    pairs = model.selected_pairs(solution) if solution is not None else None
+    # Scored from the schedule itself: auxiliary columns with zero weight are not
+    # pushed to their bounds, so the model's own values can overstate a component
+    components = _worker_evaluator.components(assignment_matrix(model.index, pairs)) if pairs is not None else None
+    return {
+        'weights': weights,
+        'termination': result.termination,
+        'objective': result.objective,
+        'gap': result.gap,
+        'runtime': result.runtime,
+        'components': components,
+        'pairs': pairs
+    }
+
+
+class WeightSweep:
+    def __init__(self, refs, games, max_hours_per_week=DEFAULT_MAX_HOURS_PER_WEEK,
+                 max_hours_per_day=DEFAULT_MAX_HOURS_PER_DAY, skill_combo_formulation='pairs'):
+        """
+        Solve one week for many weight mixes to show the trade-offs between them.
+
+        The model is built once with every objective family, so each weight mix
+        only changes the objective. Each worker process receives one copy and
+        keeps its HiGHS instance loaded between the mixes it solves.
+
+        Args:
+            refs: List of Ref objects
+            games: List of Game objects
+            max_hours_per_week, max_hours_per_day: Hour caps
+            skill_combo_formulation: 'pairs' (default) or 'spread'
+        """
+        build_start = time.time()
+        self.refs = refs
+        self.games = games
+        self.index = ScheduleIndex(refs, games)
+        index = self.index
+
+        fixed_pairs, _, unavailable = index.fixed_pairs()
+        if unavailable:
+            r, game_number = unavailable[0]
+            raise ValueError(f"{refs[r].get_name()} is manually assigned to game {game_number} "
+                             f"but is not available at that time")
+        reduction = presolve(index, fixed_pairs, max_hours_per_week, max_hours_per_day)
+        if reduction.error:
+            raise ValueError(reduction.error)
+
+        self.normalizers = normalization_constants(index)
+        self.model = MatrixModel(index, max_hours_per_week, max_hours_per_day, fixed_pairs,
+                                 skill_combo_formulation=skill_combo_formulation, normalizers=self.normalizers)
+        self.evaluator = ScheduleEvaluator(index, self.normalizers, max_hours_per_week, max_hours_per_day,
+                                           fixed_pairs, skill_combo_formulation)
+
+        self.start = None
+        heuristic = construct_schedule(index, max_hours_per_week, max_hours_per_day, fixed_pairs)
+        if heuristic['complete']:
+            self.start = self.model.start_vector(solution_values(index, heuristic['pairs'], self.normalizers,
+                                                                 skill_combo_formulation))
+        self.build_time = time.time() - build_start
+
+    def run(self, weight_sets, time_limit=30, mip_gap=0.05, workers=None):
+        """
+        Solve every weight set concurrently.
+
+        Args:
+            weight_sets: Component -> weight dicts (see weight_grid, sample_weights)
+            time_limit: Seconds per weight set
+            mip_gap: Relative gap per weight set
+            workers: Process pool size (None = one per CPU)
+
+        Returns:
+            list: One result dict per weight set ('weights', 'termination',
+            'objective', 'gap', 'runtime', 'components', 'pairs')
+        """
+        jobs = [(weights, time_limit, mip_gap) for weights in weight_sets]
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.model, self.start, self.evaluator)) as pool:
+            for result in pool.map(_solve_weights, jobs):
+                results.append(result)
+                objective = f"{result['objective']:.4f}" if result['objective'] is not None else '-'
+                print(f"Weight mix {len(results)}/{len(jobs)}: {result['termination']}, "
+                      f"objective {objective} in {result['runtime']:.1f}s")
+        return results
+
+    def pareto(self, weight_sets, time_limit=30, mip_gap=0.05, workers=None):
+        """Run the sweep and keep only the non-dominated schedules."""
+        return pareto_front(self.run(weight_sets, time_limit, mip_gap, workers))
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# Import phase2 the way the dashboard does, from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.objective import COMPONENTS, normalization_constants
+from phase2.schedule_index import ScheduleIndex
+
+
+@pytest.fixture
+def small_week():
+    """The benchmark's 12-ref, 2-night 'small' instance (two manual assignments)."""
+    return make_instance(**STANDARD_INSTANCES['small'])
+
+
+@pytest.fixture
+def small_index(small_week):
+    refs, games = small_week
+    return ScheduleIndex(refs, games)
+
+
+@pytest.fixture
+def norm(small_index):
+    return normalization_constants(small_index)
+
+
+@pytest.fixture
+def weights():
+    """Distinct nonzero weights, so a mix-up between components shows in the objective."""
+    return dict(zip(COMPONENTS, [1.0, 2.0, 1.5, 0.5, 3.0]))
@@ -0,0 +1,63 @@
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.decomposition import DayDecomposition
+from phase2.evaluate import ScheduleEvaluator
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import WEIGHT_ATTRIBUTES, normalization_constants
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+from phase2.warm_start import solution_values
+
+
+def shift_blocks(index, pairs, norm):
+    model = MatrixModel(index, 20, 8, index.fixed_pairs()[0], normalizers=norm)
+    return model.component_values(model.start_vector(solution_values(index, pairs, norm)))['shift_block']
+
+
+def test_a_night_keeps_the_gaps_between_its_games(weights):
+    refs, games = make_instance(**{**STANDARD_INSTANCES['small'], 'availability': 1.0})
+    # The first night has no 19:00 games, the second still does
+    first_night = games[0].get_date()
+    games = [game for game in games if (game.get_date(), game.get_time()) != (first_night, '19:00')]
+    index = ScheduleIndex(refs, games)
+    norm = normalization_constants(index)
+    decomposition = DayDecomposition(index, 20, 8, weights, norm, index.fixed_pairs()[0])
+    budgets = decomposition.initial_budgets()
+    task = decomposition._tasks(budgets, decomposition.initial_targets(budgets, 1.0), 10)[0]
+    night = ScheduleIndex(task['refs'], task['games'], task['times'])
+
+    # A ref working 18:00 and 20:00 works two shift blocks, in the night's model as in the week's
+    r = next(r for r in range(index.num_refs)
+             if {index.game_slot[k][:2] for k in index.pairs_by_ref[r]} >= {(0, 0), (0, 2)})
+    week_pairs = [(r, next(k for k in index.pairs_by_ref[r] if index.game_slot[k][:2] == (0, h))) for h in (0, 2)]
+    night_pairs = [(r, night.game_id[index.game_list[k]]) for _, k in week_pairs]
+
+    assert shift_blocks(night, night_pairs, norm) == pytest.approx(shift_blocks(index, week_pairs, norm))
+    assert shift_blocks(index, week_pairs, norm) == pytest.approx(2 * shift_blocks(index, week_pairs[:1], norm))
+
+
+def test_merged_week_is_feasible_and_scored_like_the_weekly_model(weights):
+    results = {}
+    for decomposition in (None, 'day'):
+        refs, games = make_instance(**STANDARD_INSTANCES['small'])
+        scheduler = Scheduler(refs, games)
+        scheduler.set_parameters({'builder': 'matrix', 'decomposition': decomposition, 'workers': 2,
+                                  'mip_gap': 0.0, 'time_limit': 30,
+                                  **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+        results[decomposition] = result = scheduler.optimize()
+        assert result['success'], result.get('error')
+
+    week, merged = results[None], results['day']
+    index = ScheduleIndex(*make_instance(**STANDARD_INSTANCES['small']))
+    ref_of = {ref.get_name(): r for r, ref in enumerate(index.refs)}
+    pairs = [(ref_of[row['ref_name']], index.game_id[index.find_game_by_number(row['game_number'])])
+             for row in merged['assignments']]
+    scored = ScheduleEvaluator(index, normalization_constants(index), 20, 8, index.fixed_pairs()[0]).evaluate(
+        pairs, weights)
+
+    assert merged['stats']['backend'] == 'day-decomposition'
+    assert scored['feasible']
+    assert scored['objective'] == pytest.approx(merged['stats']['objective'], abs=1e-6)
+    # The nights are solved apart, so the merged week can only match the weekly optimum
+    assert merged['stats']['objective'] <= week['stats']['objective'] + 1e-6
@@ -0,0 +1,79 @@
+import pytest
+
+from phase2.benchmark import make_instance
+from phase2.evaluate import ScheduleEvaluator, assignment_matrix
+from phase2.feasibility import staffing_check
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import COMPONENT_SIGNS, COMPONENTS, WEIGHT_ATTRIBUTES, normalization_constants
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+
+# (instance, weekly cap, nightly cap): two-ref crews on a thin roster make the caps bind
+CASES = [(dict(num_refs=10, num_days=2, num_times=3, games_per_slot=(2, 2), min_refs=2, max_refs=2, seed=seed),
+          week, day)
+         for seed in (4, 5) for week, day in [(1, 1), (2, 1), (3, 2), (4, 2), (6, 3), (20, 8)]]
+
+
+@pytest.mark.parametrize('instance, week, day', CASES)
+def test_staffing_check_agrees_with_the_milp(instance, week, day, weights):
+    index = ScheduleIndex(*make_instance(**instance))
+    fixed_pairs = index.fixed_pairs()[0]
+    report = staffing_check(index, fixed_pairs, week, day)
+
+    model = MatrixModel(index, week, day, fixed_pairs)
+    result, solution = model.solve(weights, 'auto', 60, 0.05, tee=False)
+
+    assert result.termination in ('infeasible', 'optimal')
+    assert report.feasible == (result.termination != 'infeasible')
+    if not report.feasible:
+        assert report.shortage > 0
+        assert report.blocked_games
+
+
+def test_cases_cover_both_outcomes():
+    outcomes = set()
+    for instance, week, day in CASES:
+        index = ScheduleIndex(*make_instance(**instance))
+        outcomes.add(staffing_check(index, index.fixed_pairs()[0], week, day).feasible)
+    assert outcomes == {True, False}
+
+
+def test_elastic_model_fills_exactly_the_reported_shortage(weights):
+    index = ScheduleIndex(*make_instance(**CASES[0][0]))
+    fixed_pairs = index.fixed_pairs()[0]
+    report = staffing_check(index, fixed_pairs, 20, 1)
+    assert not report.feasible
+
+    model = MatrixModel(index, 20, 1, fixed_pairs, elastic=True)
+    _, solution = model.solve(weights, 'auto', 60, 0.0, tee=False)
+    # One unit of slack (a missing ref or an hour over a cap) fills at most one seat, so the
+    # cheapest best-effort schedule uses exactly the max-flow shortage
+    violations = model.violations(solution)
+    assert sum(violations['short'].values()) + sum(violations['over_day'].values()) \
+        + sum(violations['over_week'].values()) == report.shortage
+
+
+@pytest.mark.parametrize('builder', ['pyomo', 'matrix'])
+def test_elastic_schedule_uses_the_shortage_and_still_optimizes(builder, weights):
+    refs, games = make_instance(**CASES[0][0])
+    index = ScheduleIndex(refs, games)
+    fixed_pairs = index.fixed_pairs()[0]
+    shortage = staffing_check(index, fixed_pairs, 20, 1).shortage
+
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters({'builder': builder, 'solver': 'highs', 'elastic': True, 'max_hours_per_day': 1,
+                              'mip_gap': 0.0, 'time_limit': 60,
+                              **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+    result = scheduler.optimize()
+
+    assert result['success'], result.get('error')
+    violations = result['violations']
+    assert violations['missing_refs'] + violations['extra_hours'] == shortage
+    # The slack is capped rather than priced, so the objective is the usual weighted components
+    ref_of = {ref.get_name(): r for r, ref in enumerate(refs)}
+    pairs = [(ref_of[row['ref_name']], index.game_id[index.find_game_by_number(row['game_number'])])
+             for row in result['assignments']]
+    components = ScheduleEvaluator(index, normalization_constants(index), 20, 1, fixed_pairs).components(
+        assignment_matrix(index, pairs))
+    assert result['stats']['objective'] == pytest.approx(
+        sum(COMPONENT_SIGNS[name] * weights[name] * components[name] for name in COMPONENTS), abs=1e-6)
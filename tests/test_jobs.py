@@ -0,0 +1,95 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.jobs import DONE, FINAL_STATES, JobRunner, _claim, _worker_lock, _worker_pid
+
+
+@pytest.fixture
+def runner(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    yield runner
+    # The worker would otherwise idle for WORKER_IDLE_TIMEOUT
+    pid = _worker_pid(runner.jobs_dir)
+    if pid is not None:
+        os.kill(pid, signal.SIGTERM)
+
+
+def wait_for(condition, timeout=120):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.2)
+
+
+def test_a_job_is_claimed_once(tmp_path):
+    assert _claim(str(tmp_path))
+    assert not _claim(str(tmp_path))
+
+
+def test_job_result_comes_back_from_the_worker(runner):
+    refs, games = make_instance(**STANDARD_INSTANCES['small'])
+    job_ids = [runner.submit(refs, games, {'time_limit': 30, 'mip_gap': 0.0}) for _ in range(2)]
+
+    wait_for(lambda: all(runner.status(job_id)['state'] in FINAL_STATES for job_id in job_ids))
+
+    statuses = [runner.status(job_id) for job_id in job_ids]
+    assert [status['state'] for status in statuses] == [DONE, DONE]
+    # One worker ran both jobs, in submission order
+    assert statuses[0]['pid'] == statuses[1]['pid']
+    assert statuses[0]['finished'] <= statuses[1]['started']
+    result = runner.result(job_ids[0])
+    assert result['success'] and result['assignments']
+    assert len(result['games']) == len(games)
+    assert 'SOLVER RESULTS' in runner.log(job_ids[0])
+
+
+def test_stop_keeps_the_best_schedule_so_far(runner):
+    refs, games = make_instance(**STANDARD_INSTANCES['week'])
+    job_id = runner.submit(refs, games, {'time_limit': 120, 'mip_gap': 0.0})
+
+    wait_for(lambda: runner.incumbents(job_id))
+    runner.stop(job_id)
+    wait_for(lambda: runner.status(job_id)['state'] in FINAL_STATES)
+
+    status = runner.status(job_id)
+    assert status['state'] == DONE
+    assert status['finished'] - status['started'] < 60
+    result = runner.result(job_id)
+    assert result['success'] and result['assignments']
+
+
+def test_worker_lock_is_exclusive(tmp_path):
+    held = []
+
+    def hold(name):
+        with _worker_lock(str(tmp_path)):
+            held.append(name)
+            time.sleep(0.2)
+            held.append(name)
+
+    threads = [threading.Thread(target=hold, args=(name,)) for name in 'ab']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each holder enters and leaves before the other enters
+    assert held[0] == held[1] and held[2] == held[3]
+    assert not os.path.exists(tmp_path / 'worker.lock')
+
+
+def test_worker_lock_left_by_a_dead_process_is_taken_over(tmp_path):
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    (tmp_path / 'worker.lock').write_text(str(dead.pid))
+
+    with _worker_lock(str(tmp_path)):
+        assert (tmp_path / 'worker.lock').read_text() == str(os.getpid())
+    assert not os.path.exists(tmp_path / 'worker.lock')
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from phase2.evaluate import VIOLATION_KINDS, LiveScore, ScheduleEvaluator
+from phase2.objective import COMPONENTS
+from phase2.warm_start import construct_schedule
+
+
+def violation_counts(violations):
+    """Evaluator violations as the per-kind counts LiveScore keeps."""
+    return {
+        'short': sum(violations['short'].values()),
+        'over_max': sum(violations['over_max'].values()),
+        'over_day': sum(violations['over_day'].values()),
+        'over_week': sum(violations['over_week'].values()),
+        'double_booked': sum(games - 1 for games in violations['double_booked'].values()),
+        'unavailable': len(violations['unavailable']),
+        'manual_missing': len(violations['manual_missing'])
+    }
+
+
+@pytest.mark.parametrize('formulation', ['pairs', 'spread'])
+def test_live_score_matches_evaluator_after_random_edits(formulation, small_index, norm, weights):
+    # Tight caps so that edits break them as well as the staffing bounds
+    fixed_pairs = small_index.fixed_pairs()[0]
+    evaluator = ScheduleEvaluator(small_index, norm, 6, 3, fixed_pairs, formulation)
+    start = construct_schedule(small_index, 6, 3, fixed_pairs)['pairs']
+    live = LiveScore(evaluator, start, weights)
+
+    rng = random.Random(0)
+    for _ in range(400):
+        # Any (ref, game), available or not
+        r, k = rng.randrange(small_index.num_refs), rng.randrange(small_index.num_games)
+        before = live.snapshot()['objective']
+        delta = live.add(r, k) if rng.random() < 0.5 else live.remove(r, k)
+
+        snapshot = live.snapshot()
+        expected = evaluator.evaluate(live.pairs(), weights)
+        for name in COMPONENTS:
+            assert snapshot['components'][name] == pytest.approx(expected['components'][name], abs=1e-9)
+        assert snapshot['objective'] == pytest.approx(expected['objective'], abs=1e-9)
+        assert snapshot['violations'] == violation_counts(expected['violations'])
+        assert snapshot['feasible'] == expected['feasible']
+        assert delta['objective'] == pytest.approx(snapshot['objective'] - before, abs=1e-9)
+
+
+def test_live_score_edits_that_change_nothing(small_index, norm, weights):
+    evaluator = ScheduleEvaluator(small_index, norm)
+    r, k = small_index.pairs[0]
+    live = LiveScore(evaluator, [(r, k)], weights)
+
+    assert live.add(r, k)['objective'] == 0.0
+    live.remove(r, k)
+    unchanged = live.remove(r, k)
+    assert unchanged['objective'] == 0.0
+    assert all(change == 0 for change in unchanged['violations'].values())
+    assert set(unchanged['violations']) == set(VIOLATION_KINDS)
+    assert live.pairs() == []
@@ -0,0 +1,35 @@
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.evaluate import ScheduleEvaluator
+from phase2.objective import WEIGHT_ATTRIBUTES, normalization_constants
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+from phase2.warm_start import construct_schedule
+
+
+def test_lns_returns_a_complete_feasible_schedule(weights):
+    refs, games = make_instance(**STANDARD_INSTANCES['week'])
+    index = ScheduleIndex(refs, games)
+    fixed_pairs = index.fixed_pairs()[0]
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters({'builder': 'matrix', 'lns': True, 'max_hours_per_week': 4, 'max_hours_per_day': 2,
+                              'time_limit': 10, 'workers': 2,
+                              **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+    result = scheduler.optimize()
+
+    assert result['success'], result.get('error')
+    assert result['stats']['backend'] == 'lns'
+    ref_of = {ref.get_name(): r for r, ref in enumerate(refs)}
+    pairs = [(ref_of[row['ref_name']], index.game_id[index.find_game_by_number(row['game_number'])])
+             for row in result['assignments']]
+    assert len(set(pairs)) == len(pairs)
+    evaluator = ScheduleEvaluator(index, normalization_constants(index), 4, 2, fixed_pairs)
+    scored = evaluator.evaluate(pairs, weights)
+    # Feasible covers every game's crew size, the caps, availability and the manual assignments
+    assert scored['feasible'], scored['violations']
+    assert scored['objective'] == pytest.approx(result['stats']['objective'], abs=1e-6)
+    # LNS only ever accepts improvements on the greedy schedule it starts from
+    greedy = construct_schedule(index, 4, 2, fixed_pairs)
+    assert greedy['complete']
+    assert scored['objective'] >= evaluator.evaluate(greedy['pairs'], weights)['objective'] - 1e-6
@@ -0,0 +1,45 @@
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.evaluate import ScheduleEvaluator
+from phase2.local_search import LocalSearch
+from phase2.objective import WEIGHT_ATTRIBUTES, normalization_constants
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+from phase2.warm_start import construct_schedule
+
+
+@pytest.mark.parametrize('formulation', ['pairs', 'spread'])
+def test_local_search_returns_a_complete_feasible_schedule(formulation, weights):
+    refs, games = make_instance(**STANDARD_INSTANCES['week'])
+    index = ScheduleIndex(refs, games)
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters({'solver': 'local_search', 'skill_combo_formulation': formulation,
+                              'max_hours_per_week': 4, 'max_hours_per_day': 2, 'time_limit': 2,
+                              **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+    result = scheduler.optimize()
+
+    assert result['success'], result.get('error')
+    assert result['stats']['backend'] == 'local_search'
+    ref_of = {ref.get_name(): r for r, ref in enumerate(refs)}
+    pairs = [(ref_of[row['ref_name']], index.game_id[index.find_game_by_number(row['game_number'])])
+             for row in result['assignments']]
+    assert len(set(pairs)) == len(pairs)
+    evaluator = ScheduleEvaluator(index, normalization_constants(index), 4, 2, index.fixed_pairs()[0], formulation)
+    scored = evaluator.evaluate(pairs, weights)
+    # Feasible covers every game's crew size, the caps, availability and the manual assignments
+    assert scored['feasible'], scored['violations']
+    assert scored['objective'] == pytest.approx(result['stats']['objective'], abs=1e-6)
+
+
+def test_local_search_never_ends_below_its_start(small_index, norm, weights):
+    fixed_pairs = small_index.fixed_pairs()[0]
+    greedy = construct_schedule(small_index, 4, 2, fixed_pairs)
+    assert greedy['complete']
+    evaluator = ScheduleEvaluator(small_index, norm, 4, 2, fixed_pairs)
+
+    result = LocalSearch(small_index, weights, norm, 4, 2, fixed_pairs).run(greedy['pairs'], 1)
+
+    assert not result['short']
+    assert evaluator.evaluate(result['pairs'], weights)['feasible']
+    assert result['objective'] >= evaluator.evaluate(greedy['pairs'], weights)['objective'] - 1e-9
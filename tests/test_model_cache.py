@@ -0,0 +1,58 @@
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.model_cache import ModelCache, input_hash
+from phase2.scheduler import Scheduler
+
+
+def optimize(params, model_cache=None):
+    scheduler = Scheduler(*make_instance(**STANDARD_INSTANCES['small']))
+    scheduler.set_parameters({'builder': 'matrix', 'time_limit': 30, 'mip_gap': 0.0, **params})
+    if model_cache is not None:
+        scheduler.set_model_cache(model_cache)
+    result = scheduler.optimize()
+    assert result['success'], result.get('error')
+    return result['stats']
+
+
+def test_new_weights_reuse_the_cached_model():
+    cache = ModelCache()
+    first = optimize({'weight_effort_bonus': 1.0}, cache)
+    second = optimize({'weight_effort_bonus': 3.0}, cache)
+
+    assert not first['model_cached'] and second['model_cached']
+    assert (cache.hits, len(cache)) == (1, 1)
+    # Re-solving in place reaches the same optimum as building the model afresh
+    assert second['objective'] == pytest.approx(optimize({'weight_effort_bonus': 3.0})['objective'], abs=1e-6)
+
+
+def test_a_new_hour_cap_builds_a_new_model():
+    cache = ModelCache()
+    optimize({'max_hours_per_week': 20}, cache)
+    stats = optimize({'max_hours_per_week': 3}, cache)
+
+    assert not stats['model_cached']
+    assert (cache.hits, len(cache)) == (0, 2)
+
+
+def test_input_hash_covers_availability_and_max_hours(small_week):
+    refs, games = small_week
+    before = input_hash(refs, games, 20, 8)
+    assert input_hash(*make_instance(**STANDARD_INSTANCES['small']), 20, 8) == before
+
+    refs[1].set_max_hours(refs[1].get_max_hours() - 1)
+    after_max_hours = input_hash(refs, games, 20, 8)
+    availability = refs[0].get_availability()
+    availability[0] = 1 - availability[0]
+    assert len({before, after_max_hours, input_hash(refs, games, 20, 8)}) == 3
+
+
+def test_least_recently_used_model_is_dropped():
+    cache = ModelCache(max_entries=2)
+    cache.put('a', 'model a')
+    cache.put('b', 'model b')
+    cache.get('a')
+    cache.put('c', 'model c')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'model a' and cache.get('c') == 'model c'
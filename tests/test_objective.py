@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.evaluate import ScheduleEvaluator, assignment_matrix
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import COMPONENTS, WEIGHT_ATTRIBUTES
+from phase2.scheduler import Scheduler
+from phase2.warm_start import construct_schedule, solution_values
+
+
+@pytest.mark.parametrize('formulation', ['pairs', 'spread'])
+def test_pyomo_and_matrix_builders_reach_the_same_optimum(formulation, weights):
+    objectives = {}
+    for builder in ('pyomo', 'matrix'):
+        refs, games = make_instance(**STANDARD_INSTANCES['small'])
+        scheduler = Scheduler(refs, games)
+        scheduler.set_parameters({'builder': builder, 'skill_combo_formulation': formulation, 'mip_gap': 0.0,
+                                  'time_limit': 60, 'solver': 'highs',
+                                  **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+        result = scheduler.optimize()
+        assert result['success'], result.get('error')
+        assert result['stats']['termination'] == 'optimal'
+        objectives[builder] = result['stats']['objective']
+
+    assert objectives['pyomo'] == pytest.approx(objectives['matrix'], abs=1e-6)
+
+
+@pytest.mark.parametrize('formulation', ['pairs', 'spread'])
+def test_evaluator_matches_model_at_the_greedy_schedule(formulation, small_index, norm, weights):
+    fixed_pairs = small_index.fixed_pairs()[0]
+    model = MatrixModel(small_index, 20, 8, fixed_pairs, skill_combo_formulation=formulation, normalizers=norm)
+    evaluator = ScheduleEvaluator(small_index, norm, 20, 8, fixed_pairs, formulation)
+
+    pairs = construct_schedule(small_index, 20, 8, fixed_pairs)['pairs']
+    vector = model.start_vector(solution_values(small_index, pairs, norm, formulation))
+    result = evaluator.evaluate(assignment_matrix(small_index, pairs), weights)
+
+    expected = model.component_values(vector)
+    for name in COMPONENTS:
+        assert result['components'][name] == pytest.approx(expected[name], abs=1e-9)
+    assert result['objective'] == pytest.approx(model.objective(weights) @ vector, abs=1e-9)
+    assert result['feasible']
+
+
+def test_evaluator_matches_model_at_the_optimum(small_index, norm, weights):
+    fixed_pairs = small_index.fixed_pairs()[0]
+    model = MatrixModel(small_index, 20, 8, fixed_pairs, normalizers=norm)
+    evaluator = ScheduleEvaluator(small_index, norm, 20, 8, fixed_pairs)
+
+    result, solution = model.solve(weights, 'auto', 60, 0.0, tee=False)
+    assert solution is not None
+    # Every weight is nonzero, so each auxiliary column sits at its bound and the model's values are exact
+    expected = model.component_values(solution)
+    scored = evaluator.evaluate(assignment_matrix(small_index, model.selected_pairs(solution)), weights)
+    for name in COMPONENTS:
+        assert scored['components'][name] == pytest.approx(expected[name], abs=1e-6)
+    assert scored['objective'] == pytest.approx(result.objective, abs=1e-6)
+
+
+def test_evaluator_counts_violations(small_index, norm):
+    evaluator = ScheduleEvaluator(small_index, norm, 20, 8, small_index.fixed_pairs()[0])
+    result = evaluator.evaluate(np.zeros((small_index.num_refs, small_index.num_games), dtype=np.int8))
+
+    assert not result['feasible']
+    assert sum(result['violations']['short'].values()) == int(small_index.game_min_refs.sum())
+    assert len(result['violations']['manual_missing']) == len(small_index.fixed_pairs()[0])
@@ -0,0 +1,52 @@
+import pytest
+
+from phase2.Game import Game
+from phase2.Ref import Ref
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.presolve import presolve
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+
+
+def test_presolve_removes_the_pairs_manual_assignments_rule_out():
+    games = [Game('Monday', '18:00', 1, '3', 'Court 1'), Game('Monday', '18:00', 2, '3', 'Court 2', max_refs=1),
+             Game('Monday', '19:00', 3, '3', 'Court 1')]
+    refs = [Ref(name, [1, 1], '', '') for name in 'ABC']
+    refs[0].set_assigned_games([1])
+    refs[1].set_assigned_games([2])
+    refs[1].set_max_hours(1)
+    index = ScheduleIndex(refs, games)
+
+    reduction = presolve(index, index.fixed_pairs()[0], 20, 8)
+
+    # A and B are busy at 18:00, B has no hours left for 19:00 and game 2's only seat is B's
+    assert reduction.error is None
+    assert reduction.removed == {'slot taken': 2, 'no hours left': 1, 'game covered': 1}
+    assert (reduction.pairs_before, reduction.pairs_after) == (9, 5)
+    assert reduction.idle_refs == [1]
+    assert [index.game_list[k].get_number() for k in reduction.covered_games] == [2]
+    assert sorted(index.pairs) == [(0, 0), (0, 2), (1, 1), (2, 0), (2, 2)]
+
+
+def test_presolve_reports_manual_assignments_that_break_a_cap():
+    games = [Game('Monday', '18:00', 1, '3', 'Court 1'), Game('Monday', '19:00', 2, '3', 'Court 1')]
+    refs = [Ref('A', [1, 1], '', '')]
+    refs[0].set_assigned_games([1, 2])
+    index = ScheduleIndex(refs, games)
+
+    assert 'more manual assignments' in presolve(index, index.fixed_pairs()[0], 20, 1).error
+
+
+def test_presolve_keeps_the_optimum():
+    stats = {}
+    for enabled in (False, True):
+        scheduler = Scheduler(*make_instance(**STANDARD_INSTANCES['small']))
+        scheduler.set_parameters({'builder': 'matrix', 'presolve': enabled, 'mip_gap': 0.0, 'time_limit': 30})
+        result = scheduler.optimize()
+        assert result['success'], result.get('error')
+        stats[enabled] = result['stats']
+
+    counts = stats[True]['presolve']
+    assert counts['pairs_before'] - counts['pairs_after'] == sum(counts['removed'].values()) > 0
+    assert stats[True]['num_variables'] < stats[False]['num_variables']
+    assert stats[True]['objective'] == pytest.approx(stats[False]['objective'], abs=1e-6)
@@ -0,0 +1,108 @@
+import sys
+
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.evaluate import ScheduleEvaluator
+from phase2.objective import WEIGHT_ATTRIBUTES, normalization_constants
+from phase2.progress import ProgressLog, parse_stdout, read_progress
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+
+# Captured from a Pyomo appsi HiGHS solve (tee=True)
+HIGHS_LOG = """\
+        Nodes      |    B&B Tree     |            Objective Bounds              |  Dynamic Constraints |       Work      
+Src  Proc. InQueue |  Leaves   Expl. | BestBound       BestSol              Gap |   Cuts   InLp Confl. | LpIters     Time
+         0       0         0   0.00%   11.5637153      -inf                 inf        0      0      0         0     0.6s
+ R       0       0         0   0.00%   -1.459836968    -6.153465476      76.28%        0      0      0      2165     1.0s
+ C       0       0         0   0.00%   -1.562569207    -6.032795056      74.10%      982     85      0      2973     2.3s
+ L       0       0         0   0.00%   -1.791657603    -4.012934368      55.35%     1956    170      0      5423     8.9s
+ L       0       0         0   0.00%   -1.791657603    -3.604477792      50.29%     1956    170      0      9295    14.0s
+         0       0         0   0.00%   -1.791657603    -3.604477792      50.29%      104      0      0     14224    14.3s
+"""
+
+CBC_LOG = """\
+Cbc0012I Integer solution of -6.25 found by DiveCoefficient after 120 iterations and 0 nodes (0.41 seconds)
+Cbc0010I After 100 nodes, 3 on tree, -6.25 best solution, best possible -5.1 (0.52 seconds)
+Cbc0012I Integer solution of -5.8 found by RINS after 300 iterations and 150 nodes (0.90 seconds)
+"""
+
+GLPK_LOG = """\
+Solving LP relaxation...
++   402: mip =  -6.500000000e+00 <=  -5.000000000e+00  30.0% (20; 0)
++  1021: mip =  -5.500000000e+00 <=     tree is empty   0.0% (0; 75)
+INTEGER OPTIMAL SOLUTION FOUND
+"""
+
+
+def parse(log):
+    progress = ProgressLog()
+    with parse_stdout(progress):
+        print(log, end='')
+    return progress
+
+
+def test_highs_log(capsys):
+    progress = parse(HIGHS_LOG)
+
+    # The repeated last row changes nothing, so it adds no event
+    assert [event['incumbent'] for event in progress.events] == [
+        None, -6.153465476, -6.032795056, -4.012934368, -3.604477792]
+    assert progress.events[0]['bound'] == 11.5637153
+    last = progress.summary()
+    assert (last['runtime'], last['solutions']) == (14.0, 4)
+    assert last['gap'] == pytest.approx((-1.791657603 + 3.604477792) / 3.604477792)
+    # The log still reaches the terminal
+    assert capsys.readouterr().out == HIGHS_LOG
+
+
+def test_cbc_log():
+    events = parse(CBC_LOG).events
+
+    assert [(event['incumbent'], event['bound'], event['solutions']) for event in events] == [
+        (-6.25, None, 1), (-6.25, -5.1, 1), (-5.8, -5.1, 2)]
+    assert events[-1]['runtime'] == 0.9
+
+
+def test_glpk_log():
+    events = parse(GLPK_LOG).events
+
+    # "tree is empty" keeps the last bound
+    assert [(event['incumbent'], event['bound'], event['solutions']) for event in events] == [
+        (-6.5, -5.0, 1), (-5.5, -5.0, 2)]
+
+
+def test_parse_stdout_without_a_progress_log_leaves_stdout_alone():
+    stdout = sys.stdout
+    with parse_stdout(None) as progress:
+        print(HIGHS_LOG)
+    assert progress is None and sys.stdout is stdout
+
+
+def test_each_improving_schedule_is_published_whole(tmp_path, weights):
+    refs, games = make_instance(**STANDARD_INSTANCES['small'])
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters({'builder': 'matrix', 'mip_gap': 0.0, 'time_limit': 30,
+                              **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+    progress = ProgressLog(incumbents_path=str(tmp_path / 'incumbents.jsonl'))
+    scheduler.set_progress(progress)
+    result = scheduler.optimize()
+    assert result['success'], result.get('error')
+
+    published = read_progress(str(tmp_path / 'incumbents.jsonl'))
+    assert published and len(published) == len(progress.incumbents)
+    objectives = [incumbent['objective'] for incumbent in published]
+    assert objectives == sorted(objectives)
+    assert objectives[-1] == pytest.approx(result['stats']['objective'], abs=1e-6)
+
+    # Every published schedule is complete and scores what was published for it
+    index = ScheduleIndex(*make_instance(**STANDARD_INSTANCES['small']))
+    evaluator = ScheduleEvaluator(index, normalization_constants(index), 20, 8, index.fixed_pairs()[0])
+    ref_of = {ref.get_name(): r for r, ref in enumerate(index.refs)}
+    for incumbent in published:
+        pairs = [(ref_of[row['ref_name']], index.game_id[index.find_game_by_number(row['game_number'])])
+                 for row in incumbent['assignments']]
+        scored = evaluator.evaluate(pairs, weights)
+        assert scored['feasible']
+        assert scored['objective'] == pytest.approx(incumbent['objective'], abs=1e-6)
+        assert incumbent['components'] == pytest.approx(scored['components'], abs=1e-6)
@@ -0,0 +1,55 @@
+from collections import Counter
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.scheduler import Scheduler
+
+
+def solved_week():
+    refs, games = make_instance(**STANDARD_INSTANCES['small'])
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters({'builder': 'matrix', 'time_limit': 30, 'mip_gap': 0.0})
+    result = scheduler.optimize()
+    assert result['success'], result.get('error')
+    return scheduler, result['assignments']
+
+
+def crews_by_day(assignments):
+    crews = {}
+    for row in assignments:
+        crews.setdefault(row['day'], set()).add((row['ref_name'], row['game_number']))
+    return crews
+
+
+def test_repair_changes_only_the_dropped_night():
+    scheduler, before = solved_week()
+    # The ref with the most games on the busiest night drops out of that night only
+    (name, day), _ = Counter((row['ref_name'], row['day']) for row in before).most_common(1)[0]
+
+    repaired = scheduler.repair(before, unavailable={name: [day]})
+
+    assert repaired['success'], repaired.get('error')
+    assert repaired['stats']['scope'] == 'nights'
+    before_crews, after_crews = crews_by_day(before), crews_by_day(repaired['assignments'])
+    for other_day in before_crews:
+        if other_day != day:
+            assert after_crews.get(other_day) == before_crews[other_day]
+    assert not any(ref == name for ref, _ in after_crews.get(day, ()))
+
+    removed = set(repaired['changes']['removed'])
+    assert removed == {(ref, game) for ref, game in before_crews[day] if ref == name}
+    day_of = {row['game_number']: row['day'] for row in before}
+    assert all(day_of[game] == day for _, game in repaired['changes']['added'])
+
+
+def test_repair_of_a_cancelled_game_only_removes_its_crew():
+    scheduler, before = solved_week()
+    cancelled = before[0]['game_number']
+
+    repaired = scheduler.repair(before, cancelled=[cancelled])
+
+    assert repaired['success'], repaired.get('error')
+    assert set(repaired['changes']['removed']) == {(row['ref_name'], cancelled) for row in before
+                                                   if row['game_number'] == cancelled}
+    assert repaired['changes']['added'] == []
+    kept = {(row['ref_name'], row['game_number']) for row in before if row['game_number'] != cancelled}
+    assert {(row['ref_name'], row['game_number']) for row in repaired['assignments']} == kept
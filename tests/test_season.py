@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+
+from phase2.season import SeasonLedger
+
+
+def row(name, game, day):
+    return {'ref_name': name, 'game_number': game, 'day': day}
+
+
+WEEK_1 = [row('Ann', 1, 'Tuesday'), row('Bo', 1, 'Tuesday'),
+          row('Ann', 2, 'Thursday'), row('Cy', 2, 'Thursday'), row('Bo', 2, 'Thursday')]
+WEEK_2 = [row('Bo', 7, 'Thursday'), row('Ann', 7, 'Thursday'), row('Dee', 8, 'Tuesday')]
+
+
+def test_record_week_adds_hours_and_shared_games():
+    ledger = SeasonLedger()
+    ledger.record_week(WEEK_1)
+    ledger.record_week(WEEK_2)
+
+    assert ledger.weeks == 2
+    assert ledger.names == ['Ann', 'Bo', 'Cy', 'Dee']
+    assert ledger.hours.tolist() == [3, 3, 1, 1]
+    assert ledger.fairness_hours.tolist() == [2, 2, 1, 0]
+    # Ann and Bo shared games 1, 2 and 7; Cy shared game 2 with both
+    assert ledger.together.tolist() == [[0, 3, 1, 0],
+                                        [3, 0, 1, 0],
+                                        [1, 1, 0, 0],
+                                        [0, 0, 0, 0]]
+    assert ledger.report()[0]['most_shared'] == 3
+
+
+def test_totals_follow_the_weeks_refs_and_add_new_ones(small_week):
+    refs, _ = small_week
+    ledger = SeasonLedger()
+    ledger.record_week([row(refs[0].get_name(), 1, 'Thursday'), row(refs[2].get_name(), 1, 'Thursday')])
+
+    hours, fairness_hours, together = ledger.totals([refs[2], refs[1], refs[0]])
+
+    assert hours.tolist() == [1, 0, 1]
+    assert fairness_hours.tolist() == [1, 0, 1]
+    assert together.tolist() == [[0, 0, 1], [0, 0, 0], [1, 0, 0]]
+    assert refs[1].get_name() in ledger.names
+
+
+def test_to_dict_from_dict_round_trip(tmp_path):
+    ledger = SeasonLedger(fairness_day='Tuesday')
+    ledger.record_week(WEEK_1)
+
+    copy = SeasonLedger.from_dict(json.loads(json.dumps(ledger.to_dict())))
+    assert copy.to_dict() == ledger.to_dict()
+
+    # The copy carries on exactly like the original
+    ledger.record_week(WEEK_2)
+    copy.record_week(WEEK_2)
+    assert copy.to_dict() == ledger.to_dict()
+    assert copy.fairness_day == 'Tuesday'
+    assert copy.together.dtype == ledger.together.dtype
+
+    path = tmp_path / 'season.json'
+    ledger.save(path)
+    loaded = SeasonLedger.load(path)
+    assert loaded.to_dict() == ledger.to_dict()
+    assert np.array_equal(loaded.together, ledger.together)
+
+
+def test_empty_ledger_round_trip():
+    copy = SeasonLedger.from_dict(SeasonLedger().to_dict())
+    assert copy.weeks == 0
+    assert copy.together.shape == (0, 0)
+    copy.record_week(WEEK_2)
+    assert copy.hours.tolist() == [1, 1, 1]
@@ -0,0 +1,58 @@
+from itertools import combinations
+
+import pytest
+
+from phase2.benchmark import STANDARD_INSTANCES, make_instance
+from phase2.evaluate import ScheduleEvaluator
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import WEIGHT_ATTRIBUTES, normalization_constants
+from phase2.schedule_index import ScheduleIndex
+from phase2.scheduler import Scheduler
+from phase2.solution_pool import SolutionPool
+
+MIN_DISTANCE = 4
+
+
+def test_pool_schedules_are_min_distance_apart(small_index, norm, weights):
+    fixed_pairs = small_index.fixed_pairs()[0]
+    model = MatrixModel(small_index, 20, 8, fixed_pairs, normalizers=norm)
+    evaluator = ScheduleEvaluator(small_index, norm, 20, 8, fixed_pairs)
+
+    pool = SolutionPool(model, weights, MIN_DISTANCE).run(3, time_limit=30, mip_gap=0.0, workers=2)
+
+    assert len(pool) == 3
+    # Distance counts the (ref, game) assignments in one schedule but not the other
+    for a, b in combinations(pool, 2):
+        assert len(set(a['pairs']) ^ set(b['pairs'])) >= MIN_DISTANCE
+        assert model.assignment_distance(a['solution'], b['solution']) == len(set(a['pairs']) ^ set(b['pairs']))
+    assert [entry['objective'] for entry in pool] == sorted((entry['objective'] for entry in pool), reverse=True)
+    assert pool[0]['distance'] == 0
+    for entry in pool:
+        scored = evaluator.evaluate(entry['pairs'], weights)
+        assert scored['feasible']
+        assert scored['objective'] == pytest.approx(entry['objective'], abs=1e-6)
+
+
+def test_scheduler_alternatives_keep_their_distance(weights):
+    refs, games = make_instance(**STANDARD_INSTANCES['small'])
+    index = ScheduleIndex(refs, games)
+    scheduler = Scheduler(refs, games)
+    scheduler.set_parameters({'builder': 'matrix', 'pool_size': 3, 'pool_min_distance': MIN_DISTANCE,
+                              'mip_gap': 0.0, 'time_limit': 30, 'workers': 2,
+                              **{attribute: weights[name] for name, attribute in WEIGHT_ATTRIBUTES.items()}})
+    result = scheduler.optimize()
+
+    assert result['success'], result.get('error')
+    alternatives = result['alternatives']
+    assert len(alternatives) == 2
+    ref_of = {ref.get_name(): r for r, ref in enumerate(refs)}
+    evaluator = ScheduleEvaluator(index, normalization_constants(index), 20, 8, index.fixed_pairs()[0])
+    schedules = []
+    for assignments in [result['assignments']] + [alternative['assignments'] for alternative in alternatives]:
+        pairs = {(ref_of[row['ref_name']], index.game_id[index.find_game_by_number(row['game_number'])])
+                 for row in assignments}
+        assert evaluator.evaluate(sorted(pairs), weights)['feasible']
+        schedules.append(pairs)
+    for alternative, pairs in zip(alternatives, schedules[1:]):
+        assert alternative['distance'] == len(pairs ^ schedules[0]) >= MIN_DISTANCE
+    assert len(schedules[1] ^ schedules[2]) >= MIN_DISTANCE
@@ -0,0 +1,48 @@
+import pytest
+
+from phase2.benchmark import make_instance
+from phase2.evaluate import ScheduleEvaluator
+from phase2.matrix_builder import MatrixModel
+from phase2.objective import normalization_constants
+from phase2.schedule_index import ScheduleIndex
+from phase2.symmetry import canonical_pairs, interchangeable_games, symmetry_rows
+from phase2.warm_start import construct_schedule
+
+# Three two-ref games an hour, so most slots have interchangeable games
+INSTANCE = dict(num_refs=14, num_days=2, num_times=3, games_per_slot=(3, 3), min_refs=2, max_refs=2, seed=2)
+
+
+@pytest.fixture
+def index():
+    return ScheduleIndex(*make_instance(**INSTANCE))
+
+
+def test_canonical_schedule_meets_the_ordering_rows_and_scores_the_same(index, weights):
+    fixed_pairs = index.fixed_pairs()[0]
+    classes = interchangeable_games(index, fixed_pairs)
+    assert classes
+
+    pairs = construct_schedule(index, 20, 8, fixed_pairs)['pairs']
+    relabeled = canonical_pairs(pairs, classes)
+
+    chosen = set(relabeled)
+    for r, k2, lower_pairs in symmetry_rows(index, classes):
+        assert ((r, k2) in chosen) <= sum(pair in chosen for pair in lower_pairs)
+    evaluator = ScheduleEvaluator(index, normalization_constants(index), 20, 8, fixed_pairs)
+    assert evaluator.evaluate(relabeled, weights)['objective'] == pytest.approx(
+        evaluator.evaluate(pairs, weights)['objective'], abs=1e-9)
+    # Manually assigned games are never relabeled
+    assert not {k for _, k in fixed_pairs} & {k for games in classes for k in games}
+
+
+def test_symmetry_rows_keep_the_optimum(index, weights):
+    fixed_pairs = index.fixed_pairs()[0]
+    classes = interchangeable_games(index, fixed_pairs)
+    objectives = []
+    for symmetry_classes in ((), classes):
+        model = MatrixModel(index, 20, 8, fixed_pairs, symmetry_classes=symmetry_classes)
+        result, _ = model.solve(weights, 'auto', 60, 0.0, tee=False)
+        assert result.termination == 'optimal'
+        objectives.append(result.objective)
+
+    assert objectives[1] == pytest.approx(objectives[0], abs=1e-6)
@@ -0,0 +1,41 @@
+from phase2.objective import COMPONENT_SIGNS, COMPONENTS
+from phase2.weight_sweep import WeightSweep, pareto_front, sample_weights, weight_grid
+
+
+def scored(effort, balancing, name):
+    components = dict.fromkeys(COMPONENTS, 0.0)
+    components.update(effort=effort, balancing=balancing)
+    return {'name': name, 'components': components}
+
+
+def dominates(a, b):
+    better = [COMPONENT_SIGNS[name] * a[name] >= COMPONENT_SIGNS[name] * b[name] for name in COMPONENTS]
+    return all(better) and a != b
+
+
+def test_pareto_front_keeps_only_undominated_schedules():
+    results = [
+        scored(5.0, 2.0, 'more effort'),
+        scored(3.0, 1.0, 'better balance'),
+        scored(3.0, 2.0, 'dominated'),       # less effort than 'more effort', worse balance than 'better balance'
+        scored(5.0, 2.0, 'duplicate'),
+        {'name': 'unsolved', 'components': None},
+    ]
+    assert [result['name'] for result in pareto_front(results)] == ['more effort', 'better balance']
+
+
+def test_weight_grid_covers_every_nonzero_mix():
+    grid = weight_grid((0.0, 1.0))
+    assert len(grid) == 2 ** len(COMPONENTS) - 1
+    assert all(any(weights.values()) for weights in grid)
+
+
+def test_swept_front_is_not_dominated_by_any_mix(small_week):
+    sweep = WeightSweep(*small_week)
+    results = sweep.run(sample_weights(4, seed=0), time_limit=10, mip_gap=0.0, workers=2)
+    front = pareto_front(results)
+
+    assert all(result['components'] is not None for result in results)
+    assert front
+    for chosen in front:
+        assert not any(dominates(other['components'], chosen['components']) for other in results)